@@ -50,13 +50,17 @@ class AnimalClient(BaseClient):
         url = f"{self.session.root_url}/ani/api/endpoint/"
         return self.session.post(url, data).json()
 
-    def data(self, assessment_id: int, include_unpublished: bool = False) -> pd.DataFrame:
+    def data(
+        self, assessment_id: int, include_unpublished: bool = False, format: str = "json"
+    ) -> pd.DataFrame:
         """
         Retrieves a complete export of animal bioassay data for a given assessment.
 
         Args:
             assessment_id (int): Assessment ID
             include_unpublished (bool, optional): If True, includes data from unpublished studies. Defaults to False.
+            format (str, optional): Response format; one of {"json", "csv", "parquet", "arrow"}.
+                Binary formats require the optional `pyarrow` dependency. Defaults to "json".
 
         Returns:
             pd.DataFrame: Complete bioassay export
@@ -64,8 +68,7 @@ class AnimalClient(BaseClient):
         url = f"{self.session.root_url}/ani/api/assessment/{assessment_id}/full-export/"
         if include_unpublished:
             url += "?unpublished=true"
-        response_json = self.session.get(url).json()
-        return pd.DataFrame(response_json)
+        return self._get_df(url, format)
 
     def data_summary(self, assessment_id: int) -> pd.DataFrame:
         """
@@ -1,4 +1,4 @@
-from io import StringIO
+from io import BytesIO, StringIO
 
 import pandas as pd
 
@@ -27,3 +27,58 @@ class BaseClient:
         """
         csv_io = StringIO(csv)
         return pd.read_csv(csv_io)
+
+    def _parquet_to_df(self, content: bytes) -> pd.DataFrame:
+        """
+        Takes Parquet bytes and returns the pandas DataFrame representation of it.
+
+        Args:
+            content (bytes): Parquet file content
+
+        Returns:
+            pd.DataFrame: DataFrame from Parquet
+        """
+        return pd.read_parquet(BytesIO(content))
+
+    def _arrow_to_df(self, content: bytes) -> pd.DataFrame:
+        """
+        Takes Arrow IPC stream bytes and returns the pandas DataFrame representation of it.
+
+        Args:
+            content (bytes): Arrow IPC stream content
+
+        Returns:
+            pd.DataFrame: DataFrame from Arrow IPC stream
+        """
+        import pyarrow as pa
+
+        with pa.ipc.open_stream(content) as reader:
+            return reader.read_pandas()
+
+    def _get_df(self, url: str, format: str = "json") -> pd.DataFrame:
+        """
+        Retrieves a tabular export and returns the pandas DataFrame representation of it.
+
+        Args:
+            url (str): URL for request
+            format (str, optional): Response format; one of {"json", "csv", "parquet", "arrow"}.
+                Binary formats preserve column data types and are faster to transfer and parse,
+                but require the optional `pyarrow` dependency. Defaults to "json".
+
+        Returns:
+            pd.DataFrame: DataFrame from export
+        """
+        if format not in {"parquet", "arrow", "csv", "json"}:
+            raise ValueError(f"Unsupported format: {format}")
+        # json is the default response format
+        params = None if format == "json" else {"format": format}
+        response = self.session.get(url, params=params)
+        match format:
+            case "parquet":
+                return self._parquet_to_df(response.content)
+            case "arrow":
+                return self._arrow_to_df(response.content)
+            case "csv":
+                return self._csv_to_df(response.text)
+            case _:
+                return pd.DataFrame(response.json())
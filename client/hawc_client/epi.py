@@ -19,19 +19,20 @@ class EpiClient(BaseClient):
         url = f"{self.session.root_url}/epi/api/metadata/{assessment_id}/"
         return self.session.get(url).json()
 
-    def data(self, assessment_id: int) -> pd.DataFrame:
+    def data(self, assessment_id: int, format: str = "json") -> pd.DataFrame:
         """
         Retrieves epidemiology data for the given assessment.
 
         Args:
             assessment_id (int): Assessment ID
+            format (str, optional): Response format; one of {"json", "csv", "parquet", "arrow"}.
+                Binary formats require the optional `pyarrow` dependency. Defaults to "json".
 
         Returns:
             pd.DataFrame: Epidemiology data
         """
         url = f"{self.session.root_url}/epi/api/assessment/{assessment_id}/export/"
-        response_json = self.session.get(url).json()
-        return pd.DataFrame(response_json)
+        return self._get_df(url, format)
 
     def endpoints(self, assessment_id: int) -> list[dict]:
         """
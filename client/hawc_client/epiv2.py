@@ -19,13 +19,17 @@ class EpiV2Client(BaseClient):
         url = f"{self.session.root_url}/epidemiology/api/metadata/"
         return self.session.get(url).json()
 
-    def data(self, assessment_id: int, retrieve_unpublished_data: bool = False) -> pd.DataFrame:
+    def data(
+        self, assessment_id: int, retrieve_unpublished_data: bool = False, format: str = "json"
+    ) -> pd.DataFrame:
         """
         Retrieves flat epidemiology v2 data export for the given assessment.
 
         Args:
             assessment_id (int): Assessment ID
             retrieve_unpublished_data (bool): include unpublished data in returned DataFrame
+            format (str, optional): Response format; one of {"json", "csv", "parquet", "arrow"}.
+                Binary formats require the optional `pyarrow` dependency. Defaults to "json".
 
         Returns:
             pd.DataFrame: Epidemiology data
@@ -33,9 +37,7 @@ class EpiV2Client(BaseClient):
         url = f"{self.session.root_url}/epidemiology/api/assessment/{assessment_id}/export/"
         if retrieve_unpublished_data:
             url += "?unpublished=true"
-
-        response_json = self.session.get(url).json()
-        return pd.DataFrame(response_json)
+        return self._get_df(url, format)
 
     def get_designs_for_assessment(self, assessment_id: int, page: int = 1) -> pd.DataFrame:
         """
@@ -8,16 +8,17 @@ class InvitroClient(BaseClient):
     Client class for in-vitro requests.
     """
 
-    def data(self, assessment_id: int) -> pd.DataFrame:
+    def data(self, assessment_id: int, format: str = "json") -> pd.DataFrame:
         """
         Retrieves in-vitro data for the given assessment.
 
         Args:
             assessment_id (int): Assessment ID
+            format (str, optional): Response format; one of {"json", "csv", "parquet", "arrow"}.
+                Binary formats require the optional `pyarrow` dependency. Defaults to "json".
 
         Returns:
             pd.DataFrame: In-vitro data
         """
         url = f"{self.session.root_url}/in-vitro/api/assessment/{assessment_id}/full-export/"
-        response_json = self.session.get(url).json()
-        return pd.DataFrame(response_json)
+        return self._get_df(url, format)
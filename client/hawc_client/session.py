@@ -30,6 +30,8 @@ class HawcSession:
             HawcClientException: If error occurs in data submission
             HawcServerException: If error orccurs on server
         """
+        if response.status_code < 400:
+            return
         try:
             content = response.json()
         except json.JSONDecodeError:
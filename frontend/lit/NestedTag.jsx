@@ -9,6 +9,7 @@ class NestedTag {
     constructor(item, depth, tree, parent, assessment_id, search_id) {
         this.observers = [];
         this.references = new Set();
+        this.referenceCounts = null;
         this.parent = parent;
         this.data = item.data;
         this.data.pk = item.id;
@@ -37,6 +38,16 @@ class NestedTag {
         return [...set.values()];
     }
 
+    get_reference_count() {
+        // use precomputed counts if available
+        return this.referenceCounts ? this.referenceCounts[0] : this.references.size;
+    }
+
+    get_reference_count_deep() {
+        // use precomputed counts if available
+        return this.referenceCounts ? this.referenceCounts[1] : this.get_references_deep().length;
+    }
+
     _append_to_dict(dict) {
         dict[this.data.pk] = this;
         this.children.forEach(child => child._append_to_dict(dict));
@@ -29,6 +29,13 @@ class TagTree {
         });
     }
 
+    add_reference_counts(counts) {
+        // precomputed [count, deep count] for each tag id, instead of reference-tag pairs
+        Object.values(this.dict).forEach(node => {
+            node.referenceCounts = counts[node.data.pk] || [0, 0];
+        });
+    }
+
     rename_top_level_node(name) {
         this.rootNode.data.name = name;
     }
@@ -66,7 +73,7 @@ class TagTree {
             node.children = valid_children;
 
             if (hideEmpty) {
-                return node.get_references_deep().length == 0;
+                return node.get_reference_count_deep() == 0;
             }
             return false;
         };
@@ -166,8 +166,8 @@ class TagTreeViz extends D3Plot {
                     name: nestedTag.data.name,
                     depth: nestedTag.depth,
                     nestedTag,
-                    numReferences: nestedTag.references.size,
-                    numReferencesDeep: nestedTag.get_references_deep().length,
+                    numReferences: nestedTag.get_reference_count(),
+                    numReferencesDeep: nestedTag.get_reference_count_deep(),
                     hasChildren: nestedTag.children.length > 0,
                     children: nestedTag.children.map(buildVizDatasetNode),
                 };
@@ -231,6 +231,12 @@ class Reference extends Component {
                 <div className="d-flex vw75">
                     {this.renderIdentifiers(data, reference.get_study_url(), expanded)}
                 </div>
+                {data.search_headline ? (
+                    <p
+                        className="ref_small search-headline vw75"
+                        dangerouslySetInnerHTML={{__html: data.search_headline}}
+                    />
+                ) : null}
                 {data.abstract ? (
                     <div
                         onClick={!expanded ? this.toggleAbstract : null}
@@ -53,7 +53,7 @@ class TagNode extends Component {
                             {tag.data.name}
                             {showReferenceCount ? (
                                 <span className="ml-2 badge badge-dark">
-                                    {tag.get_references_deep().length}
+                                    {tag.get_reference_count_deep()}
                                 </span>
                             ) : null}
                             <DebugBadge text={tag.data.pk} />
@@ -77,7 +77,11 @@ export default {
                 show_counts: true,
             };
         tagtree.rename_top_level_node(config.assessment_name);
-        tagtree.add_references(config.references);
+        if (config.tag_counts) {
+            tagtree.add_reference_counts(config.tag_counts);
+        } else {
+            tagtree.add_references(config.references);
+        }
         new TagTreeViz(tagtree, el, config.title, settings);
     },
     startupVenn(el, config) {
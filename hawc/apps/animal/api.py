@@ -6,6 +6,7 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import NotAcceptable
 from rest_framework.response import Response
 
+from ..assessment import snapshots
 from ..assessment.api import (
     AssessmentViewSet,
     BaseAssessmentViewSet,
@@ -49,6 +50,12 @@ class AnimalAssessmentViewSet(BaseAssessmentViewSet):
         is present then results from all studies are shown.
         """
         self.assessment = self.get_object()
+        if (
+            get_published_only(self.assessment, request)
+            and not request.query_params.get("study_ids")
+            and (response := snapshots.get_response(request, self.assessment, "animal"))
+        ):
+            return response
         exporter = exports.EndpointGroupFlatComplete(
             self.get_endpoint_queryset(request),
             filename=f"{self.assessment}-bioassay-complete",
@@ -20,10 +20,10 @@ from . import constants, models
 
 def cont_ci(stdev, n, response):
     """
-    Two-tailed t-test, assuming 95% confidence interval.
+    Two-tailed t-test, assuming 95% confidence interval; accepts scalars or arrays.
     """
-    se = stdev / math.sqrt(n)
-    change = stats.t.ppf(0.975, max(n - 1, 1)) * se
+    se = stdev / np.sqrt(n)
+    change = stats.t.ppf(0.975, np.maximum(n - 1, 1)) * se
     lower_ci = response - change
     upper_ci = response + change
     return lower_ci, upper_ci
@@ -36,9 +36,9 @@ def dich_ci(incidence, n):
 
     The error bars shown in BMDS plots use alpha = 0.05 and so
     represent the 95% confidence intervals on the observed
-    proportions (independent of model).
+    proportions (independent of model); accepts scalars or arrays.
     """
-    p = incidence / float(n)
+    p = incidence / n
     z = stats.norm.ppf(1 - 0.05 / 2)
     z2 = z * z
     q = 1.0 - p
@@ -66,20 +66,46 @@ def percent_control(n_1, mu_1, sd_1, n_2, mu_2, sd_2):
     return mean, low, high
 
 
-def maximum_percent_control_change(changes: list):
+def _pow(values: np.ndarray, exponent: int) -> np.ndarray:
+    # python's pow, which may differ from np.power in the last bit; results match `percent_control`
+    return np.array([pow(value, exponent) for value in values.tolist()], dtype=float)
+
+
+def _percent_control(n_1, mu_1, sd_1, n_2, mu_2, sd_2) -> tuple[np.ndarray, ...]:
+    # vectorized `percent_control`, for float arrays where missing values are NaN
+    mean = np.full(mu_2.shape, np.nan)
+    low = np.full(mu_2.shape, np.nan)
+    high = np.full(mu_2.shape, np.nan)
+    valid = (mu_1 > 0) & (mu_2 > 0)
+    mean[valid] = (mu_2[valid] - mu_1[valid]) / mu_1[valid] * 100.0
+
+    # zeros are falsy, but NaN is truthy and gives a NaN interval
+    valid &= (sd_1 != 0) & (sd_2 != 0) & (n_1 != 0) & (n_2 != 0)
+    mu_1, mu_2, sd_1, sd_2, n_1, n_2 = (v[valid] for v in (mu_1, mu_2, sd_1, sd_2, n_1, n_2))
+    sd = np.sqrt(
+        _pow(mu_1, -2)
+        * ((_pow(sd_2, 2) / n_2) + (_pow(mu_2, 2) * _pow(sd_1, 2)) / (n_1 * _pow(mu_1, 2)))
+    )
+    ci = (1.96 * sd) * 100
+    low[valid] = np.fmin(mean[valid] - ci, mean[valid] + ci)
+    high[valid] = np.fmax(mean[valid] - ci, mean[valid] + ci)
+    return mean, low, high
+
+
+def maximum_percent_control_change(changes: np.ndarray, groups: np.ndarray) -> np.ndarray:
     """
     For each endpoint, return the maximum absolute-change percent control
     for that endpoint, or 0 if it cannot be calculated. Useful for
-    ordering data-pivot results.
+    ordering data-pivot results. Returns a value for each row, given the
+    endpoint group of each row.
     """
-    val = 0
-
-    if len(changes) > 0:
-        min_ = min(changes)
-        max_ = max(changes)
-        val = min_ if abs(min_) > abs(max_) else max_
-
-    return val
+    grouped = pd.Series(changes).groupby(groups)
+    min_ = grouped.transform("min").to_numpy()
+    max_ = grouped.transform("max").to_numpy()
+    val = np.where(np.abs(min_) > np.abs(max_), min_, max_)
+    if np.isnan(val).all():
+        return np.zeros(val.size, dtype=int)
+    return np.where(np.isnan(val), 0.0, val)
 
 
 def rename_udf_cols(df) -> pd.DataFrame:
@@ -95,6 +121,20 @@ def rename_udf_cols(df) -> pd.DataFrame:
     return df.rename(_rename, axis="columns")
 
 
+def _is_none(series: pd.Series) -> np.ndarray:
+    # values which are None; missing values in numeric columns are NaN, which is not None
+    if series.dtype != object:
+        return np.zeros(series.size, dtype=bool)
+    return np.equal(series.to_numpy(), None).astype(bool)
+
+
+def _endpoint_groups(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    # the endpoint group number of each row, and the position of the first row in its group
+    codes, _ = pd.factorize(df["endpoint-id"])
+    _, first = np.unique(codes, return_index=True)
+    return codes, first[codes]
+
+
 class ExperimentExport(ModelExport):
     def get_value_map(self):
         return {
@@ -288,17 +328,12 @@ class EndpointBmdsExport(FlatFileExporter):
         self.published_only = published_only
 
     def get_dose_groups(self) -> pd.DataFrame:
-        filters = dict(
-            dose_regime__dosed_animals__experiment__study__assessment_id=self.assessment_id
-        )
+        df = models.DoseGroup.objects.dose_table(self.assessment_id)
         if self.published_only:
-            filters.update(dose_regime__dosed_animals__experiment__study__published=True)
-        qs = (
-            models.DoseGroup.objects.filter(**filters)
-            .values("dose_regime_id", "dose_units__name", "dose_group_id", "dose")
-            .order_by("dose_regime_id", "dose_units_id", "dose_group_id")
+            df = df[df["published"]]
+        return df[["dose_regime_id", "dose_units_name", "dose_group_id", "dose"]].rename(
+            columns={"dose_units_name": "dose_units__name"}
         )
-        return pd.DataFrame(data=qs)
 
     def get_dichotomous_response(self) -> pd.DataFrame:
         filters = dict(
@@ -751,229 +786,215 @@ class EndpointGroupFlatDataPivot(FlatFileExporter):
         return available_units[0]
 
     def handle_ci(self, df: pd.DataFrame) -> pd.DataFrame:
-        def _func(row: pd.Series) -> pd.Series:
-            # logic used from EndpointGroup.getConfidenceIntervals()
-            data_type = row["endpoint-data_type"]
-            lower_ci = row["endpoint_group-lower_ci"]
-            upper_ci = row["endpoint_group-upper_ci"]
-            n = row["endpoint_group-n"]
-
-            response = row["endpoint_group-response"]
-            stdev = row["endpoint_group-stdev"]
-            incidence = row["endpoint_group-incidence"]
-            if lower_ci is not None or upper_ci is not None or n is None or n <= 0:
-                pass
-            elif (
-                data_type == constants.DataType.CONTINUOUS
-                and response is not None
-                and stdev is not None
-            ):
-                (
-                    row["endpoint_group-lower_ci"],
-                    row["endpoint_group-upper_ci"],
-                ) = cont_ci(stdev, n, response)
-            elif (
-                data_type in [constants.DataType.DICHOTOMOUS, constants.DataType.DICHOTOMOUS_CANCER]
-                and incidence is not None
-            ):
-                (
-                    row["endpoint_group-lower_ci"],
-                    row["endpoint_group-upper_ci"],
-                ) = dich_ci(incidence, n)
-            return row
-
-        return df.apply(_func, axis="columns")
+        # logic used from EndpointGroup.getConfidenceIntervals()
+        data_type = df["endpoint-data_type"]
+        n = df["endpoint_group-n"].astype(float)
+        calculate = (
+            _is_none(df["endpoint_group-lower_ci"])
+            & _is_none(df["endpoint_group-upper_ci"])
+            & ~_is_none(df["endpoint_group-n"])
+            & ~(n <= 0).to_numpy()
+        )
+        continuous = (
+            calculate
+            & (data_type == constants.DataType.CONTINUOUS).to_numpy()
+            & ~_is_none(df["endpoint_group-response"])
+            & ~_is_none(df["endpoint_group-stdev"])
+        )
+        dichotomous = (
+            calculate
+            & data_type.isin(
+                [constants.DataType.DICHOTOMOUS, constants.DataType.DICHOTOMOUS_CANCER]
+            ).to_numpy()
+            & ~_is_none(df["endpoint_group-incidence"])
+        )
+        lower_ci = df["endpoint_group-lower_ci"].to_numpy(dtype=object, copy=True)
+        upper_ci = df["endpoint_group-upper_ci"].to_numpy(dtype=object, copy=True)
+        if continuous.any():
+            lower_ci[continuous], upper_ci[continuous] = cont_ci(
+                df["endpoint_group-stdev"].to_numpy(dtype=float)[continuous],
+                n.to_numpy()[continuous],
+                df["endpoint_group-response"].to_numpy(dtype=float)[continuous],
+            )
+        if dichotomous.any():
+            lower_ci[dichotomous], upper_ci[dichotomous] = dich_ci(
+                df["endpoint_group-incidence"].to_numpy(dtype=float)[dichotomous],
+                n.to_numpy()[dichotomous],
+            )
+        df["endpoint_group-lower_ci"] = lower_ci
+        df["endpoint_group-upper_ci"] = upper_ci
+        return df.infer_objects()
 
     def handle_stdev(self, df: pd.DataFrame) -> pd.DataFrame:
-        df["endpoint_group-stdev"] = df.apply(
-            lambda x: models.EndpointGroup.stdev(
-                x["endpoint-variance_type"],
-                x["endpoint_group-variance"],
-                x["endpoint_group-n"],
-            ),
-            axis="columns",
+        # logic used from EndpointGroup.stdev()
+        variance_type = df["endpoint-variance_type"].to_numpy()
+        variance = df["endpoint_group-variance"]
+        sd = variance_type == constants.VarianceType.SD
+        se = (
+            (variance_type == constants.VarianceType.SE)
+            & ~_is_none(variance)
+            & ~_is_none(df["endpoint_group-n"])
+        )
+        stdev = np.full(df.shape[0], None, dtype=object)
+        stdev[sd] = variance.to_numpy()[sd]
+        se_values = variance.to_numpy(dtype=float)[se] * np.sqrt(
+            df["endpoint_group-n"].to_numpy(dtype=float)[se]
         )
+        stdev[se] = [round(value, 4) for value in se_values.tolist()]
+        df["endpoint_group-stdev"] = pd.Series(stdev.tolist(), index=df.index)
         return df
 
     def handle_percent_control(self, df: pd.DataFrame) -> pd.DataFrame:
-        def _func(group_df: pd.DataFrame) -> pd.DataFrame:
-            control = group_df.iloc[0]
-
-            data_type = control["endpoint-data_type"]
-            i_1 = control["endpoint_group-incidence"]
-            n_1 = control["endpoint_group-n"]
-            mu_1 = control["endpoint_group-response"]
-            sd_1 = control["endpoint_group-stdev"]
-
-            def __func(row: pd.Series) -> pd.Series:
-                # logic used from EndpointGroup.percentControl()
-                row["percent control mean"] = None
-                row["percent control low"] = None
-                row["percent control high"] = None
-                if data_type == constants.DataType.CONTINUOUS:
-                    n_2 = row["endpoint_group-n"]
-                    mu_2 = row["endpoint_group-response"]
-                    sd_2 = row["endpoint_group-stdev"]
-                    (
-                        row["percent control mean"],
-                        row["percent control low"],
-                        row["percent control high"],
-                    ) = percent_control(n_1, mu_1, sd_1, n_2, mu_2, sd_2)
-                elif data_type == constants.DataType.PERCENT_DIFFERENCE:
-                    row["percent control mean"] = row["endpoint_group-response"]
-                    row["percent control low"] = row["endpoint_group-lower_ci"]
-                    row["percent control high"] = row["endpoint_group-upper_ci"]
-                elif data_type == constants.DataType.DICHOTOMOUS:
-                    if i_1 and n_1:
-                        i_2 = row["endpoint_group-incidence"]
-                        n_2 = row["endpoint_group-n"]
-                        if n_2:
-                            row["percent control mean"] = (
-                                ((i_2 / n_2) - (i_1 / n_1)) / (i_1 / n_1) * 100
-                            )
-                return row
-
-            group_df = group_df.apply(__func, axis="columns")
-            group_df["maximum endpoint change"] = maximum_percent_control_change(
-                group_df["percent control mean"].dropna()
-            )
-            return group_df
-
-        return (
-            df.groupby("endpoint-id", group_keys=False, sort=False)
-            .apply(_func)
-            .reset_index(drop=True)
+        # logic used from EndpointGroup.percentControl(); the first group of each endpoint is
+        # the control group
+        codes, first = _endpoint_groups(df)
+        data_type = df["endpoint-data_type"].to_numpy()
+        incidence = df["endpoint_group-incidence"].to_numpy(dtype=float)
+        n = df["endpoint_group-n"].to_numpy(dtype=float)
+        response = df["endpoint_group-response"].to_numpy(dtype=float)
+        stdev = df["endpoint_group-stdev"].to_numpy(dtype=float)
+        mean = np.full(df.shape[0], np.nan)
+        low = np.full(df.shape[0], np.nan)
+        high = np.full(df.shape[0], np.nan)
+
+        continuous = data_type == constants.DataType.CONTINUOUS
+        mean[continuous], low[continuous], high[continuous] = _percent_control(
+            n[first][continuous],
+            response[first][continuous],
+            stdev[first][continuous],
+            n[continuous],
+            response[continuous],
+            stdev[continuous],
         )
 
-    def handle_animal_description(self, df: pd.DataFrame):
-        def _func(group_df: pd.DataFrame) -> pd.Series:
-            gen = group_df["animal_group-generation"].iloc[0]
-            if len(gen) > 0:
-                gen += " "
-            ns_txt = ""
-            ns = group_df["endpoint_group-n"].dropna().astype(int).tolist()
-            if len(ns) > 0:
-                ns_txt = ", N=" + models.EndpointGroup.getNRangeText(ns)
-
-            sex_symbol = group_df["animal_group-sex_symbol"].iloc[0]
-            if sex_symbol == "NR":
-                sex_symbol = "sex=NR"
-            species = group_df["animal_group-species_name"].iloc[0]
-            strain = group_df["animal_group-strain_name"].iloc[0]
-            group_df["animal description"] = f"{gen}{species}, {strain} ({sex_symbol})"
-            group_df["animal description (with N)"] = (
-                f"{gen}{species}, {strain} ({sex_symbol}{ns_txt})"
-            )
-
-            return group_df
+        percent_difference = data_type == constants.DataType.PERCENT_DIFFERENCE
+        mean[percent_difference] = response[percent_difference]
+        low[percent_difference] = df["endpoint_group-lower_ci"].to_numpy(dtype=float)[
+            percent_difference
+        ]
+        high[percent_difference] = df["endpoint_group-upper_ci"].to_numpy(dtype=float)[
+            percent_difference
+        ]
 
-        return (
-            df.groupby("endpoint-id", group_keys=False, sort=False)
-            .apply(_func)
-            .reset_index(drop=True)
+        # zeros are falsy; missing values give a NaN change
+        dichotomous = (
+            (data_type == constants.DataType.DICHOTOMOUS)
+            & (incidence[first] != 0)
+            & (n[first] != 0)
+            & (n != 0)
         )
+        control = incidence[first][dichotomous] / n[first][dichotomous]
+        mean[dichotomous] = ((incidence[dichotomous] / n[dichotomous]) - control) / control * 100
 
-    def handle_treatment_period(self, df: pd.DataFrame) -> pd.DataFrame:
-        def _calc(row):
-            txt = row["experiment-type_display"].lower()
-            if txt.find("(") >= 0:
-                txt = txt[: txt.find("(")].strip()
+        df["percent control mean"] = mean
+        df["percent control low"] = low
+        df["percent control high"] = high
+        df["maximum endpoint change"] = maximum_percent_control_change(mean, codes)
+        return df.reset_index(drop=True)
 
-            if row["dosing_regime-duration_exposure_text"]:
-                txt = f"{txt} ({row['dosing_regime-duration_exposure_text']})"
+    def handle_animal_description(self, df: pd.DataFrame):
+        codes, first = _endpoint_groups(df)
+        heads = np.unique(first)
+        generation = df["animal_group-generation"].iloc[heads]
+        generation = generation.where(generation.str.len() == 0, generation + " ")
+        sex_symbol = df["animal_group-sex_symbol"].iloc[heads].replace({"NR": "sex=NR"}).astype(str)
+        description = (
+            generation.astype(str)
+            + df["animal_group-species_name"].iloc[heads].astype(str)
+            + ", "
+            + df["animal_group-strain_name"].iloc[heads].astype(str)
+            + " ("
+            + sex_symbol
+        ).to_numpy()
+
+        ns = df["endpoint_group-n"].astype(float).groupby(codes)
+        n_min, n_max = ns.min().to_numpy(), ns.max().to_numpy()
+        has_n = ~np.isnan(n_min)
+        n_text = np.full(heads.size, "", dtype=object)
+        n_text[has_n] = [
+            f", N={int(lo)}" if lo == hi else f", N={int(lo)}-{int(hi)}"
+            for lo, hi in zip(n_min[has_n].tolist(), n_max[has_n].tolist(), strict=True)
+        ]
 
-            return txt
+        df["animal description"] = (description + ")")[codes]
+        df["animal description (with N)"] = (description + n_text + ")")[codes]
+        return df.reset_index(drop=True)
 
-        df["treatment period"] = df.apply(_calc, axis=1, result_type="expand")
+    def handle_treatment_period(self, df: pd.DataFrame) -> pd.DataFrame:
+        txt = df["experiment-type_display"].str.lower()
+        txt = txt.where(~txt.str.contains("(", regex=False), txt.str.split("(").str[0].str.strip())
+        duration = df["dosing_regime-duration_exposure_text"]
+        has_duration = duration.notna() & (duration != "")
+        df["treatment period"] = txt.where(~has_duration, txt + " (" + duration.astype(str) + ")")
         return df
 
     def handle_dose_groups(self, df: pd.DataFrame) -> pd.DataFrame:
         noel_names = self.kwargs["assessment"].get_noel_names()
 
-        def _func(group_df: pd.DataFrame) -> pd.Series:
-            preferred_units = self.get_preferred_units(group_df)
-            group_df = group_df[(group_df["dose_group-dose_units_id"] == preferred_units)]
-            reported_doses = group_df["dose_group-dose"].mask(
-                pd.isna(group_df["endpoint_group-n"])
-                & pd.isna(group_df["endpoint_group-response"])
-                & pd.isna(group_df["endpoint_group-incidence"])
-            )
-            doses = (
-                group_df["dose_group-dose"]
-                if reported_doses.dropna().empty
-                else reported_doses.dropna()
-            )
-            group_df["doses"] = (
-                ", ".join(doses.astype(str)) + " " + group_df["dose_group-dose_units_name"]
-            )
-
-            if reported_doses.dropna().empty:
-                group_df["low_dose"] = None
-                group_df["high_dose"] = None
-                group_df[noel_names.noel] = None
-                group_df[noel_names.loel] = None
-                group_df["FEL"] = None
-                return group_df
-            low_dose_index = reported_doses.iloc[1:].first_valid_index()
-            group_df["low_dose"] = (
-                None if low_dose_index is None else reported_doses.loc[low_dose_index]
-            )
-            high_dose_index = reported_doses.iloc[1:].last_valid_index()
-            group_df["high_dose"] = (
-                None if high_dose_index is None else reported_doses.loc[high_dose_index]
-            )
-            NOEL_series = group_df["dose_group-dose"][
-                group_df["endpoint_group-NOEL"].fillna(False) & pd.notna(reported_doses)
-            ]
-            group_df[noel_names.noel] = NOEL_series.iloc[0] if NOEL_series.size > 0 else None
-            LOEL_series = group_df["dose_group-dose"][
-                group_df["endpoint_group-LOEL"].fillna(False) & pd.notna(reported_doses)
-            ]
-            group_df[noel_names.loel] = LOEL_series.iloc[0] if LOEL_series.size > 0 else None
-            FEL_series = group_df["dose_group-dose"][
-                group_df["endpoint_group-FEL"].fillna(False) & pd.notna(reported_doses)
-            ]
-            group_df["FEL"] = FEL_series.iloc[0] if FEL_series.size > 0 else None
-            return group_df
-
-        return (
-            df.groupby("endpoint-id", group_keys=False, sort=False)
-            .apply(_func)
-            .reset_index(drop=True)
+        # select the preferred units for each endpoint; endpoints without units are removed
+        codes, _ = _endpoint_groups(df)
+        units = df["dose_group-dose_units_id"]
+        chosen = units.groupby(codes).transform("first")
+        if preferred_units := self.kwargs.get("preferred_units", None):
+            rank = units.map({value: i for i, value in enumerate(preferred_units)})
+            best = rank.groupby(codes).transform("min")
+            ranked = best.notna()
+            chosen[ranked] = np.asarray(preferred_units)[best[ranked].astype(int)]
+        df = df[units == chosen].reset_index(drop=True)
+
+        codes, first = _endpoint_groups(df)
+        dose = df["dose_group-dose"]
+        reported = dose.mask(
+            pd.isna(df["endpoint_group-n"])
+            & pd.isna(df["endpoint_group-response"])
+            & pd.isna(df["endpoint_group-incidence"])
         )
+        any_reported = reported.notna().groupby(codes).transform("any").to_numpy()
+
+        # doses listed are those reported, or all doses if none are reported
+        listed = ~any_reported | reported.notna().to_numpy()
+        dose_text = dose.astype(str)[listed].groupby(codes[listed]).agg(", ".join).to_numpy()[codes]
+        df["doses"] = dose_text + " " + df["dose_group-dose_units_name"]
+
+        # low and high doses exclude the control group
+        not_control = np.arange(df.shape[0]) != first
+        dose_groups = reported.where(not_control).groupby(codes)
+        df["low_dose"] = dose_groups.transform("first").where(any_reported, None)
+        df["high_dose"] = dose_groups.transform("last").where(any_reported, None)
+        for name, field in [
+            (noel_names.noel, "endpoint_group-NOEL"),
+            (noel_names.loel, "endpoint_group-LOEL"),
+            ("FEL", "endpoint_group-FEL"),
+        ]:
+            selected = dose.where(df[field].eq(True) & reported.notna())
+            df[name] = selected.groupby(codes).transform("first").where(any_reported, None)
+        return df
 
     def handle_incidence_summary(self, df: pd.DataFrame) -> pd.DataFrame:
-        def _func(group_df: pd.DataFrame) -> pd.Series:
-            group_df["dichotomous summary"] = "-"
-            group_df["percent affected"] = None
-            group_df["percent lower ci"] = None
-            group_df["percent upper ci"] = None
-            data_type = group_df["endpoint-data_type"].iloc[0]
-
-            def __func(row: pd.Series) -> pd.Series:
-                # logic used from EndpointGroup.get_incidence_summary()
-                n = row["endpoint_group-n"]
-                i = row["endpoint_group-incidence"]
-                if (
-                    data_type
-                    in [constants.DataType.DICHOTOMOUS, constants.DataType.DICHOTOMOUS_CANCER]
-                    and n is not None
-                    and n > 0
-                    and i is not None
-                ):
-                    row["dichotomous summary"] = f"{int(i)}/{int(n)} ({i / n * 100:.1f}%)"
-                    row["percent affected"] = i / n * 100
-                    row["percent lower ci"] = row["endpoint_group-lower_ci"] * 100
-                    row["percent upper ci"] = row["endpoint_group-upper_ci"] * 100
-                return row
-
-            return group_df.apply(__func, axis="columns")
-
-        return (
-            df.groupby("endpoint-id", group_keys=False, sort=False)
-            .apply(_func)
-            .reset_index(drop=True)
+        # logic used from EndpointGroup.get_incidence_summary()
+        n = df["endpoint_group-n"].to_numpy(dtype=float)
+        incidence = df["endpoint_group-incidence"].to_numpy(dtype=float)
+        summarize = (
+            df["endpoint-data_type"]
+            .isin([constants.DataType.DICHOTOMOUS, constants.DataType.DICHOTOMOUS_CANCER])
+            .to_numpy()
+            & (n > 0)
+            & ~np.isnan(incidence)
+        )
+        summary = np.full(df.shape[0], "-", dtype=object)
+        summary[summarize] = [
+            f"{int(i)}/{int(n_)} ({i / n_ * 100:.1f}%)"
+            for i, n_ in zip(incidence[summarize].tolist(), n[summarize].tolist(), strict=True)
+        ]
+        df["dichotomous summary"] = summary
+        df["percent affected"] = np.where(summarize, incidence / n * 100, np.nan)
+        df["percent lower ci"] = np.where(
+            summarize, df["endpoint_group-lower_ci"].to_numpy(dtype=float) * 100, np.nan
         )
+        df["percent upper ci"] = np.where(
+            summarize, df["endpoint_group-upper_ci"].to_numpy(dtype=float) * 100, np.nan
+        )
+        return df.reset_index(drop=True)
 
     def build_df(self) -> pd.DataFrame:
         df = EndpointGroupFlatDataPivotExporter().get_df(
@@ -1200,92 +1221,92 @@ class EndpointFlatDataPivot(EndpointGroupFlatDataPivot):
         for session in sessions:
             bmd_map[session.endpoint_id].append(session.get_selected_model())
         preferred_units = self.kwargs.get("preferred_units", None)
-        df["BMD"] = None
-        df["BMDL"] = None
 
-        def _func(row: pd.Series) -> pd.Series:
-            bmds = bmd_map[row["endpoint-id"]]
+        # use the first selected model in the preferred units for each endpoint
+        selected = {}
+        for endpoint_id, bmds in bmd_map.items():
             for bmd in bmds:
                 if bmd["dose_units_id"] in preferred_units and bmd["model"] is not None:
-                    row["BMD"] = bmd["bmd"]
-                    row["BMDL"] = bmd["bmdl"]
+                    selected[endpoint_id] = bmd
                     break
-            return row
-
-        return df.apply(_func, axis="columns")
+        df["BMD"] = df["endpoint-id"].map({k: v["bmd"] for k, v in selected.items()}).astype(float)
+        df["BMDL"] = (
+            df["endpoint-id"].map({k: v["bmdl"] for k, v in selected.items()}).astype(float)
+        )
+        return df
 
     def handle_flat_doses(self, df: pd.DataFrame) -> pd.DataFrame:
-        def _func(group_df: pd.DataFrame) -> pd.Series:
-            unique_df = group_df.drop_duplicates(subset="endpoint_group-id").reset_index(drop=True)
-            reported_doses = unique_df["dose_group-dose"].mask(
-                pd.isna(unique_df["endpoint_group-n"])
-                & pd.isna(unique_df["endpoint_group-response"])
-                & pd.isna(unique_df["endpoint_group-incidence"])
-            )
-            num_doses = reported_doses.size
-
-            group_df[[f"Dose {i}" for i in range(1, num_doses + 1)]] = reported_doses.reset_index(
-                drop=True
-            )
-
-            data_type = unique_df["endpoint-data_type"].iloc[0]
-            control_group = unique_df.iloc[0]
-            if pd.isna(unique_df["endpoint_group-id"]).all():
-                pass
-            elif data_type in {
-                constants.DataType.CONTINUOUS,
-                constants.DataType.PERCENT_DIFFERENCE,
-                constants.DataType.DICHOTOMOUS,
-                constants.DataType.DICHOTOMOUS_CANCER,
-            }:
-                if data_type in {
-                    constants.DataType.CONTINUOUS,
-                    constants.DataType.PERCENT_DIFFERENCE,
-                }:
-                    field = "endpoint_group-response"
-                elif data_type in {
-                    constants.DataType.DICHOTOMOUS,
-                    constants.DataType.DICHOTOMOUS_CANCER,
-                }:
-                    field = "percent affected"
-                control_resp = control_group[field]
-                insignificant = pd.Series(["No"] * num_doses)
-                significant = pd.Series(["Yes - ?"] * num_doses)
-                significant_up = pd.Series(["Yes - ↑"] * num_doses)
-                significant_down = pd.Series(["Yes - ↓"] * num_doses)
-
-                significance = insignificant.mask(
-                    (unique_df["endpoint_group-significant"].fillna(False)),
-                    significant_down.mask((unique_df[field] > control_resp), significant_up).mask(
-                        (
-                            (pd.isna(control_resp))
-                            | (pd.isna(unique_df[field]))
-                            | (unique_df[field] == control_resp)
-                        ),
-                        significant,
-                    ),
-                )
-                group_df[[f"Significant {i}" for i in range(1, num_doses + 1)]] = significance
-            elif data_type == constants.DataType.NR:
-                group_df[[f"Significant {i}" for i in range(1, num_doses + 1)]] = pd.Series(
-                    ["?"] * num_doses
-                )
-
-            group_df[[f"Treatment Related Effect {i}" for i in range(1, num_doses + 1)]] = (
-                unique_df["endpoint_group-treatment_effect_display"].reset_index(drop=True)
-            )
+        # one column per dose group for each endpoint; endpoints may have different numbers of
+        # dose groups, so columns are ordered by the first endpoint which has them
+        codes, _ = _endpoint_groups(df)
+        unique = ~df.duplicated(subset=["endpoint-id", "endpoint_group-id"]).to_numpy()
+        unique_df = df[unique]
+        unique_codes = codes[unique]
+        position = unique_df.groupby(unique_codes).cumcount().to_numpy()
+        n_groups = codes.max() + 1 if codes.size else 0
+        n_doses = np.bincount(unique_codes, minlength=n_groups)
+        has_groups = unique_df["endpoint_group-id"].notna().groupby(unique_codes).any().to_numpy()
+
+        def flatten(values: np.ndarray, dtype) -> np.ndarray:
+            # a (rows, doses) array of the value for each dose group of the row's endpoint
+            flat = np.full((n_groups, n_doses.max(initial=0)), np.nan, dtype=dtype)
+            flat[unique_codes, position] = values
+            return flat[codes]
+
+        reported = unique_df["dose_group-dose"].mask(
+            pd.isna(unique_df["endpoint_group-n"])
+            & pd.isna(unique_df["endpoint_group-response"])
+            & pd.isna(unique_df["endpoint_group-incidence"])
+        )
+        doses = flatten(reported.to_numpy(dtype=float), float)
 
-            return group_df.drop_duplicates(
-                subset=group_df.columns[group_df.columns.str.endswith("-id")].difference(
-                    ["endpoint_group-id"]
-                )
-            )
+        # significance of each dose group, compared to the control (first) group
+        data_type = unique_df["endpoint-data_type"].to_numpy()
+        dichotomous = np.isin(
+            data_type, [constants.DataType.DICHOTOMOUS, constants.DataType.DICHOTOMOUS_CANCER]
+        )
+        response = np.where(
+            dichotomous,
+            unique_df["percent affected"].to_numpy(dtype=float),
+            unique_df["endpoint_group-response"].to_numpy(dtype=float),
+        )
+        control = response[np.flatnonzero(position == 0)[unique_codes]]
+        significance = np.where(response > control, "Yes - ↑", "Yes - ↓").astype(object)
+        significance[np.isnan(control) | np.isnan(response) | (response == control)] = "Yes - ?"
+        significance[~unique_df["endpoint_group-significant"].eq(True).to_numpy()] = "No"
+        significance[data_type == constants.DataType.NR] = "?"
+        significance[~has_groups[unique_codes]] = np.nan
+        significant = flatten(significance, object)
+        treatment_effects = flatten(
+            unique_df["endpoint_group-treatment_effect_display"].to_numpy(), object
+        )
 
-        return (
-            df.groupby("endpoint-id", group_keys=False, sort=False)
-            .apply(_func)
-            .reset_index(drop=True)
+        columns = {}
+        for n, has_significance in dict.fromkeys(
+            zip(n_doses.tolist(), has_groups.tolist(), strict=True)
+        ):
+            names = [("Dose", i) for i in range(n)]
+            if has_significance:
+                names.extend(("Significant", i) for i in range(n))
+            names.extend(("Treatment Related Effect", i) for i in range(n))
+            columns.update(dict.fromkeys(names))
+        values = {
+            "Dose": doses,
+            "Significant": significant,
+            "Treatment Related Effect": treatment_effects,
+        }
+        df = pd.concat(
+            [
+                df.reset_index(drop=True),
+                pd.DataFrame(
+                    {f"{name} {i + 1}": values[name][:, i] for name, i in columns},
+                ),
+            ],
+            axis=1,
         )
+        return df.drop_duplicates(
+            subset=df.columns[df.columns.str.endswith("-id")].difference(["endpoint_group-id"])
+        ).reset_index(drop=True)
 
     def build_df(self) -> pd.DataFrame:
         df = EndpointFlatDataPivotExporter().get_df(
@@ -1,14 +1,15 @@
 from typing import Any
 
-import numpy as np
 import pandas as pd
 from django.apps import apps
+from django.core.cache import cache
 from django.db import models, transaction
 from django.db.models import Case, F, Max, Min, OuterRef, QuerySet, Subquery, Value, When
 from django.db.models.functions import Concat
 from rest_framework.serializers import ValidationError
 
 from ..assessment.models import Assessment, DoseUnits
+from ..common.helper import cacheable
 from ..common.models import BaseManager, get_distinct_charfield, get_distinct_charfield_opts
 from ..vocab.constants import VocabularyTermType
 from ..vocab.models import Term
@@ -105,12 +106,78 @@ class DosingRegimeManager(BaseManager):
     assessment_relation = "dosed_animals__experiment__study__assessment"
 
 
+class DoseGroupQuerySet(QuerySet):
+    def delete(self):
+        # resolve assessments once, instead of for each deleted dose group
+        assessment_ids = set(
+            self.values_list(
+                "dose_regime__dosed_animals__experiment__study__assessment_id", flat=True
+            ).distinct()
+        )
+        deleted = super().delete()
+        for assessment_id in assessment_ids - {None}:
+            self.model.objects.bust_dose_table(assessment_id)
+        return deleted
+
+
 class DoseGroupManager(BaseManager):
     assessment_relation = "dose_regime__dosed_animals__experiment__study__assessment"
 
+    def get_queryset(self):
+        return DoseGroupQuerySet(self.model, using=self._db)
+
     def by_dose_regime(self, dose_regime):
         return self.filter(dose_regime=dose_regime)
 
+    @staticmethod
+    def _dose_table_key(assessment_id: int) -> str:
+        return f"assessment-{assessment_id}-bioassay-dose-groups"
+
+    def dose_table(self, assessment_id: int) -> pd.DataFrame:
+        """Returns all dose groups in an assessment, from cache if possible.
+
+        The table has one row per dose regime, dose unit, and dose group, sorted by dose regime,
+        dose unit name, and dose group; it is shared between exports and must not be mutated.
+
+        Args:
+            assessment_id (int): an assessment ID
+        """
+
+        def get_df() -> pd.DataFrame:
+            values = dict(
+                dose_regime_id="dose_regime_id",
+                dose_units_id="dose_units_id",
+                dose_units__name="dose_units_name",
+                dose_group_id="dose_group_id",
+                dose="dose",
+                dose_regime__dosed_animals__experiment__study__published="published",
+            )
+            qs = (
+                self.filter(
+                    dose_regime__dosed_animals__experiment__study__assessment_id=assessment_id
+                )
+                .values_list(*values.keys())
+                .order_by("dose_regime_id", "dose_units__name", "dose_units_id", "dose_group_id")
+            )
+            df = pd.DataFrame(data=list(qs), columns=list(values.values()))
+            # set types explicitly so that an empty table can be merged like a populated one
+            return df.astype(
+                dict(
+                    dose_regime_id="int64",
+                    dose_units_id="int64",
+                    dose_units_name="object",
+                    dose_group_id="int64",
+                    dose="float64",
+                    published="bool",
+                )
+            )
+
+        return cacheable(get_df, self._dose_table_key(assessment_id))
+
+    def bust_dose_table(self, assessment_id: int):
+        """Invalidate the cached dose group table for an assessment."""
+        cache.delete(self._dose_table_key(assessment_id))
+
 
 class EndpointQuerySet(QuerySet):
     def annotate_dose_values(self, dose_units: DoseUnits | None = None) -> QuerySet:
@@ -183,6 +250,25 @@ class EndpointQuerySet(QuerySet):
             self.filter(animal_group__experiment__study__published=True) if published_only else self
         )
 
+    def optimized_for_serialization(self):
+        return self.select_related(
+            "assessment",
+            "animal_group__experiment__dtxsid",
+            "animal_group__experiment__study",
+            "animal_group__species",
+            "animal_group__strain",
+        ).prefetch_related(
+            "bmd_sessions",
+            "effects",
+            "groups",
+            "animal_group__parents",
+            "animal_group__siblings",
+            "animal_group__children",
+            "animal_group__dosing_regime__doses__dose_units",
+            "animal_group__experiment__study__searches",
+            "animal_group__experiment__study__identifiers",
+        )
+
 
 class EndpointManager(BaseManager):
     assessment_relation = "assessment"
@@ -269,61 +355,51 @@ class EndpointManager(BaseManager):
         )
 
         # get dose regime values
-        filters = dict(dose_regime__dosed_animals__experiment__study__assessment=assessment)
-        values = dict(
-            dose_regime_id="dose regime id",
-            dose_units_id="dose units id",
-            dose_units__name="dose units name",
-            dose_group_id="dose_group_id",
-            dose="dose",
+        assessment_id = assessment.id if isinstance(assessment, Assessment) else assessment
+        df3 = (
+            DoseGroup.objects.dose_table(assessment_id)
+            .drop(columns="published")
+            .rename(
+                columns=dict(
+                    dose_regime_id="dose regime id",
+                    dose_units_id="dose units id",
+                    dose_units_name="dose units name",
+                )
+            )
         )
-        qs = DoseGroup.objects.filter(**filters).values_list(*values.keys())
-        df3 = pd.DataFrame(data=qs, columns=values.values())
 
         # merge dose units and endpoint id
         subset = df3[["dose regime id", "dose units id", "dose units name"]].drop_duplicates()
-        df4 = (
-            df1.set_index("dose regime id")
-            .merge(
-                subset.set_index("dose regime id")[["dose units name", "dose units id"]],
-                how="left",
-                left_index=True,
-                right_index=True,
-            )
-            .set_index("dose units id", append=True)
-        )
+        df4 = df1.merge(subset, how="left", on="dose regime id")
 
-        # fetch all the dose units tested
+        # fetch all the dose units tested; the table is sorted by dose group
+        labels = {
+            el: str(int(el)) if el.is_integer() else str(el) for el in df3["dose"].unique().tolist()
+        }
         doses = (
-            df3.sort_values("dose_group_id")
-            .groupby(["dose regime id", "dose units id"])
-            .agg(
-                dict(
-                    dose=lambda els: ", ".join(
-                        str(int(el)) if el.is_integer() else str(el) for el in els
-                    )
-                )
-            )
-            .rename(columns=dict(dose="doses"))[["doses"]]
+            df3.assign(doses=df3["dose"].map(labels))
+            .groupby(["dose regime id", "dose units id"], as_index=False)["doses"]
+            .agg(", ".join)
+        )
+        df4 = df4.merge(doses, how="left", on=["dose regime id", "dose units id"])
+
+        # replace {NOEL, LOEL, FEL} dose group index with values; unmatched indexes (including
+        # -999, no level selected) resolve to NaN
+        keys = ["dose regime id", "dose units id"]
+        group_doses = df3[[*keys, "dose_group_id", "dose"]].drop_duplicates(
+            subset=[*keys, "dose_group_id"]
         )
-        df4 = df4.merge(doses, how="left", left_index=True, right_index=True)
-
-        # replace {NOEL, LOEL, FEL} dose group index with values
-        def get_doses(r, col):
-            el = r[col]
-            if el == -999:
-                return np.nan
-            try:
-                return df3.loc[(r["dose regime id"], r["dose units id"], el), "dose"]
-            except KeyError:
-                return np.nan
-
-        df3 = df3.reset_index().set_index(["dose regime id", "dose units id", "dose_group_id"])
-
-        df4 = df4.reset_index()
-        df4.loc[:, "noel"] = df4.apply(get_doses, axis=1, args=("noel",))
-        df4.loc[:, "loel"] = df4.apply(get_doses, axis=1, args=("loel",))
-        df4.loc[:, "fel"] = df4.apply(get_doses, axis=1, args=("fel",))
+        for col in ["noel", "loel", "fel"]:
+            df4[col] = (
+                df4[[*keys, col]]
+                .merge(
+                    group_doses,
+                    how="left",
+                    left_on=[*keys, col],
+                    right_on=[*keys, "dose_group_id"],
+                )["dose"]
+                .to_numpy()
+            )
         df4 = df4.drop(columns="dose regime id").set_index(["endpoint id", "dose units id"])
 
         # merge everything together
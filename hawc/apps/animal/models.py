@@ -142,9 +142,7 @@ class Experiment(models.Model):
 
     @classmethod
     def delete_caches(cls, ids):
-        Endpoint.delete_caches(
-            Endpoint.objects.filter(animal_group__experiment__in=ids).values_list("id", flat=True)
-        )
+        SerializerHelper.invalidate(cls, ids)
 
     def get_study(self):
         return self.study
@@ -283,9 +281,7 @@ class AnimalGroup(models.Model):
 
     @classmethod
     def delete_caches(cls, ids):
-        Endpoint.delete_caches(
-            Endpoint.objects.filter(animal_group__in=ids).values_list("id", flat=True)
-        )
+        SerializerHelper.invalidate(cls, ids)
 
     def can_delete(self) -> bool:
         # can only be deleted if dosing regime is not associated with other animal groups
@@ -438,6 +434,9 @@ class DoseGroup(models.Model):
     def __str__(self):
         return f"{self.dose} {self.dose_units}"
 
+    def get_assessment(self):
+        return self.dose_regime.get_assessment()
+
 
 class Endpoint(BaseEndpoint):
     objects = managers.EndpointManager()
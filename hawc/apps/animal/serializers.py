@@ -428,5 +428,22 @@ class DosingRegimeCleanupFieldsSerializer(DynamicFieldsMixin, serializers.ModelS
 
 
 def register_serializers():
-    SerializerHelper.add_serializer(models.AnimalGroup, AnimalGroupSerializer)
-    SerializerHelper.add_serializer(models.Endpoint, EndpointSerializer)
+    SerializerHelper.add_serializer(
+        models.AnimalGroup,
+        AnimalGroupSerializer,
+        assessment="experiment__study__assessment",
+        dependencies={
+            models.Experiment: "experiment",
+            models.DosingRegime: "dosing_regime",
+        },
+    )
+    SerializerHelper.add_serializer(
+        models.Endpoint,
+        EndpointSerializer,
+        dependencies={
+            models.Experiment: "animal_group__experiment",
+            models.AnimalGroup: "animal_group",
+            models.DosingRegime: "animal_group__dosing_regime",
+            models.EndpointGroup: "groups",
+        },
+    )
@@ -1,7 +1,11 @@
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
 from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 
+from ..assessment.models import DoseUnits
+from ..common.helper import SerializerHelper
+from ..study.models import Study
 from . import models
 
 
@@ -16,23 +20,66 @@ from . import models
 @receiver(post_save, sender=models.EndpointGroup)
 @receiver(pre_delete, sender=models.EndpointGroup)
 def invalidate_endpoint_cache(sender, instance, **kwargs):
-    instance_type = type(instance)
-    filters = {}
-    if instance_type is models.Experiment:
-        filters["animal_group__experiment"] = instance.id
-    elif instance_type is models.AnimalGroup:
-        filters["animal_group"] = instance.id
-    elif instance_type is models.DosingRegime:
-        filters["animal_group__dosing_regime"] = instance.id
-    elif instance_type is models.Endpoint:
-        ids = [instance.id]
-    elif instance_type is models.EndpointGroup:
-        ids = [instance.endpoint_id]
-
-    if len(filters) > 0:
-        ids = models.Endpoint.objects.filter(**filters).values_list("id", flat=True)
-
-    models.Endpoint.delete_caches(ids)
+    SerializerHelper.invalidate(sender, [instance.id])
+
+
+@receiver(post_save, sender=models.DosingRegime)
+@receiver(pre_delete, sender=models.DosingRegime)
+def invalidate_dose_table(sender, instance, **kwargs):
+    try:
+        assessment = instance.get_assessment()
+    except (ObjectDoesNotExist, ValueError):
+        return  # not yet related to an assessment
+    models.DoseGroup.objects.bust_dose_table(assessment.id)
+
+
+def _bust_dose_regime_table(dose_regime_id: int):
+    assessment_id = (
+        models.DosingRegime.objects.filter(id=dose_regime_id)
+        .values_list("dosed_animals__experiment__study__assessment_id", flat=True)
+        .first()
+    )
+    if assessment_id is not None:
+        models.DoseGroup.objects.bust_dose_table(assessment_id)
+
+
+@receiver(post_save, sender=models.DoseGroup)
+def invalidate_dose_group_table(sender, instance, **kwargs):
+    _bust_dose_regime_table(instance.dose_regime_id)
+
+
+@receiver(pre_delete, sender=models.DoseGroup)
+def invalidate_deleted_dose_group_table(sender, instance, origin=None, **kwargs):
+    # queryset deletes resolve assessments once, and cascades from a dosing regime
+    # invalidate the table with the regime
+    if origin is None or origin is instance:
+        _bust_dose_regime_table(instance.dose_regime_id)
+
+
+@receiver(post_save, sender=Study)
+def invalidate_dose_table_published(sender, instance, created, **kwargs):
+    # the dose table includes whether each study is published
+    initial = getattr(instance, "_initial_published", None)
+    instance._initial_published = instance.published
+    if not created and initial is not None and initial != instance.published:
+        assessment_id = instance.assessment_id
+        transaction.on_commit(lambda: models.DoseGroup.objects.bust_dose_table(assessment_id))
+
+
+@receiver(post_save, sender=DoseUnits)
+@receiver(pre_delete, sender=DoseUnits)
+def invalidate_dose_units_tables(sender, instance, created=False, **kwargs):
+    # dose tables include dose unit names, and dose groups are deleted with their units
+    if created:
+        return
+    assessment_ids = (
+        models.DoseGroup.objects.filter(dose_units=instance)
+        .values_list("dose_regime__dosed_animals__experiment__study__assessment_id", flat=True)
+        .distinct()
+    )
+    for assessment_id in assessment_ids:
+        if assessment_id is not None:
+            models.DoseGroup.objects.bust_dose_table(assessment_id)
 
 
 @receiver(post_save, sender=models.DosingRegime)
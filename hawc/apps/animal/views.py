@@ -8,7 +8,7 @@ from django.utils.decorators import method_decorator
 
 from ..assessment.models import Assessment, DoseUnits
 from ..common.forms import form_error_lis_to_ul, form_error_list_to_lis
-from ..common.helper import WebappConfig
+from ..common.helper import SerializerHelper, WebappConfig
 from ..common.views import (
     BaseCopyForm,
     BaseCreate,
@@ -177,31 +177,10 @@ class AnimalGroupDetail(UDFDetailMixin, BaseDetail):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        endpoints = (
-            self.object.endpoints.all()
-            .select_related(
-                "assessment",
-                "animal_group__experiment__dtxsid",
-                "animal_group__experiment__study",
-                "animal_group__species",
-                "animal_group__strain",
-            )
-            .prefetch_related(
-                "bmd_sessions",
-                "effects",
-                "groups",
-                "animal_group__parents",
-                "animal_group__siblings",
-                "animal_group__children",
-                "animal_group__dosing_regime__doses__dose_units",
-                "animal_group__experiment__study__searches",
-                "animal_group__experiment__study__identifiers",
-            )
-        )
         context["config"] = dict(
             id=self.object.id,
             has_dosing_regime=self.object.dosing_regime is not None,
-            endpoints=[endpoint.get_json(json_encode=False) for endpoint in endpoints],
+            endpoints=SerializerHelper.get_serialized_many(self.object.endpoints.all(), json=False),
         )
         return context
 
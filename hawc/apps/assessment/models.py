@@ -25,14 +25,15 @@ from reversion import revisions as reversion
 from treebeard.mp_tree import MP_Node
 
 from ...services.epa.dsstox import DssSubstance
+from ..common.cache import local_cache
 from ..common.exceptions import AssessmentNotFound
 from ..common.helper import SerializerHelper, cacheable, get_contrasting_text_color, new_window_a
 from ..common.models import AssessmentRootMixin, ColorField, get_private_data_storage
 from ..common.validators import FlatJSON, validate_hyperlink
-from ..materialized.models import refresh_all_mvs
+from ..materialized.models import refresh_assessment_mvs
 from ..myuser.models import HAWCUser
 from ..vocab.constants import VocabularyNamespace
-from . import constants, managers
+from . import constants, managers, snapshots
 from .permissions import AssessmentPermissions
 from .tasks import add_time_spent
 
@@ -396,40 +397,21 @@ class Assessment(models.Model):
 
     def bust_cache(self):
         """
-        Delete the cache for all objects in an assessment; look for all cases
-        where `SerializerHelper.get_serialized` is used.
+        Delete the cache for all objects in an assessment; serialized objects are invalidated
+        by incrementing the assessment's `SerializerHelper` cache generation.
         """
-        for Model, filters in [
-            (apps.get_model("animal", "Endpoint"), dict(assessment_id=self.id)),
-            (apps.get_model("epi", "Outcome"), dict(assessment_id=self.id)),
-            (
-                apps.get_model("epimeta", "MetaProtocol"),
-                dict(study__assessment_id=self.id),
-            ),
-            (
-                apps.get_model("epimeta", "MetaResult"),
-                dict(protocol__study__assessment_id=self.id),
-            ),
-            (apps.get_model("invitro", "IVEndpoint"), dict(assessment_id=self.id)),
-            (apps.get_model("mgmt", "Task"), dict(study__assessment_id=self.id)),
-            (
-                apps.get_model("riskofbias", "RiskOfBias"),
-                dict(study__assessment_id=self.id),
-            ),
-            (apps.get_model("summary", "Visual"), dict(assessment_id=self.id)),
-        ]:
-            ids = list(Model.objects.filter(**filters).values_list("id", flat=True))
-            SerializerHelper.delete_caches(Model, ids)
-
-        apps.get_model("study", "Study").delete_cache(self.id)
+        SerializerHelper.bust_generation(self.id)
+        snapshots.mark_stale(self.id)
 
         try:
             # django-redis can delete by key pattern
             cache.delete_pattern(f"assessment-{self.id}-*")
+            local_cache.invalidate(f"assessment-{self.id}-*")
         except AttributeError:
             if settings.DEBUG or settings.IS_TESTING:
                 # if debug/testing, wipe whole cache
                 cache.clear()
+                local_cache.clear()
             else:
                 # in prod, throw exception
                 raise NotImplementedError(
@@ -437,7 +419,7 @@ class Assessment(models.Model):
                 ) from None
 
         # refresh materialized views
-        refresh_all_mvs(force=True)
+        refresh_assessment_mvs(self.id)
 
     def pms_and_team_users(self) -> models.QuerySet:
         # return users that are either project managers or team members
@@ -805,6 +787,19 @@ class DoseUnits(models.Model):
     def invitro_experiment_count(self):
         return self.ivexperiments.count()
 
+    def get_assessment_ids(self) -> set[int]:
+        """IDs of assessments with data or visuals which use these dose units."""
+        querysets = [
+            self.dosegroup_set.values_list(
+                "dose_regime__dosed_animals__experiment__study__assessment_id", flat=True
+            ),
+            self.exposure_set.values_list("study_population__study__assessment_id", flat=True),
+            self.ivexperiments.values_list("study__assessment_id", flat=True),
+            self.bmd_sessions.values_list("endpoint__assessment_id", flat=True),
+            self.visual_set.values_list("assessment_id", flat=True),
+        ]
+        return {id for qs in querysets for id in qs.distinct() if id is not None}
+
 
 class Species(models.Model):
     objects = managers.SpeciesManager()
@@ -1075,6 +1070,9 @@ class DatasetRevision(models.Model):
     def __str__(self) -> str:
         return f"{self.dataset}: v{self.version}"
 
+    def get_assessment(self) -> Assessment:
+        return self.dataset.get_assessment()
+
     def get_api_data_url(self) -> str:
         return reverse("assessment:api:dataset-version", args=(self.dataset_id, self.version))
 
@@ -1240,7 +1238,7 @@ class Content(models.Model):
 
     def clear_cache(self):
         key = self.get_cache_key(self.content_type)
-        cache.delete(key)
+        local_cache.delete(key)
 
     @property
     def template_truncated(self):
@@ -1260,11 +1258,12 @@ class Content(models.Model):
         the current context provided, cache, and return.
         """
         key = cls.get_cache_key(content_type)
-        context = RequestContext(request, context)
-        content = cls.objects.get(content_type=content_type)
-        html = Template(content.template).render(context)
-        cache_html = cacheable(lambda: html, key, cache_duration=settings.CACHE_10_MIN)
-        return cache_html
+
+        def render() -> str:
+            content = cls.objects.get(content_type=content_type)
+            return Template(content.template).render(RequestContext(request, context))
+
+        return cacheable(render, key, cache_duration=settings.CACHE_10_MIN, local=True)
 
 
 class Label(AssessmentRootMixin, MP_Node):
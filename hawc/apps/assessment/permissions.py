@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import typing
 
-from django.core.cache import cache
 from pydantic import BaseModel
 
+from ..common.cache import local_cache
 from ..common.helper import cacheable
 
 if typing.TYPE_CHECKING:
@@ -26,7 +26,7 @@ class AssessmentPermissions(BaseModel):
     @classmethod
     def clear_cache(cls, assessment_id: int):
         key = cls.get_cache_key(assessment_id)
-        cache.delete(key)
+        local_cache.delete(key)
 
     @classmethod
     def get(cls, assessment) -> typing.Self:
@@ -41,7 +41,7 @@ class AssessmentPermissions(BaseModel):
                 reviewers={user.id for user in assessment.reviewers.all()},
             )
 
-        perms = cacheable(get_perms, key)
+        perms = cacheable(get_perms, key, lock=True, local=True)
         return perms
 
     def project_manager_or_higher(self, user: HAWCUser) -> bool:
@@ -1,11 +1,13 @@
 import logging
 
 from django.apps import apps
-from django.db.models.signals import post_save
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Model
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 
 from ..common.helper import SerializerHelper
-from . import models
+from . import models, snapshots
 
 logger = logging.getLogger(__name__)
 
@@ -38,3 +40,35 @@ def invalidate_endpoint_cache(sender, instance, **kwargs):
     SerializerHelper.clear_cache(
         apps.get_model("animal", "Endpoint"), {"assessment_id": instance.id}
     )
+
+
+def _in_snapshot(model: type[Model]) -> bool:
+    return model._meta.app_label in snapshots.SNAPSHOT_APPS and hasattr(model, "get_assessment")
+
+
+def mark_export_snapshots_stale(sender, instance, origin=None, **kwargs):
+    if not snapshots.is_enabled():
+        return
+    if isinstance(origin, Model) and origin is not instance and _in_snapshot(type(origin)):
+        return  # deleted in a cascade; the object whose deletion cascaded marks snapshots stale
+    try:
+        assessment = instance.get_assessment()
+    except (ObjectDoesNotExist, ValueError):
+        return  # not yet related to an assessment
+    if assessment is not None:
+        snapshots.mark_stale(assessment.id)
+
+
+for model in apps.get_models():
+    if _in_snapshot(model):
+        post_save.connect(mark_export_snapshots_stale, sender=model)
+        pre_delete.connect(mark_export_snapshots_stale, sender=model)
+
+
+@receiver(post_save, sender=models.DoseUnits)
+def mark_dose_units_snapshots_stale(sender, instance, created, **kwargs):
+    # exports include dose unit names
+    if created or not snapshots.is_enabled():
+        return
+    for assessment_id in instance.get_assessment_ids():
+        snapshots.mark_stale(assessment_id)
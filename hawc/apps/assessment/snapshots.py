@@ -0,0 +1,259 @@
+"""
+Precomputed exports of published assessment data.
+
+Public "download all data" exports are expensive to build; snapshots are built in a celery task
+after assessment data changes have settled, written to private storage with a content hash, and
+served directly until the next data change.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.http import FileResponse, HttpRequest, HttpResponse, HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.text import slugify
+
+from ..common.helper import FlatExport
+from ..common.models import get_private_data_storage
+from ..common.renderers import (
+    PandasCsvRenderer,
+    PandasJsonRenderer,
+    PandasParquetRenderer,
+    PandasTsvRenderer,
+    PandasXlsxRenderer,
+)
+
+logger = logging.getLogger(__name__)
+
+# apps which contain data included in a snapshot; changes to these models mark snapshots stale
+SNAPSHOT_APPS = {"animal", "epi", "epiv2", "invitro", "study"}
+
+
+def _animal(assessment) -> FlatExport:
+    from ..animal import exports, models
+
+    qs = models.Endpoint.objects.get_qs(assessment).published_only(True)
+    return exports.EndpointGroupFlatComplete(
+        qs, filename=f"{assessment}-bioassay-complete", assessment=assessment
+    ).build_export()
+
+
+def _epi(assessment) -> FlatExport:
+    from ..epi import exports, models
+
+    qs = models.Outcome.objects.published(assessment)
+    return exports.OutcomeComplete(qs, filename=f"{assessment}-epi").build_export()
+
+
+def _epiv2(assessment) -> FlatExport:
+    from ..epiv2 import exports, models
+
+    qs = models.DataExtraction.objects.get_qs(assessment).published_only(True).complete()
+    return exports.EpiV2Exporter.flat_export(qs, filename=f"{assessment}-epi")
+
+
+def _invitro(assessment) -> FlatExport:
+    from ..invitro import exports, models
+
+    qs = models.IVEndpoint.objects.published(assessment).order_by("id")
+    return exports.DataPivotEndpoint(
+        qs, filename=f"{assessment}-invitro", assessment=assessment
+    ).build_export()
+
+
+BUILDERS: dict[str, Callable[..., FlatExport]] = {
+    "animal": _animal,
+    "epi": _epi,
+    "epiv2": _epiv2,
+    "invitro": _invitro,
+}
+
+
+RENDERERS: dict[str, tuple[str, Callable[[FlatExport, HttpResponse], str | bytes]]] = {
+    "csv": (PandasCsvRenderer.media_type, PandasCsvRenderer().render_dataframe),
+    "tsv": (PandasTsvRenderer.media_type, PandasTsvRenderer().render_dataframe),
+    "xlsx": (PandasXlsxRenderer.media_type, PandasXlsxRenderer().render_dataframe),
+    "parquet": (PandasParquetRenderer.media_type, PandasParquetRenderer().render_dataframe),
+    "json": (PandasJsonRenderer.media_type, PandasJsonRenderer().render_dataframe),
+}
+
+
+def _key(assessment_id: int, name: str) -> str:
+    # not prefixed with `assessment-{id}` so that keys survive `Assessment.bust_cache`
+    return f"snapshot-{assessment_id}-{name}"
+
+
+def _path(assessment_id: int, name: str) -> str:
+    return f"snapshots/assessment-{assessment_id}/{name}"
+
+
+def is_enabled() -> bool:
+    return settings.HAWC_FEATURES.ENABLE_EXPORT_SNAPSHOTS
+
+
+def schedule(assessment_id: int):
+    """Schedule a snapshot build, unless a build is already pending.
+
+    Args:
+        assessment_id (int): assessment identifier
+    """
+    from .tasks import build_export_snapshots
+
+    if cache.add(_key(assessment_id, "scheduled"), True, settings.SNAPSHOT_SETTLE_SECONDS * 4):
+        transaction.on_commit(
+            lambda: build_export_snapshots.apply_async(
+                args=(assessment_id,), countdown=settings.SNAPSHOT_SETTLE_SECONDS
+            )
+        )
+
+
+def mark_stale(assessment_id: int):
+    """Invalidate current snapshots for an assessment and schedule a rebuild.
+
+    Args:
+        assessment_id (int): assessment identifier
+    """
+    if not is_enabled():
+        return
+    cache.delete(_key(assessment_id, "version"))
+    cache.set(_key(assessment_id, "changed"), time.time(), None)
+    schedule(assessment_id)
+
+
+def build(assessment) -> dict:
+    """Build all snapshots for an assessment and write them to private storage.
+
+    Args:
+        assessment (Assessment): the assessment
+
+    Returns:
+        dict: the snapshot manifest
+    """
+    storage = get_private_data_storage()
+    created = datetime.now(UTC).replace(microsecond=0)
+    manifest = {"created": created.isoformat(), "exports": {}}
+    for name, builder in BUILDERS.items():
+        export = builder(assessment)
+        files = {}
+        for format, (content_type, render) in RENDERERS.items():
+            content = render(export, HttpResponse())
+            if isinstance(content, str):
+                content = content.encode("utf8")
+            digest = hashlib.sha256(content).hexdigest()[:16]
+            path = _path(assessment.id, f"{name}-{digest}.{format}")
+            if not storage.exists(path):
+                storage.save(path, ContentFile(content))
+            files[format] = {"path": path, "etag": digest, "content_type": content_type}
+        manifest["exports"][name] = {"filename": slugify(export.filename), "files": files}
+
+    # remove snapshots which are no longer referenced
+    current = {f["path"] for e in manifest["exports"].values() for f in e["files"].values()}
+    _, filenames = storage.listdir(_path(assessment.id, ""))
+    for filename in filenames:
+        path = _path(assessment.id, filename)
+        if filename != "manifest.json" and path not in current:
+            storage.delete(path)
+
+    manifest_path = _path(assessment.id, "manifest.json")
+    if storage.exists(manifest_path):
+        storage.delete(manifest_path)
+    storage.save(manifest_path, ContentFile(json.dumps(manifest).encode("utf8")))
+    return manifest
+
+
+def refresh(assessment_id: int, wait: bool = True) -> float:
+    """Rebuild snapshots once changes to assessment data have settled.
+
+    Args:
+        assessment_id (int): assessment identifier
+        wait (bool, default True): if True, do not build if data changed recently
+
+    Returns:
+        float: seconds remaining until data is settled; 0 if snapshots were built
+    """
+    changed = cache.get(_key(assessment_id, "changed"), 0)
+    remaining = changed + settings.SNAPSHOT_SETTLE_SECONDS - time.time()
+    if wait and remaining > 0:
+        return remaining
+    # changes from this point forward schedule another build
+    cache.delete(_key(assessment_id, "scheduled"))
+    assessment = apps.get_model("assessment", "Assessment").objects.get(id=assessment_id)
+    manifest = build(assessment)
+    if cache.get(_key(assessment_id, "changed"), 0) == changed:
+        cache.set(_key(assessment_id, "version"), manifest["created"], None)
+    logger.info(f"Built export snapshots for assessment {assessment_id}")
+    return 0
+
+
+def get_manifest(assessment_id: int) -> dict | None:
+    """Return the manifest for an assessment if snapshots are current, else None.
+
+    Args:
+        assessment_id (int): assessment identifier
+    """
+    version = cache.get(_key(assessment_id, "version"))
+    if version is None:
+        return None
+    manifest = cache.get(_key(assessment_id, "manifest"))
+    if manifest is None or manifest["created"] != version:
+        storage = get_private_data_storage()
+        path = _path(assessment_id, "manifest.json")
+        if not storage.exists(path):
+            return None
+        with storage.open(path) as f:
+            manifest = json.load(f)
+        if manifest["created"] != version:
+            return None
+        cache.set(_key(assessment_id, "manifest"), manifest, None)
+    return manifest
+
+
+def get_response(request: HttpRequest, assessment, name: str) -> HttpResponseBase | None:
+    """Return a response serving the current snapshot, if available.
+
+    Supports conditional requests using `If-None-Match` and `If-Modified-Since` headers. If
+    snapshots are enabled but the snapshot is unavailable, a rebuild is scheduled.
+
+    Args:
+        request (HttpRequest): the request; `request.accepted_renderer` determines the format
+        assessment (Assessment): the assessment
+        name (str): the export name; a key in BUILDERS
+
+    Returns:
+        HttpResponseBase | None: A response, or None if no current snapshot exists.
+    """
+    if not is_enabled():
+        return None
+    format = getattr(request.accepted_renderer, "format", None)
+    if format not in RENDERERS:
+        return None
+    manifest = get_manifest(assessment.id)
+    if manifest is None:
+        schedule(assessment.id)
+        return None
+    export = manifest["exports"][name]
+    file = export["files"].get(format)
+    if file is None:
+        return None
+    etag = f'"{file["etag"]}"'
+    last_modified = datetime.fromisoformat(manifest["created"]).timestamp()
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(
+            get_private_data_storage().open(file["path"]), content_type=file["content_type"]
+        )
+        if format in ("xlsx", "parquet"):
+            response["Content-Disposition"] = f"attachment; filename={export['filename']}.{format}"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
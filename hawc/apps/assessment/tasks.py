@@ -2,6 +2,8 @@ from celery import shared_task
 from celery.utils.log import get_task_logger
 from django.apps import apps
 
+from . import snapshots
+
 logger = get_task_logger(__name__)
 
 
@@ -20,3 +22,11 @@ def add_time_spent(cache_name: str, object_id: int, assessment_id: int, content_
     apps.get_model("assessment", "TimeSpentEditing").add_time_spent(
         cache_name, object_id, assessment_id, content_type_id
     )
+
+
+@shared_task(bind=True)
+def build_export_snapshots(self, assessment_id: int):
+    # wait to build until data changes have settled; a build is always run if tasks are eager
+    remaining = snapshots.refresh(assessment_id, wait=not self.app.conf.task_always_eager)
+    if remaining > 0:
+        self.apply_async(args=(assessment_id,), countdown=remaining)
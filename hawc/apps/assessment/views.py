@@ -44,7 +44,6 @@ from ..common.views import (
     create_object_log,
     get_referrer,
 )
-from ..materialized.models import refresh_all_mvs
 from ..mgmt.analytics.overall import compute_object_counts
 from ..summary import models as summary_models
 from . import constants, filterset, forms, models, serializers
@@ -386,7 +385,6 @@ class AssessmentClearCache(MessageMixin, View):
             raise PermissionDenied()
 
         assessment.bust_cache()
-        refresh_all_mvs(force=True)
 
         self.send_message()
         return HttpResponseRedirect(url)
@@ -0,0 +1,274 @@
+"""
+Batch BMDS modeling, to re-execute many sessions at once.
+
+Datasets for a batch of sessions are built with a few bulk queries instead of serializing each
+endpoint. Models are executed in worker processes, or in parallel celery tasks, and results are
+saved as new sessions with bulk creates. Progress for an assessment is tracked in the cache.
+"""
+
+import multiprocessing
+import time
+import traceback
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import batched
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..animal.models import DoseGroup, Endpoint, EndpointGroup
+from ..assessment import snapshots
+from ..summary.models import Visual
+from . import bmd_interface, constants, models
+
+# number of sessions built, executed, and saved together
+BATCH_SIZE = 20
+
+
+class BatchItem(NamedTuple):
+    """The data needed to execute a session; may be sent to a worker process."""
+
+    session_id: int
+    data_type: str
+    doses: list[float]
+    groups: list[dict]
+    inputs: dict
+
+
+class BatchResult(NamedTuple):
+    session_id: int
+    outputs: dict
+    errors: dict
+    seconds: float
+
+
+def build_items(session_ids: Iterable[int]) -> list[BatchItem]:
+    """Build the data to execute each session, using bulk queries."""
+    values = (
+        "id",
+        "inputs",
+        "endpoint_id",
+        "endpoint__assessment_id",
+        "endpoint__data_type",
+        "endpoint__variance_type",
+        "endpoint__animal_group__dosing_regime_id",
+    )
+    sessions = list(
+        models.Session.objects.filter(id__in=session_ids).values_list(*values).order_by("id")
+    )
+
+    # doses for each dose regime and dose units, in dose group order
+    doses = {}
+    for assessment_id in {session[3] for session in sessions}:
+        df = DoseGroup.objects.dose_table(assessment_id)
+        doses.update(df.groupby(["dose_regime_id", "dose_units_id"])["dose"].agg(list).to_dict())
+
+    # endpoint groups for each endpoint, in dose group order
+    variance_types = {session[2]: session[5] for session in sessions}
+    groups = defaultdict(list)
+    qs = (
+        EndpointGroup.objects.filter(endpoint_id__in=variance_types.keys())
+        .values_list("endpoint_id", "n", "incidence", "response", "variance")
+        .order_by("endpoint_id", "dose_group_id")
+    )
+    for endpoint_id, n, incidence, response, variance in qs:
+        groups[endpoint_id].append(
+            dict(
+                n=n,
+                incidence=incidence,
+                response=response,
+                stdev=EndpointGroup.stdev(variance_types[endpoint_id], variance, n),
+                isReported=incidence is not None or response is not None,
+            )
+        )
+
+    items = []
+    for session_id, inputs, endpoint_id, _, data_type, _, dose_regime_id in sessions:
+        dose_units_id = inputs.get("settings", {}).get("dose_units_id")
+        items.append(
+            BatchItem(
+                session_id=session_id,
+                data_type=data_type,
+                doses=doses.get((dose_regime_id, dose_units_id), []),
+                groups=groups[endpoint_id],
+                inputs=inputs,
+            )
+        )
+    return items
+
+
+def execute_item(item: BatchItem) -> BatchResult:
+    """Execute a session; errors are returned with the result."""
+    start = time.monotonic()
+    outputs, errors = {}, {}
+    try:
+        inputs = constants.BmdInputSettings.model_validate(item.inputs)
+        dataset = bmd_interface.dataset_from_groups(
+            item.data_type, item.doses, item.groups, inputs.settings.num_doses_dropped
+        )
+        outputs = bmd_interface.execute(dataset, inputs).to_dict()
+    except Exception:
+        errors = {"traceback": traceback.format_exc()}
+    return BatchResult(item.session_id, outputs, errors, time.monotonic() - start)
+
+
+def save_results(results: list[BatchResult]) -> int:
+    """Save execution results as new sessions; returns the number of sessions created.
+
+    Each new session has the inputs of the executed session, which is unchanged and keeps its
+    outputs and selected model. As with any new session, a model must be selected before the new
+    session is made active.
+    """
+    sources = (
+        models.Session.objects.filter(id__in=[result.session_id for result in results])
+        .annotate(assessment_id=F("endpoint__assessment_id"))
+        .in_bulk()
+    )
+    now = timezone.now()
+    version = bmd_interface.version()
+    selected = constants.SelectedModel().model_dump(by_alias=True)
+    sessions = []
+    assessment_ids = set()
+    for result in results:
+        if (source := sources.get(result.session_id)) is None:
+            continue  # deleted during execution
+        sessions.append(
+            models.Session(
+                endpoint_id=source.endpoint_id,
+                dose_units_id=source.dose_units_id,
+                version=version,
+                inputs=source.inputs,
+                outputs=result.outputs,
+                errors=result.errors,
+                selected=selected,
+                date_executed=now,
+            )
+        )
+        assessment_ids.add(source.assessment_id)
+    with transaction.atomic():
+        models.Session.objects.bulk_create(sessions)
+    # bulk creates do not send signals
+    Endpoint.delete_caches({session.endpoint_id for session in sessions})
+    for assessment_id in assessment_ids:
+        Visual.bust_data_cache(assessment_id)
+        snapshots.mark_stale(assessment_id)
+    return len(sessions)
+
+
+def execute_batch(
+    session_ids: Iterable[int], executor: ProcessPoolExecutor | None = None
+) -> list[BatchResult]:
+    """Build, execute, and save a batch of sessions.
+
+    Args:
+        session_ids (Iterable[int]): sessions to execute
+        executor (ProcessPoolExecutor, optional): execute models in worker processes
+    """
+    items = build_items(session_ids)
+    results = list(executor.map(execute_item, items) if executor else map(execute_item, items))
+    save_results(results)
+    return results
+
+
+def execute_sessions(
+    session_ids: list[int],
+    workers: int = 1,
+    batch_size: int = BATCH_SIZE,
+    progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """Execute sessions in batches, optionally in worker processes.
+
+    Args:
+        session_ids (list[int]): sessions to execute
+        workers (int, default 1): number of worker processes; if 1, execute in this process
+        batch_size (int, default BATCH_SIZE): sessions saved together
+        progress (Callable, optional): called with a progress report after each batch
+
+    Returns:
+        A progress report for all sessions; see `report`.
+    """
+    start = time.monotonic()
+    executed = failed = 0
+    executor = None
+    if workers > 1:
+        # workers only run models, but must not share database connections
+        connections.close_all()
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        )
+    try:
+        for batch in batched(session_ids, batch_size, strict=False):
+            results = execute_batch(batch, executor)
+            executed += len(results)
+            failed += sum(1 for result in results if result.errors)
+            if progress:
+                progress(report(len(session_ids), executed, failed, time.monotonic() - start))
+    finally:
+        if executor:
+            executor.shutdown()
+    return report(len(session_ids), executed, failed, time.monotonic() - start)
+
+
+def report(total: int, executed: int, failed: int, seconds: float) -> dict:
+    """A progress report, including throughput in sessions per minute."""
+    return dict(
+        total=total,
+        executed=executed,
+        failed=failed,
+        seconds=round(seconds, 1),
+        per_minute=round(executed / seconds * 60, 1) if seconds > 0 else None,
+    )
+
+
+def _progress_key(assessment_id: int, name: str) -> str:
+    return f"assessment-{assessment_id}-bmd-batch-{name}"
+
+
+def start_progress(assessment_id: int, total: int):
+    """Reset progress for an assessment batch which is queued for execution."""
+    now = time.time()
+    cache.set_many(
+        {
+            _progress_key(assessment_id, "total"): total,
+            _progress_key(assessment_id, "started"): now,
+            _progress_key(assessment_id, "updated"): now,
+            _progress_key(assessment_id, "executed"): 0,
+            _progress_key(assessment_id, "failed"): 0,
+        },
+        None,
+    )
+
+
+def add_progress(assessment_id: int, results: list[BatchResult]) -> dict | None:
+    """Record executed sessions for an assessment batch; returns the updated progress."""
+    try:
+        cache.incr(_progress_key(assessment_id, "executed"), len(results))
+        cache.incr(
+            _progress_key(assessment_id, "failed"), sum(1 for result in results if result.errors)
+        )
+    except ValueError:
+        return None  # progress was cleared
+    cache.set(_progress_key(assessment_id, "updated"), time.time(), None)
+    return get_progress(assessment_id)
+
+
+def get_progress(assessment_id: int) -> dict | None:
+    """Progress for the last batch queued in an assessment, or None if unavailable.
+
+    Throughput is measured until the most recently saved batch.
+    """
+    names = ["total", "started", "updated", "executed", "failed"]
+    values = cache.get_many([_progress_key(assessment_id, name) for name in names])
+    values = {name: values.get(_progress_key(assessment_id, name)) for name in names}
+    if any(value is None for value in values.values()):
+        return None
+    return report(
+        values["total"],
+        values["executed"],
+        values["failed"],
+        values["updated"] - values["started"],
+    )
@@ -21,28 +21,42 @@ def build_dataset(endpoint: Endpoint, dose_units_id: int, n_drop_doses: int = 0)
         for dose in ds["animal_group"]["dosing_regime"]["doses"]
         if dose["dose_units"]["id"] == dose_units_id
     ]
-    grps = ds["groups"]
+    return dataset_from_groups(endpoint.data_type, doses, ds["groups"], n_drop_doses)
 
+
+def dataset_from_groups(
+    data_type: str, doses: list[float], groups: list[dict], n_drop_doses: int = 0
+) -> DatasetBase:
+    """Create a BMDS dataset from endpoint groups.
+
+    Args:
+        data_type (str): the endpoint data type
+        doses (list[float]): doses for each group, in dose group order
+        groups (list[dict]): endpoint groups, in dose group order, with `isReported`, `n`, and
+            `response` and `stdev` (continuous) or `incidence` (dichotomous) values
+        n_drop_doses (int, default 0): number of doses to drop from the top
+    """
     # only get doses where data are reported
-    doses = [d for d, grp in zip(doses, grps, strict=True) if grp["isReported"]]
+    grps = [grp for grp in groups if grp["isReported"]]
+    doses = [d for d, grp in zip(doses, groups, strict=True) if grp["isReported"]]
 
-    if endpoint.data_type == DataType.CONTINUOUS:
+    if data_type == DataType.CONTINUOUS:
         Cls = pybmds.ContinuousDataset
         kwargs = dict(
             doses=doses,
-            ns=[d["n"] for d in grps if d["isReported"]],
-            means=[d["response"] for d in grps if d["isReported"]],
-            stdevs=[d["stdev"] for d in grps if d["isReported"]],
+            ns=[d["n"] for d in grps],
+            means=[d["response"] for d in grps],
+            stdevs=[d["stdev"] for d in grps],
         )
-    elif endpoint.data_type in [DataType.DICHOTOMOUS, DataType.DICHOTOMOUS_CANCER]:
+    elif data_type in [DataType.DICHOTOMOUS, DataType.DICHOTOMOUS_CANCER]:
         Cls = pybmds.DichotomousDataset
         kwargs = dict(
             doses=doses,
-            ns=[d["n"] for d in grps if d["isReported"]],
-            incidences=[d["incidence"] for d in grps if d["isReported"]],
+            ns=[d["n"] for d in grps],
+            incidences=[d["incidence"] for d in grps],
         )
     else:
-        raise ValueError(f"Cannot create BMDS dataset for this data type: {endpoint.data_type}")
+        raise ValueError(f"Cannot create BMDS dataset for this data type: {data_type}")
 
     # drop doses from the top
     for _i in range(n_drop_doses):
@@ -59,6 +73,10 @@ def build_and_execute(endpoint, inputs):
     dataset = build_dataset(
         endpoint, inputs.settings.dose_units_id, inputs.settings.num_doses_dropped
     )
+    return execute(dataset, inputs)
+
+
+def execute(dataset: DatasetBase, inputs) -> pybmds.Session:
     session = build_session(dataset)
     inputs.add_models(session)
     session.execute_and_recommend()
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+
+from ....assessment.models import Assessment
+from ... import batch, tasks
+from ...models import Session
+
+
+class Command(BaseCommand):
+    help = """Re-execute the latest BMD session for each endpoint and dose units in an assessment.
+
+    Results are saved as new sessions; executed sessions keep their outputs and selected models
+    until a model is selected in a new session and it is made active.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("assessment", type=int, help="Assessment ID")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of worker processes used to execute models; defaults to 1",
+            default=1,
+        )
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            help=f"Number of sessions saved together; defaults to {batch.BATCH_SIZE}",
+            default=batch.BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--queue",
+            action="store_true",
+            help="Execute in parallel celery tasks instead of this process",
+        )
+        parser.add_argument(
+            "--status",
+            action="store_true",
+            help="Report progress of the last queued execution; do not execute",
+        )
+
+    def handle(self, *args, **options):
+        assessment = Assessment.objects.get(id=options["assessment"])
+        if options["status"]:
+            progress = batch.get_progress(assessment.id)
+            self.stdout.write(self.format(progress) if progress else "No execution queued")
+            return
+        if options["queue"]:
+            n = tasks.execute_assessment(assessment.id, options["batch_size"])
+            self.stdout.write(f"Queued {n} sessions in {assessment}; use --status for progress")
+            return
+        ids = list(Session.objects.latest_in_assessment(assessment.id).values_list("id", flat=True))
+        self.stdout.write(f"Executing {len(ids)} sessions in {assessment}")
+        report = batch.execute_sessions(
+            ids,
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            progress=lambda progress: self.stdout.write(self.format(progress)),
+        )
+        self.stdout.write(f"Complete; {self.format(report)}")
+
+    def format(self, progress: dict) -> str:
+        return (
+            f"{progress['executed']:,} of {progress['total']:,} sessions executed "
+            f"({progress['failed']:,} failed) in {progress['seconds']:,}s; "
+            f"{progress['per_minute'] or 0:,} per minute"
+        )
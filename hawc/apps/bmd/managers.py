@@ -1,5 +1,29 @@
+from django.db.models import QuerySet
+
+from ..animal.constants import DataType
 from ..common.models import BaseManager
 
 
 class SessionManager(BaseManager):
     assessment_relation = "endpoint__assessment"
+
+    def latest_in_assessment(self, assessment_id: int) -> QuerySet:
+        """Latest session for each endpoint and dose units in an assessment.
+
+        Legacy BMDS 2 sessions, and sessions for endpoints which cannot be modeled, are excluded.
+        """
+        ids = (
+            self.filter(
+                endpoint__assessment_id=assessment_id,
+                endpoint__data_type__in=[
+                    DataType.CONTINUOUS,
+                    DataType.DICHOTOMOUS,
+                    DataType.DICHOTOMOUS_CANCER,
+                ],
+            )
+            .exclude(version__startswith="BMDS2")
+            .order_by("endpoint_id", "dose_units_id", "-last_updated")
+            .distinct("endpoint_id", "dose_units_id")
+            .values("id")
+        )
+        return self.filter(id__in=ids).order_by("id")
@@ -1,7 +1,11 @@
-from celery import shared_task
+from itertools import batched
+
+from celery import group, shared_task
 from celery.utils.log import get_task_logger
 from django.apps import apps
 
+from . import batch
+
 logger = get_task_logger(__name__)
 
 
@@ -10,3 +14,27 @@ def execute(session_id: int):
     logger.info(f"BMD execution -> {session_id}")
     session = apps.get_model("bmd", "Session").objects.get(id=session_id)
     session.execute()
+
+
+@shared_task
+def execute_assessment(assessment_id: int, batch_size: int = batch.BATCH_SIZE) -> int:
+    """Re-execute the latest session for each endpoint and dose units in an assessment.
+
+    Batches of sessions are executed in parallel tasks; see `batch.get_progress` for progress.
+    """
+    Session = apps.get_model("bmd", "Session")
+    ids = list(Session.objects.latest_in_assessment(assessment_id).values_list("id", flat=True))
+    batch.start_progress(assessment_id, len(ids))
+    logger.info(f"BMD batch execution -> assessment {assessment_id}; {len(ids)} sessions")
+    chunks = batched(ids, batch_size, strict=False)
+    group(execute_batch.s(assessment_id, list(chunk)) for chunk in chunks).delay()
+    return len(ids)
+
+
+@shared_task
+def execute_batch(assessment_id: int, session_ids: list[int]) -> dict | None:
+    results = batch.execute_batch(session_ids)
+    progress = batch.add_progress(assessment_id, results)
+    if progress and progress["executed"] >= progress["total"]:
+        logger.info(f"BMD batch execution complete -> assessment {assessment_id}; {progress}")
+    return progress
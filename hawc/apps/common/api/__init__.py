@@ -2,4 +2,4 @@ from .filters import *  # noqa: F403
 from .mixins import *  # noqa: F403
 from .pagination import *  # noqa: F403
 from .throttling import *  # noqa: F403
-from .utils import get_published_only  # noqa: F401
+from .utils import get_published_only, get_streaming_format  # noqa: F401
@@ -2,6 +2,7 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.request import Request
 
 from ...assessment.models import Assessment
+from ..renderers import STREAMING_FORMATS
 
 
 def get_published_only(assessment: Assessment, request: Request) -> bool:
@@ -19,3 +20,18 @@ def get_published_only(assessment: Assessment, request: Request) -> bool:
     if unpublished_requested and not can_edit:
         raise PermissionDenied("You must be part of the team to view unpublished data")
     return not (can_edit and unpublished_requested)
+
+
+def get_streaming_format(request: Request) -> str | None:
+    """Get the requested streaming format, if any.
+
+    Returns the export format if the query param `stream=true` is present and the requested
+    format (`csv`, `tsv`, or `jsonl`) can be streamed; otherwise returns None.
+
+    Args:
+        request (Request): a DRF request instance
+    """
+    if request.query_params.get("stream", "").lower() != "true":
+        return None
+    format = request.query_params.get("format", "")
+    return format if format in STREAMING_FORMATS else None
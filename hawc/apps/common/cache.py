@@ -0,0 +1,113 @@
+"""
+A process-local cache tier in front of the shared django cache.
+
+Hot values which rarely change (permissions, UDF bindings, etc.) are kept in a bounded LRU
+in each worker process. Invalidations are broadcast to all workers using a redis pub/sub
+channel; if the cache backend is not redis, invalidation is local to the process. Local
+values also expire after a short timeout, bounding staleness if a message is missed.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+CHANNEL = "hawc-local-cache-invalidate"
+MISSING = object()  # sentinel for values not found in the local cache
+
+
+class LocalCache:
+    def __init__(self, maxsize: int, timeout: float):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.stats: Counter[str] = Counter()
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+        self._thread = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.timeout > 0
+
+    def _get_connection(self):
+        try:
+            return get_redis_connection("default")
+        except NotImplementedError:
+            # cache backend is not redis; invalidations are local to this process
+            return None
+
+    def _subscribe(self):
+        # start a listener in each process; after a fork, threads are not copied
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._data.clear()
+            if conn := self._get_connection():
+                pubsub = conn.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{CHANNEL: self._on_message})
+                self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def _on_message(self, message: dict):
+        pattern = message["data"]
+        self._evict(pattern.decode() if isinstance(pattern, bytes) else pattern)
+
+    def _evict(self, pattern: str):
+        with self._lock:
+            for key in [key for key in self._data if fnmatchcase(key, pattern)]:
+                del self._data[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if not self.enabled:
+            return default
+        self._subscribe()
+        with self._lock:
+            expires, value = self._data.get(key, (0, MISSING))
+            if value is MISSING or expires < time.monotonic():
+                self._data.pop(key, None)
+                self.stats["local_miss"] += 1
+                return default
+            self._data.move_to_end(key)
+            self.stats["local_hit"] += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        self._subscribe()
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, pattern: str):
+        """Remove matching keys from the local tier of all worker processes.
+
+        Args:
+            pattern (str): a key, or a glob-style pattern
+        """
+        self._evict(pattern)
+        if self.enabled and (conn := self._get_connection()):
+            conn.publish(CHANNEL, pattern)
+
+    def delete(self, key: str):
+        """Delete a key from the shared cache and from the local tier of all worker processes."""
+        cache.delete(key)
+        self.invalidate(key)
+
+    def clear(self):
+        """Clear the local tier of all worker processes."""
+        self.invalidate("*")
+
+
+local_cache = LocalCache(maxsize=settings.LOCAL_CACHE_MAXSIZE, timeout=settings.LOCAL_CACHE_TIMEOUT)
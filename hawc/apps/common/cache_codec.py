@@ -0,0 +1,127 @@
+"""
+A compact encoding for pandas DataFrames stored in the shared cache.
+
+DataFrames are stored as compressed Arrow IPC streams instead of pickles; they are several
+times smaller in redis and faster to read. Frames are only encoded if they round-trip exactly;
+others are stored as-is. Encoded sizes are recorded for recently cached keys.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+COMPRESSION = "zstd"
+NAN_COLUMNS_KEY = b"hawc_nan_columns"
+
+
+class EncodedFrame(NamedTuple):
+    """A DataFrame encoded as a compressed Arrow IPC stream."""
+
+    data: bytes
+
+
+def _string_like(values: pd.Index | pd.Series) -> bool:
+    # values which Arrow stores as strings, and which are restored unchanged
+    if isinstance(values, pd.MultiIndex):
+        return all(_string_like(level) for level in values.levels)
+    return values.dtype != object or pd.api.types.infer_dtype(values, skipna=True) in (
+        "string",
+        "empty",
+    )
+
+
+def _nan_columns(df: pd.DataFrame) -> list[int] | None:
+    # positions of object columns whose missing values are NaN, not None; Arrow reads missing
+    # values in object columns as None. Returns None if the frame cannot be encoded exactly.
+    if not (_string_like(df.columns) and _string_like(df.index)):
+        return None
+    positions = []
+    for i, (_, col) in enumerate(df.items()):
+        if col.dtype != object:
+            continue
+        if not _string_like(col):
+            return None
+        nulls = col[col.isna()]
+        if nulls.empty or all(value is None for value in nulls):
+            continue
+        if all(isinstance(value, float) for value in nulls):
+            positions.append(i)
+        else:
+            return None
+    return positions
+
+
+def encode(df: pd.DataFrame) -> EncodedFrame | pd.DataFrame:
+    """Encode a DataFrame; returns the DataFrame unchanged if it cannot be encoded exactly."""
+    if (nan_columns := _nan_columns(df)) is None:
+        return df
+    try:
+        table = pa.Table.from_pandas(df)
+    except (pa.ArrowException, TypeError, ValueError):
+        return df
+    metadata = {**table.schema.metadata, NAN_COLUMNS_KEY: ",".join(map(str, nan_columns))}
+    table = table.replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return EncodedFrame(sink.getvalue().to_pybytes())
+
+
+def decode(value: Any) -> Any:
+    """Decode a cached value; values which are not encoded are returned unchanged."""
+    if not isinstance(value, EncodedFrame):
+        return value
+    # the stream is decompressed into new buffers; converting with consolidation copies them
+    # again into writable blocks, as callers may modify the returned frame
+    table = pa.ipc.open_stream(pa.py_buffer(value.data)).read_all()
+    nan_columns = table.schema.metadata.get(NAN_COLUMNS_KEY, b"")
+    df = table.to_pandas()
+    for position in (int(i) for i in nan_columns.split(b",") if i):
+        col = df.iloc[:, position]
+        df.isetitem(position, col.where(col.notna(), np.nan))
+    return df
+
+
+class SizeStats:
+    """Sizes of recently cached DataFrames, in bytes, before and after encoding."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[int, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, key: str, raw: int, encoded: int):
+        with self._lock:
+            self._data[key] = (raw, encoded)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, key: str) -> tuple[int, int] | None:
+        with self._lock:
+            return self._data.get(key)
+
+    def summary(self) -> str:
+        with self._lock:
+            raw = sum(size[0] for size in self._data.values())
+            encoded = sum(size[1] for size in self._data.values())
+            n = len(self._data)
+        return f"frames={n}, frames_raw_mb={raw / 1e6:.1f}, frames_encoded_mb={encoded / 1e6:.1f}"
+
+
+size_stats = SizeStats(maxsize=256)
+
+
+def encode_for_cache(key: str, value: Any) -> Any:
+    """Encode a value to be cached, if it is a DataFrame, and record its size."""
+    if not isinstance(value, pd.DataFrame):
+        return value
+    encoded = encode(value)
+    raw = int(value.memory_usage(deep=True).sum())
+    size_stats.record(key, raw, len(encoded.data) if isinstance(encoded, EncodedFrame) else raw)
+    return encoded
@@ -6,7 +6,8 @@ from django.core.cache import cache
 from django.core.mail import send_mail
 from django_redis import get_redis_connection
 
-from . import tasks
+from . import cache_codec, tasks
+from .cache import local_cache
 
 
 class IntentionalException(Exception):
@@ -37,12 +38,14 @@ def diagnostic_cache(modeladmin, request, queryset):
     if cache.get("foo") is not None:
         raise RuntimeError("Cache did not successfully delete variable.")
 
-    message = "Cache test executed successfully"
+    stats = ", ".join(f"{key}={value}" for key, value in sorted(local_cache.stats.items()))
+    message = f"Cache test executed successfully; worker cache statistics: {stats or 'none'}; {cache_codec.size_stats.summary()}"
     modeladmin.message_user(request, message)
 
 
 def clear_cache(modeladmin, request, queryset):
     cache.clear()
+    local_cache.clear()
     message = "Cache cleared successfully"
     modeladmin.message_user(request, message)
 
@@ -1,8 +1,13 @@
+from collections.abc import Iterator
+from itertools import islice
+
 import pandas as pd
 from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
 from .helper import FlatExport
+from .renderers import streaming_response
 
 
 def clean_html(series: pd.Series):
@@ -190,6 +195,9 @@ class Exporter:
     and outputs a dataframe through the get_df method.
     """
 
+    # True if all `prepare_df` methods are row-independent, so the export can be built in chunks
+    streamable: bool = True
+
     def build_modules(self) -> list[ModelExport]:
         """ModelExport instances to use for exporter.
 
@@ -203,6 +211,19 @@ class Exporter:
         """
         raise NotImplementedError()
 
+    def _prepare_values(self, qs: QuerySet) -> tuple[QuerySet, list[str], list[str]]:
+        self._modules = self.build_modules()
+        for module in self._modules:
+            qs = module.prepare_qs(qs)
+        values = [value for module in self._modules for value in module.value_map.values()]
+        keys = [key for module in self._modules for key in module.value_map.keys()]
+        return qs, values, keys
+
+    def _prepare_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        for module in self._modules:
+            df = module.prepare_df(df)
+        return df
+
     def get_df(self, qs: QuerySet) -> pd.DataFrame:
         """Get dataframe export from queryset.
 
@@ -212,15 +233,33 @@ class Exporter:
         Returns:
             pd.DataFrame: Dataframe
         """
-        self._modules = self.build_modules()
-        for module in self._modules:
-            qs = module.prepare_qs(qs)
-        values = [value for module in self._modules for value in module.value_map.values()]
-        keys = [key for module in self._modules for key in module.value_map.keys()]
+        qs, values, keys = self._prepare_values(qs)
         df = pd.DataFrame(data=qs.values_list(*values), columns=keys)
-        for module in self._modules:
-            df = module.prepare_df(df)
-        return df
+        return self._prepare_df(df)
+
+    def iter_df(self, qs: QuerySet, chunk_size: int = 2000) -> Iterator[pd.DataFrame]:
+        """Get dataframe export from queryset in chunks.
+
+        Rows are fetched using a server-side cursor and each chunk is passed through the
+        `prepare_df` method of every module, so peak memory is bounded by the chunk size
+        instead of the size of the export. At least one (possibly empty) dataframe is
+        always yielded so that headers can be written.
+
+        Args:
+            qs (QuerySet): Queryset
+            chunk_size (int, default 2000): Number of rows per dataframe
+
+        Yields:
+            pd.DataFrame: Dataframe chunk
+        """
+        qs, values, keys = self._prepare_values(qs)
+        rows = qs.values_list(*values).iterator(chunk_size=chunk_size)
+        yielded = False
+        while chunk := list(islice(rows, chunk_size)):
+            yielded = True
+            yield self._prepare_df(pd.DataFrame(data=chunk, columns=keys))
+        if not yielded:
+            yield self._prepare_df(pd.DataFrame(data=[], columns=keys))
 
     @classmethod
     def build_metadata(cls, df: pd.DataFrame) -> pd.DataFrame | None:
@@ -235,3 +274,19 @@ class Exporter:
         """
         df = cls().get_df(qs)
         return FlatExport(df=df, filename=filename, metadata=cls.build_metadata(df))
+
+    @classmethod
+    def streaming_export(
+        cls, qs: QuerySet, filename: str, format: str, chunk_size: int = 2000
+    ) -> StreamingHttpResponse:
+        """Return a streaming response of the export, built chunk by chunk.
+
+        Args:
+            qs (QuerySet): the initial QuerySet
+            filename (str): the filename for the export
+            format (str): a streaming format; one of `csv`, `tsv`, or `jsonl`
+            chunk_size (int, default 2000): number of rows fetched and rendered at a time
+        """
+        if not cls.streamable:
+            raise ValueError(f"{cls.__name__} cannot be streamed")
+        return streaming_response(cls().iter_df(qs, chunk_size), filename, format)
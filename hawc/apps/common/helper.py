@@ -1,14 +1,17 @@
 import decimal
 import logging
+import random
 import re
+import time
 from collections import defaultdict
 from collections.abc import Callable, Iterable
 from io import BytesIO
 from itertools import chain
-from math import inf
+from math import inf, isnan, log
 from typing import Any, NamedTuple
 
 import pandas as pd
+import pyarrow as pa
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError as DjangoValidationError
@@ -29,6 +32,8 @@ from rest_framework.response import Response
 from rest_framework.serializers import ValidationError as DRFValidationError
 
 from ...tools.excel import get_writer, write_worksheet
+from . import cache_codec
+from .cache import MISSING, local_cache
 from .middleware import _local_thread
 
 logger = logging.getLogger(__name__)
@@ -238,9 +243,63 @@ class SerializerHelper:
     HAWC helper-object for getting serialized objects and setting cache.
     Sets cache names based on django models and primary keys automatically.
     Sets a cache using the serialized object, and also a JSON object.
+
+    Cached objects are stored with their assessment and its generation number when they were
+    serialized; incrementing the generation invalidates all serialized objects in an assessment
+    without deleting individual keys. Models may also declare dependencies; when a dependency
+    changes, only the objects which embed it are invalidated.
     """
 
     serializers = {}
+    assessment_lookups: dict[type, str | None] = {}
+    dependencies: dict[type, list[tuple[type, str]]] = defaultdict(list)
+
+    @classmethod
+    def _get_generation_name(cls, assessment_id: int) -> str:
+        # not prefixed with `assessment-{id}` so that it isn't wiped by `Assessment.bust_cache`
+        return f"serializer-generation-{assessment_id}"
+
+    @classmethod
+    def get_generations(cls, assessment_ids: Iterable[int | None]) -> dict[int | None, int | None]:
+        """Return the current cache generation for each assessment, in a single request."""
+        names = {
+            assessment_id: cls._get_generation_name(assessment_id)
+            for assessment_id in set(assessment_ids)
+            if assessment_id is not None
+        }
+        values = cache.get_many(list(names.values()))
+        generations = {None: None}
+        for assessment_id, name in names.items():
+            if name not in values:
+                # seed with a timestamp so an evicted counter never reuses an old generation
+                cache.add(name, time.time_ns(), None)
+                values[name] = cache.get(name)
+            generations[assessment_id] = values[name]
+        return generations
+
+    @classmethod
+    def get_generation(cls, assessment_id: int | None) -> int | None:
+        """Return the current cache generation for an assessment."""
+        return cls.get_generations([assessment_id])[assessment_id]
+
+    @classmethod
+    def bust_generation(cls, assessment_id: int):
+        """Invalidate all serialized objects for an assessment."""
+        name = cls._get_generation_name(assessment_id)
+        try:
+            cache.incr(name)
+        except ValueError:
+            cache.set(name, time.time_ns(), None)
+
+    @classmethod
+    def _get_assessment_id(cls, obj) -> int | None:
+        lookup = cls.assessment_lookups.get(obj.__class__)
+        if lookup is None:
+            return None
+        *path, field = lookup.split("__")
+        for attr in path:
+            obj = getattr(obj, attr)
+        return getattr(obj, f"{field}_id")
 
     @classmethod
     def _get_cache_name(cls, model, id, json=True):
@@ -249,19 +308,102 @@ class SerializerHelper:
             name += ".json"
         return name
 
+    @classmethod
+    def _unpack(cls, cached, generations: dict) -> Any:
+        # cached objects are (assessment_id, generation, data); None if missing or stale
+        if not isinstance(cached, tuple) or len(cached) != 3:
+            return None
+        assessment_id, generation, data = cached
+        if assessment_id not in generations or generations[assessment_id] != generation:
+            return None
+        return data
+
     @classmethod
     def get_serialized(cls, obj, json=True, from_cache=True):
         if from_cache:
-            name = cls._get_cache_name(obj.__class__, obj.id, json)
-            cached = cache.get(name)
-            if cached:
-                logger.debug(f"using cache: {name}")
+            model = obj.__class__
+            name = cls._get_cache_name(model, obj.id, json)
+            lookup = cls.assessment_lookups.get(model)
+            if lookup is None or "__" in lookup:
+                # the assessment is stored with the cached object; no need to walk relations
+                cached = cache.get(name)
+                assessment_id = cached[0] if isinstance(cached, tuple) else None
+                generations = cls.get_generations([assessment_id])
             else:
-                cached = cls._serialize_and_cache(obj, json=json)
-            return cached
+                # the assessment is a field on the object; get both in a single request
+                assessment_id = getattr(obj, f"{lookup}_id")
+                generation_name = cls._get_generation_name(assessment_id)
+                values = cache.get_many([name, generation_name])
+                cached = values.get(name)
+                generations = {assessment_id: values.get(generation_name)}
+            if (data := cls._unpack(cached, generations)) is not None:
+                logger.debug(f"using cache: {name}")
+                return data
+            return cls._serialize_and_cache(obj, json=json)
         else:
             return cls._serialize(obj, json=json)
 
+    @classmethod
+    def get_serialized_many(cls, queryset: QuerySet, json=True) -> list:
+        """Return serialized objects for a queryset, using the cache where possible.
+
+        Cached objects and assessment generations are fetched in a single request; objects not
+        in the cache are serialized in one pass using the queryset's `optimized_for_serialization`
+        method, if available, and written to the cache in a single request.
+
+        Args:
+            queryset (QuerySet): objects to serialize
+            json (bool, default True): return JSON strings instead of python objects
+
+        Returns:
+            list: serialized objects, in queryset order
+        """
+        model = queryset.model
+        if (lookup := cls.assessment_lookups.get(model)) is None:
+            pairs = [(id, None) for id in queryset.values_list("id", flat=True)]
+        else:
+            pairs = list(queryset.values_list("id", lookup))
+        assessment_ids = dict(pairs)
+        names = {id: cls._get_cache_name(model, id, json) for id, _ in pairs}
+        generation_names = {
+            assessment_id: cls._get_generation_name(assessment_id)
+            for assessment_id in set(assessment_ids.values())
+            if assessment_id is not None
+        }
+        values = cache.get_many([*names.values(), *generation_names.values()])
+        if all(name in values for name in generation_names.values()):
+            generations = {None: None} | {
+                assessment_id: values[name] for assessment_id, name in generation_names.items()
+            }
+        else:
+            generations = cls.get_generations(generation_names.keys())
+        results = {id: cls._unpack(values.get(name), generations) for id, name in names.items()}
+        missing = [id for id, result in results.items() if result is None]
+        if missing:
+            logger.debug(f"serializing {len(missing)} uncached {model.__name__} objects")
+            qs = model.objects.filter(id__in=missing)
+            if hasattr(qs, "optimized_for_serialization"):
+                qs = qs.optimized_for_serialization()
+            updates = {}
+            for obj in qs:
+                assessment_id = assessment_ids[obj.id]
+                generation = generations[assessment_id]
+                serialized = cls._serialize(obj, json=False)
+                json_str = JSONRenderer().render(serialized).decode("utf8")
+                updates[cls._get_cache_name(model, obj.id, False)] = (
+                    assessment_id,
+                    generation,
+                    serialized,
+                )
+                updates[cls._get_cache_name(model, obj.id, True)] = (
+                    assessment_id,
+                    generation,
+                    json_str,
+                )
+                results[obj.id] = json_str if json else serialized
+            cache.set_many(updates)
+        return [results[id] for id, _ in pairs if results[id] is not None]
+
     @classmethod
     def _serialize(cls, obj, json=False):
         serializer = cls.serializers.get(obj.__class__)
@@ -278,6 +420,10 @@ class SerializerHelper:
         name = cls._get_cache_name(obj.__class__, obj.id, json=False)
         json_name = cls._get_cache_name(obj.__class__, obj.id, json=True)
 
+        # read the generation before serializing, so changes made meanwhile aren't hidden
+        assessment_id = cls._get_assessment_id(obj)
+        generation = cls.get_generation(assessment_id)
+
         # serialize data and get json-representation
         if hasattr(obj, "optimized_for_serialization"):
             obj = obj.optimized_for_serialization()
@@ -285,7 +431,12 @@ class SerializerHelper:
         json_str = JSONRenderer().render(serialized).decode("utf8")
 
         logger.debug(f"setting cache: {name}")
-        cache.set_many({name: serialized, json_name: json_str})
+        cache.set_many(
+            {
+                name: (assessment_id, generation, serialized),
+                json_name: (assessment_id, generation, json_str),
+            }
+        )
 
         if json:
             return json_str
@@ -293,8 +444,27 @@ class SerializerHelper:
             return serialized
 
     @classmethod
-    def add_serializer(cls, model, serializer):
+    def add_serializer(
+        cls,
+        model,
+        serializer,
+        assessment: str | None = "assessment",
+        dependencies: dict[type, str] | None = None,
+    ):
+        """Register a serializer for a model.
+
+        Args:
+            model: the django model
+            serializer: the serializer class
+            assessment (str | None): lookup from the model to its assessment; None if the model
+                is not assessment-specific
+            dependencies (dict | None): models embedded in the serialized representation, and
+                the lookup from the serialized model to each; e.g. `{AnimalGroup: "animal_group"}`
+        """
         cls.serializers[model] = serializer
+        cls.assessment_lookups[model] = assessment
+        for dependency, lookup in (dependencies or {}).items():
+            cls.dependencies[dependency].append((model, lookup))
 
     @classmethod
     def delete_caches(cls, model, ids):
@@ -308,6 +478,20 @@ class SerializerHelper:
         ids = Model.objects.filter(**filters).values_list("id", flat=True)
         cls.delete_caches(Model, ids)
 
+    @classmethod
+    def invalidate(cls, model, ids):
+        """Invalidate caches for objects, and for all registered objects which embed them.
+
+        Args:
+            model: the django model
+            ids: object primary keys
+        """
+        ids = list(ids)
+        if model in cls.serializers:
+            cls.delete_caches(model, ids)
+        for dependent, lookup in cls.dependencies.get(model, []):
+            cls.clear_cache(dependent, {f"{lookup}__in": ids})
+
 
 class ReportExport(NamedTuple):
     """
@@ -342,6 +526,31 @@ class FlatExport(NamedTuple):
                 write_worksheet(writer, "metadata", self.metadata)
         return f
 
+    def to_arrow(self) -> pa.Table:
+        """Return an Arrow table of the export, preserving column dtypes where possible.
+
+        Duplicate column names are renamed inplace. Object columns which cannot be converted
+        to a single Arrow type (mixed types, nested values) are cast to strings.
+        """
+        df = rename_duplicate_columns(self.df)
+        if not all(isinstance(col, str) for col in df.columns):
+            df.columns = df.columns.map(str)
+        try:
+            return pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        df = df.copy()
+        for col in df.select_dtypes(include="object").columns:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                df[col] = df[col].map(
+                    lambda el: (
+                        el if el is None or (isinstance(el, float) and isnan(el)) else str(el)
+                    )
+                )
+        return pa.Table.from_pandas(df, preserve_index=False)
+
 
 class FlatFileExporter:
     """
@@ -512,29 +721,112 @@ class PydanticToDjangoError:
             raise ValidationError({self.field: self.msg} if self.include_field else self.msg)
 
 
+class CacheEntry(NamedTuple):
+    """
+    A value stored by `cacheable`.
+    """
+
+    value: Any
+    expires: float  # soft expiration, as a unix timestamp
+    delta: float  # seconds required to compute the value
+
+
+# maximum seconds a `cacheable` lock is held, or waited for
+CACHEABLE_LOCK_TIMEOUT = 60
+
+
+def _wait_for_entry(cache_key: str, lock_key: str, timeout: float) -> CacheEntry | None:
+    # wait for another worker holding the lock to set the cache
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        if isinstance(entry := cache.get(cache_key), CacheEntry):
+            return entry
+        if cache.get(lock_key) is None:
+            break
+    return None
+
+
 def cacheable[T](
-    callable: Callable[..., T], cache_key: str, flush: bool = False, cache_duration: int = -1, **kw
+    callable: Callable[..., T],
+    cache_key: str,
+    flush: bool = False,
+    cache_duration: int = -1,
+    lock: bool = False,
+    stale_duration: int = 0,
+    beta: float = 1.0,
+    local: bool = False,
+    **kw,
 ) -> T:
     """Get the result from cache or call method to recreate and cache.
 
+    Values are recomputed with a probability which increases as expiration approaches, so
+    that recomputation of popular keys is spread out instead of happening all at once. If
+    `lock` is True, only one worker recomputes a value at a time; other workers serve the
+    previous value if available, or wait for the result.
+
     Args:
         callable (Callable): method to evaluation if not found in cache
         cache_key (str): the cache key to get/set
         flush (bool, default False): Force flush the cache and re-evaluate.
         cache_duration (int, default -1): cache key duration; if negative, use settings.CACHE_1_HR.
+        lock (bool, default False): use a distributed lock so only one worker recomputes.
+        stale_duration (int, default 0): seconds after expiration where the previous value
+            may be served while another worker recomputes; requires `lock`.
+        beta (float, default 1.0): early expiration weight; 0 disables early expiration.
+        local (bool, default False): also cache in a process-local tier; values are shared
+            between requests and must not be mutated. Use `local_cache.delete` to invalidate.
         **kw: keyword arguments passed to callable
 
     Returns:
         The result from the callable, either from cache or regenerated.
     """
+    if local:
+        if flush:
+            local_cache.invalidate(cache_key)
+        elif (result := local_cache.get(cache_key, MISSING)) is not MISSING:
+            return result
+        result = cacheable(
+            callable, cache_key, flush, cache_duration, lock, stale_duration, beta, **kw
+        )
+        local_cache.set(cache_key, result)
+        return result
+
     if flush:
         cache.delete(cache_key)
-    result = cache.get(cache_key)
-    if result is None:
+    entry = cache.get(cache_key)
+    if not isinstance(entry, CacheEntry):
+        entry = None
+    else:
+        early = -entry.delta * beta * log(1 - random.random())  # noqa: S311
+        if time.time() + early < entry.expires:
+            local_cache.stats["shared_hit"] += 1
+            return cache_codec.decode(entry.value)
+    local_cache.stats["shared_miss"] += 1
+
+    if cache_duration < 0:
+        cache_duration = settings.CACHE_1_HR
+    lock_key = f"{cache_key}:lock"
+    locked = lock and cache.add(lock_key, True, CACHEABLE_LOCK_TIMEOUT)
+    if lock and not locked:
+        # another worker is recomputing; use the previous value or wait for a new one
+        if entry is not None:
+            return cache_codec.decode(entry.value)
+        if entry := _wait_for_entry(cache_key, lock_key, CACHEABLE_LOCK_TIMEOUT):
+            return cache_codec.decode(entry.value)
+
+    try:
+        start = time.monotonic()
         result = callable(**kw)
-        if cache_duration < 0:
-            cache_duration = settings.CACHE_1_HR
-        cache.set(cache_key, result, cache_duration)
+        entry = CacheEntry(
+            value=cache_codec.encode_for_cache(cache_key, result),
+            expires=time.time() + cache_duration,
+            delta=time.monotonic() - start,
+        )
+        cache.set(cache_key, entry, cache_duration + (stale_duration if lock else 0))
+    finally:
+        if locked:
+            cache.delete(lock_key)
     return result
 
 
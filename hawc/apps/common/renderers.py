@@ -1,9 +1,13 @@
 import json
+from collections.abc import Iterable, Iterator
 from io import BytesIO
 from typing import NamedTuple
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.utils.text import slugify
 from rest_framework import status
 from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer
@@ -115,6 +119,20 @@ class PandasJsonRenderer(PandasBaseRenderer):
         return export.df.to_json(orient="records")
 
 
+class PandasJsonLinesRenderer(PandasBaseRenderer):
+    """
+    Renders dataframe as newline-delimited JSON
+    """
+
+    media_type = "application/x-ndjson"
+    format = "jsonl"
+
+    def render_dataframe(self, export: FlatExport, response: Response) -> str:
+        if export.df.columns.has_duplicates:
+            rename_duplicate_columns(export.df)
+        return export.df.to_json(orient="records", lines=True)
+
+
 class PandasBrowsableAPIRenderer(BrowsableAPIRenderer):
     """
     Renders dataframe using the DRF browser.
@@ -176,14 +194,100 @@ class PandasXlsxRenderer(PandasBaseRenderer):
         return f.getvalue()
 
 
+class PandasParquetRenderer(PandasBaseRenderer):
+    """
+    Renders dataframe as Apache Parquet
+    """
+
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+
+    def render_dataframe(self, export: FlatExport, response: Response) -> bytes:
+        response["Content-Disposition"] = f"attachment; filename={slugify(export.filename)}.parquet"
+        f = pa.BufferOutputStream()
+        pq.write_table(export.to_arrow(), f)
+        return f.getvalue().to_pybytes()
+
+
+class PandasArrowRenderer(PandasBaseRenderer):
+    """
+    Renders dataframe as an Apache Arrow IPC stream
+    """
+
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"
+
+    def render_dataframe(self, export: FlatExport, response: Response) -> bytes:
+        response["Content-Disposition"] = f"attachment; filename={slugify(export.filename)}.arrow"
+        table = export.to_arrow()
+        f = pa.BufferOutputStream()
+        with pa.ipc.new_stream(f, table.schema) as writer:
+            writer.write_table(table)
+        return f.getvalue().to_pybytes()
+
+
 PandasRenderers = [
     PandasJsonRenderer,
     PandasHtmlRenderer,
     PandasCsvRenderer,
     PandasTsvRenderer,
+    PandasJsonLinesRenderer,
     PandasXlsxRenderer,
+    PandasParquetRenderer,
+    PandasArrowRenderer,
 ]
 
 if settings.DEBUG:
     # insert at position 1 to keep JSON the default renderer
     PandasRenderers.insert(1, PandasBrowsableAPIRenderer)
+
+
+STREAMING_FORMATS: dict[str, str] = {
+    PandasCsvRenderer.format: PandasCsvRenderer.media_type,
+    PandasTsvRenderer.format: PandasTsvRenderer.media_type,
+    PandasJsonLinesRenderer.format: PandasJsonLinesRenderer.media_type,
+}
+
+
+def render_dataframes(dfs: Iterable[pd.DataFrame], format: str) -> Iterator[str]:
+    """Render a sequence of dataframes with identical columns as a single text export.
+
+    Args:
+        dfs (Iterable[pd.DataFrame]): dataframe chunks
+        format (str): one of `csv`, `tsv`, or `jsonl`
+
+    Yields:
+        str: rendered text for each chunk; the header is only written for the first chunk
+    """
+    header = True
+    for df in dfs:
+        match format:
+            case "csv":
+                yield df.to_csv(index=False, header=header, lineterminator="\n")
+            case "tsv":
+                yield df.to_csv(index=False, header=header, sep="\t", lineterminator="\n")
+            case "jsonl":
+                if not df.empty:
+                    yield rename_duplicate_columns(df).to_json(orient="records", lines=True)
+            case _:
+                raise ValueError(f"Unsupported streaming format: {format}")
+        header = False
+
+
+def streaming_response(
+    dfs: Iterable[pd.DataFrame], filename: str, format: str
+) -> StreamingHttpResponse:
+    """Return a streaming http response of dataframe chunks rendered in the requested format.
+
+    Args:
+        dfs (Iterable[pd.DataFrame]): dataframe chunks
+        filename (str): the filename for the export, without an extension
+        format (str): one of `csv`, `tsv`, or `jsonl`
+    """
+    if format not in STREAMING_FORMATS:
+        raise ValueError(f"Unsupported streaming format: {format}")
+    response = StreamingHttpResponse(
+        render_dataframes(dfs, format), content_type=STREAMING_FORMATS[format]
+    )
+    response["Content-Disposition"] = f"attachment; filename={slugify(filename)}.{format}"
+    return response
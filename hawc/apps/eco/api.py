@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
@@ -28,7 +29,13 @@ class TermViewSet(GenericViewSet):
             df = models.NestedTerm.as_dataframe()
             return FlatExport(df=df, filename="eco-terms")
 
-        export = cacheable(get_nested, "eco:api:terms-nested", "flush" in request.query_params)
+        export = cacheable(
+            get_nested,
+            "eco:api:terms-nested",
+            "flush" in request.query_params,
+            lock=True,
+            stale_duration=settings.CACHE_1_HR,
+        )
         return Response(export)
 
 
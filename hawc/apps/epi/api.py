@@ -6,6 +6,7 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 
+from ..assessment import snapshots
 from ..assessment.api import (
     AssessmentEditViewSet,
     BaseAssessmentViewSet,
@@ -44,6 +45,8 @@ class EpiAssessmentViewSet(BaseAssessmentViewSet):
         ser = ExportQuerySerializer(data=request.query_params)
         ser.is_valid(raise_exception=True)
         published_only = get_published_only(self.assessment, request)
+        if published_only and (response := snapshots.get_response(request, self.assessment, "epi")):
+            return response
         if published_only:
             qs = models.Outcome.objects.published(self.assessment)
         else:
@@ -59,5 +59,9 @@ class MetaResultSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-SerializerHelper.add_serializer(models.MetaProtocol, MetaProtocolSerializer)
-SerializerHelper.add_serializer(models.MetaResult, MetaResultSerializer)
+SerializerHelper.add_serializer(
+    models.MetaProtocol, MetaProtocolSerializer, assessment="study__assessment"
+)
+SerializerHelper.add_serializer(
+    models.MetaResult, MetaResultSerializer, assessment="protocol__study__assessment"
+)
@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from ..assessment import snapshots
 from ..assessment.api import (
     AssessmentEditViewSet,
     BaseAssessmentViewSet,
@@ -11,7 +12,7 @@ from ..assessment.api import (
 )
 from ..assessment.constants import AssessmentViewSetPermissions
 from ..assessment.models import Assessment
-from ..common.api.utils import get_published_only
+from ..common.api.utils import get_published_only, get_streaming_format
 from ..common.helper import FlatExport, try_parse_list_ints
 from ..common.renderers import BinaryXlsxDataFormat, PandasRenderers, XlsxBinaryRenderer
 from ..common.serializers import UnusedSerializer
@@ -37,6 +38,12 @@ class EpiAssessmentViewSet(BaseAssessmentViewSet):
         assessment: Assessment = self.get_object()
         published_only = get_published_only(assessment, request)
         study_ids = try_parse_list_ints(request.query_params.get("study_ids"))
+        if (
+            published_only
+            and not study_ids
+            and (response := snapshots.get_response(request, assessment, "epiv2"))
+        ):
+            return response
         qs = (
             models.DataExtraction.objects.get_qs(assessment)
             .published_only(published_only)
@@ -44,7 +51,10 @@ class EpiAssessmentViewSet(BaseAssessmentViewSet):
         )
         if study_ids:
             qs = qs.filter(design__study__in=study_ids)
-        exporter = exports.EpiV2Exporter.flat_export(qs, filename=f"{assessment}-epi")
+        filename = f"{assessment}-epi"
+        if format := get_streaming_format(request):
+            return exports.EpiV2Exporter.streaming_export(qs, filename, format)
+        exporter = exports.EpiV2Exporter.flat_export(qs, filename=filename)
         return Response(exporter)
 
     @action(
@@ -259,6 +259,9 @@ class EpiV2Exporter(Exporter):
 
 
 class EpiV2ExporterWithRob(EpiV2Exporter):
+    # study evaluation columns are pivoted across the full dataset
+    streamable = False
+
     def study_evaluation_data(self, df: pd.DataFrame) -> pd.DataFrame:
         qs = (
             RiskOfBiasScore.objects.filter(
@@ -1,6 +1,7 @@
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from ..assessment import snapshots
 from ..assessment.api import (
     AssessmentRootedTagTreeViewSet,
     AssessmentViewSet,
@@ -41,6 +42,10 @@ class IVAssessmentViewSet(BaseAssessmentViewSet):
         self.get_object()
         ser = ExportQuerySerializer(data=request.query_params)
         ser.is_valid(raise_exception=True)
+        if get_published_only(self.assessment, request) and (
+            response := snapshots.get_response(request, self.assessment, "invitro")
+        ):
+            return response
         self.object_list = self.get_endpoint_queryset(request)
         exporter = exports.DataPivotEndpoint(
             self.object_list, filename=f"{self.assessment}-invitro", assessment=self.assessment
@@ -102,6 +102,7 @@ class ReferenceFilterSet(BaseFilterSet):
         fields=(
             ("authors_short", "authors"),
             ("year", "year"),
+            ("search_rank", "relevance"),
         ),
     )
     needs_tagging = df.BooleanFilter(
@@ -153,6 +154,12 @@ class ReferenceFilterSet(BaseFilterSet):
         ]
 
     def filter_queryset(self, queryset):
+        if not self.form.cleaned_data.get("ref_search"):
+            # relevance is only annotated when searching
+            order_by = self.form.cleaned_data.get("order_by") or []
+            self.form.cleaned_data["order_by"] = [
+                value for value in order_by if value.lstrip("-") != "relevance"
+            ]
         queryset = super().filter_queryset(queryset)
         return queryset.filter(assessment=self.assessment)
 
@@ -161,7 +168,7 @@ class ReferenceFilterSet(BaseFilterSet):
         return queryset.filter(query)
 
     def filter_search(self, queryset, name, value):
-        return queryset.full_text_search(value)
+        return queryset.full_text_search(value, rank=True).with_search_headline(value)
 
     def filter_tags(self, queryset, name, value):
         include_descendants = self.data.get("include_descendants", False)
@@ -1,3 +1,4 @@
+import codecs
 import logging
 from io import StringIO
 
@@ -210,6 +211,7 @@ class RisImportForm(SearchForm):
     RIS_EXTENSION = 'File must have an ".ris" or ".txt" file-extension'
     UNPARSABLE_RIS = "File cannot be successfully loaded. Are you sure this is a valid RIS file?  If you are, please contact us and we'll try to fix the issue."
     NO_REFERENCES = "RIS formatted incorrectly; contains 0 references"
+    VALIDATE_SIZE = 1024 * 256  # bytes
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -258,60 +260,47 @@ class RisImportForm(SearchForm):
         if fileObj.name[-4:] not in (".txt", ".ris"):
             raise forms.ValidationError(self.RIS_EXTENSION)
 
+        # only the start of the file is validated; the complete file is parsed on import
         try:
-            data = fileObj.read().decode("utf-8-sig")
+            chunk = fileObj.read(self.VALIDATE_SIZE)
+            partial = len(chunk) == self.VALIDATE_SIZE and fileObj.read(1) != b""
+            data = codecs.getincrementaldecoder("utf-8-sig")().decode(chunk, final=not partial)
         except UnicodeDecodeError as err:
             raise forms.ValidationError(self.UNPARSABLE_RIS) from err
+        finally:
+            fileObj.seek(0)
+        if partial:
+            # drop the last line, which may be incomplete
+            data = data[: data.rfind("\n") + 1]
 
         # convert BytesIO file to StringIO file
-        with StringIO() as f:
-            f.write(data)
-            f.seek(0)
-            fileObj.seek(0)
+        with StringIO(data) as f:
             readable = ris.RisImporter.file_readable(f)
 
-        if not readable:
-            raise forms.ValidationError(self.UNPARSABLE_RIS)
+            if not readable:
+                raise forms.ValidationError(self.UNPARSABLE_RIS)
 
-        # now check references
-        with StringIO() as f:
-            f.write(fileObj.read().decode("utf-8-sig"))
-            f.seek(0)
-            fileObj.seek(0)
+            # now check the first references
+            n_references = 0
             try:
-                self._references = ris.RisImporter(f).references
+                for _ in ris.RisImporter.iter_references(f):
+                    n_references += 1
             except ValueError as err:
                 raise forms.ValidationError(str(err)) from err
 
         # ensure at least one reference exists
-        if len(self._references) == 0:
+        if n_references == 0:
             raise forms.ValidationError(self.NO_REFERENCES)
 
         return fileObj
 
-    def clean(self):
-        """
-        In the clean-step, ensure RIS file is valid and references can be
-        exported from file before save method. Cache the references on the
-        instance method, so that upon import we don't need to re-read file.
-        """
-        cleaned_data = super().clean()
-        if "import_file" in cleaned_data and not self._errors:
-            # convert BytesIO file to StringIO file
-            with StringIO() as f:
-                f.write(cleaned_data["import_file"].read().decode("utf-8-sig"))
-                f.seek(0)
-                cleaned_data["import_file"].seek(0)
-                importer = ris.RisImporter(f)
-
-            self.instance._references = importer.references
-
     @transaction.atomic
     def save(self, commit=True):
         is_create = self.instance.id is None
         search = super().save(commit=commit)
         if is_create:
-            search.run_new_import()
+            # references are imported in a background task; progress is shown on search page
+            search.queue_ris_import()
         return search
 
 
@@ -1,5 +1,9 @@
-from django.core.management.base import BaseCommand
-from django.db import transaction
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, OutputWrapper
+from django.db import connections, transaction
 from django.db.models import Prefetch
 
 from .....services.utils.doi import try_get_doi
@@ -33,20 +37,66 @@ class Command(BaseCommand):
             action="store_true",
             help="Attempt to extract DOI ids from all content fields",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of worker processes used to create DOIs; defaults to 1",
+            default=1,
+        )
+        parser.add_argument(
+            "--dry_run",
+            action="store_true",
+            help="Report DOIs which would be created from existing metadata; do not save",
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
         if options["assessment"] > 0:
             assessments = Assessment.objects.filter(id=options["assessment"])
         else:
             assessments = Assessment.objects.all().order_by("id")
         if options["validate_existing"]:
-            validate_existing(self.stdout)
+            with transaction.atomic():
+                validate_existing(self.stdout)
         if options["create_from_existing"]:
-            for assessment in assessments:
-                self.stdout.write(f"Reviewing references in {assessment.id}: {assessment}")
-                qs = Reference.objects.filter(assessment=assessment)
-                Reference.extract_dois(qs, self.stdout, options["full_text"])
+            ids = list(assessments.values_list("id", flat=True))
+            args = [(id_, options["full_text"], options["dry_run"]) for id_ in ids]
+            if options["workers"] > 1:
+                # workers open their own database connections
+                connections.close_all()
+                with ProcessPoolExecutor(
+                    max_workers=options["workers"], mp_context=multiprocessing.get_context("fork")
+                ) as executor:
+                    results = executor.map(extract_dois, *zip(*args, strict=True))
+                    reports = self.write_results(results)
+            else:
+                reports = self.write_results(extract_dois(*arg) for arg in args)
+            prefix = "[dry run] " if options["dry_run"] else ""
+            self.stdout.write(
+                f"{prefix}{len(reports)} assessments reviewed; "
+                f"{sum(report['found'] for report in reports)} references with a new DOI; "
+                f"{sum(report['created'] for report in reports)} DOI identifiers created"
+            )
+
+    def write_results(self, results) -> list[dict]:
+        reports = []
+        for report, output in results:
+            self.stdout.write(output, ending="")
+            reports.append(report)
+        return reports
+
+
+def extract_dois(assessment_id: int, full_text: bool, dry_run: bool) -> tuple[dict, str]:
+    """Extract DOIs for references in an assessment; may be run in a worker process.
+
+    Returns the report from `Reference.extract_dois` and the log output.
+    """
+    output = io.StringIO()
+    logger = OutputWrapper(output)
+    assessment = Assessment.objects.get(id=assessment_id)
+    logger.write(f"Reviewing references in {assessment.id}: {assessment}")
+    qs = Reference.objects.filter(assessment=assessment)
+    report = Reference.extract_dois(qs, logger, full_text, dry_run=dry_run)
+    return report, output.getvalue()
 
 
 def validate_existing(logger):
@@ -1,15 +1,24 @@
+import hashlib
 import json
 import logging
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from datetime import datetime
+from itertools import batched, groupby
+from operator import itemgetter
 from typing import TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
 from django.apps import apps
 from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.search import SearchHeadline, SearchRank
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
+from django.db import connection, models, transaction
 from django.db.models import Count, Q, QuerySet
-from django.db.models.functions import Cast
+from django.db.models.functions import MD5, Cast
 from django.utils.timezone import now
 from taggit.managers import TaggableManager, _TaggableManager
 from taggit.utils import require_instance_manager
@@ -17,19 +26,33 @@ from taggit.utils import require_instance_manager
 from ...refml import tags as refmltags
 from ...services.epa import hero
 from ...services.nih import pubmed
-from ...services.utils.doi import get_doi_from_identifier
+from ...services.utils.doi import get_doi_from_identifier, try_get_doi
 from ..assessment.managers import published
 from ..common.helper import flatten
 from ..common.models import BaseManager, replace_null, search_query, str_m2m
 from ..study.managers import study_df_annotations
-from . import constants
+from . import constants, sql, tasks
 
 if TYPE_CHECKING:
-    from .models import Workflow
+    from .models import Identifiers, Workflow
 
 
 logger = logging.getLogger(__name__)
 
+# number of references created per query in set-based imports
+IMPORT_BATCH_SIZE = 1000
+
+# number of references merged per transaction in bulk tag conflict merges
+MERGE_BATCH_SIZE = 5000
+# merges with more references than this are run in a background task
+MERGE_ASYNC_THRESHOLD = 20_000
+
+# number of references reviewed per batch when extracting DOIs
+DOI_BATCH_SIZE = 5000
+
+# advisory lock namespace for tag count rollups; the second key is the assessment id
+TAG_COUNT_LOCK = 84_301
+
 
 class ReferenceFilterTagManager(TaggableManager):
     def __get__(self, instance, model):
@@ -48,8 +71,18 @@ class ReferenceFilterTagManager(TaggableManager):
 
 class _ReferenceFilterTagManager(_TaggableManager):
     @require_instance_manager
+    @transaction.atomic
     def set(self, tag_pks):
         # optimized to reduce queries
+        is_reference_tags = self.through is apps.get_model("lit", "ReferenceTags")
+        if is_reference_tags:
+            # lock the rollup before reading tags, so concurrent changes are counted in order
+            apps.get_model("lit", "ReferenceTagCount").objects._lock(self.instance.assessment_id)
+        previous = set(
+            self.through.objects.filter(content_object=self.instance).values_list(
+                "tag_id", flat=True
+            )
+        )
         self.clear()
 
         # make sure we're only using pks for tags with this assessment
@@ -65,6 +98,18 @@ class _ReferenceFilterTagManager(_TaggableManager):
             tagrefs.append(self.through(tag_id=tag_id, content_object=self.instance))
         self.through.objects.bulk_create(tagrefs)
 
+        if is_reference_tags:
+            apps.get_model("lit", "ReferenceTagCount").objects.apply_changes(
+                self.instance.assessment_id, [(previous, selected_tags)]
+            )
+            apps.get_model("lit", "WorkflowReference").objects.refresh(
+                self.instance.assessment_id, [self.instance.id]
+            )
+        elif isinstance(self.instance, apps.get_model("lit", "Workflow")):
+            apps.get_model("lit", "WorkflowReference").objects.invalidate(
+                self.instance.assessment_id, self.instance.id
+            )
+
 
 class SearchManager(BaseManager):
     assessment_relation = "assessment"
@@ -241,80 +286,162 @@ class IdentifiersManager(BaseManager):
     def get_queryset(self):
         return IdentifiersQuerySet(self.model, using=self._db)
 
+    def bulk_get_or_create(
+        self, database: int, contents: dict[str, str]
+    ) -> tuple[dict[str, "Identifiers"], set[str]]:
+        """Get or create identifiers for a database in a fixed number of queries.
+
+        Args:
+            database (int): the identifier database
+            contents (dict[str, str]): content for each unique_id, used if created
+
+        Returns:
+            tuple: identifiers keyed by unique_id, and the set of unique_ids which were created
+        """
+        if not contents:
+            return {}, set()
+        objs = {
+            obj.unique_id: obj
+            for obj in self.filter(database=database, unique_id__in=contents.keys())
+        }
+        missing = contents.keys() - objs.keys()
+        if missing:
+            self.bulk_create(
+                [
+                    self.model(database=database, unique_id=unique_id, content=contents[unique_id])
+                    for unique_id in missing
+                ],
+                ignore_conflicts=True,
+            )
+            objs.update(
+                (obj.unique_id, obj)
+                for obj in self.filter(database=database, unique_id__in=missing)
+            )
+        return objs, missing
+
+    def save_pubmed_content(self, contents: list[dict], fetched: datetime) -> int:
+        """Save content fetched from PubMed, writing only identifiers whose content changed.
+
+        Content is compared using an MD5 hash computed in the database, so existing content is not
+        loaded; changed identifiers are bulk updated, and others only have their fetch time updated.
+
+        Args:
+            contents (list[dict]): parsed PubMed records; see `PubMedFetch.get_content`
+            fetched (datetime): when the content was fetched
+
+        Returns:
+            int: the number of identifiers with changed content
+        """
+        idents = {
+            ident.unique_id: ident
+            for ident in self.filter(
+                database=constants.ReferenceDatabase.PUBMED,
+                unique_id__in=[str(d["PMID"]) for d in contents],
+            )
+            .annotate(content_hash=MD5("content"))
+            .only("id", "unique_id", "last_modified")
+        }
+        changed, unchanged = [], []
+        for d in contents:
+            if (ident := idents.get(str(d["PMID"]))) is None:
+                continue
+            content = json.dumps(d)
+            if (
+                hashlib.md5(content.encode(), usedforsecurity=False).hexdigest()
+                == ident.content_hash
+            ):
+                unchanged.append(ident.id)
+                continue
+            ident.content = content
+            ident.last_fetched = fetched
+            ident.last_modified = pubmed.PubMedParser.get_date_revised(d["xml"])
+            changed.append(ident)
+        with transaction.atomic():
+            self.bulk_update(
+                changed, ["content", "last_fetched", "last_modified"], batch_size=IMPORT_BATCH_SIZE
+            )
+            self.filter(id__in=unchanged).update(last_fetched=fetched)
+        return len(changed)
+
     def get_from_ris(self, search_id, references):
-        # Return a queryset of identifiers for each object in RIS file.
-        # Expensive; requires a maximum of ~5N queries
-        pimdsFetch = []
-        refs = []
+        """Get or create identifiers for each reference from an RIS file.
+
+        Identifiers are resolved for all references in a fixed number of queries per database;
+        callers should pass references in batches to bound memory use.
+
+        Args:
+            search_id (int): the search the RIS file was imported into
+            references (list[dict]): formatted references from an RIS file
+
+        Returns:
+            list[list[Identifiers]]: identifiers for each reference; the RIS identifier first
+        """
         Identifiers = apps.get_model("lit", "Identifiers")
-        for ref in references:
-            ids = []
+        accession_dbs = {
+            "wos": constants.ReferenceDatabase.WOS,
+            "scopus": constants.ReferenceDatabase.SCOPUS,
+            "emb": constants.ReferenceDatabase.EMBASE,
+        }
 
+        # determine the identifiers for each reference
+        keys = []
+        contents: dict[int, dict[str, str]] = {
+            constants.ReferenceDatabase.RIS: {},
+            constants.ReferenceDatabase.DOI: {},
+            constants.ReferenceDatabase.PUBMED: {},
+            **{db_id: {} for db_id in accession_dbs.values()},
+        }
+        for ref in references:
+            ref_keys = []
             db = ref.get("accession_db")
             if db:
                 db = db.lower()
 
-            # Create Endnote identifier
             # create id based on search_id and id from RIS file.
             id_ = f"s{search_id}-id{ref['id']}"
             content = json.dumps(ref)
-            ident = self.filter(database=constants.ReferenceDatabase.RIS, unique_id=id_).first()
-            if ident:
-                ident.content = content
-                ident.save()
-            else:
-                ident = self.create(
-                    database=constants.ReferenceDatabase.RIS, unique_id=id_, content=content
-                )
-            ids.append(ident)
+            contents[constants.ReferenceDatabase.RIS][id_] = content
+            ref_keys.append((constants.ReferenceDatabase.RIS, id_))
 
-            # create DOI identifier
-            if doi := get_doi_from_identifier(ident):
-                ident, _ = self.get_or_create(
-                    database=constants.ReferenceDatabase.DOI, unique_id=doi
-                )
-                ids.append(ident)
+            if doi := try_get_doi(ref.get("doi")):
+                contents[constants.ReferenceDatabase.DOI][doi] = ""
+                ref_keys.append((constants.ReferenceDatabase.DOI, doi))
 
-            # create PMID identifier
-            # (some may include both an accession number and PMID)
+            # some may include both an accession number and PMID
             if ref["PMID"] is not None or db == "nlm":
                 id_ = ref["PMID"] or ref["accession_number"]
                 if id_ is not None:
-                    ident = self.filter(
-                        database=constants.ReferenceDatabase.PUBMED, unique_id=str(id_)
-                    ).first()
-                    if not ident:
-                        ident = self.create(
-                            database=constants.ReferenceDatabase.PUBMED,
-                            unique_id=str(id_),
-                            content="",
-                        )
-                        pimdsFetch.append(ident)
-                    ids.append(ident)
-
-            # create other accession identifiers
-            if (
-                db is not None
-                and ref["accession_number"] is not None
-                and ref["accession_number"] != ""
-            ):
-                db_id = None
-                if db == "wos":
-                    db_id = constants.ReferenceDatabase.WOS
-                elif db == "scopus":
-                    db_id = constants.ReferenceDatabase.SCOPUS
-                elif db == "emb":
-                    db_id = constants.ReferenceDatabase.EMBASE
-
-                if db_id:
-                    id_ = ref["accession_number"]
-                    ident, _ = self.get_or_create(database=db_id, unique_id=id_, content="")
-                    ids.append(ident)
-
-            refs.append(ids)
+                    contents[constants.ReferenceDatabase.PUBMED][str(id_)] = ""
+                    ref_keys.append((constants.ReferenceDatabase.PUBMED, str(id_)))
+
+            # other accession identifiers
+            if ref["accession_number"] and (db_id := accession_dbs.get(db)):
+                contents[db_id][ref["accession_number"]] = ""
+                ref_keys.append((db_id, ref["accession_number"]))
+
+            keys.append(ref_keys)
+
+        # get or create identifiers for each database
+        objs = {}
+        pubmed_created = []
+        for database, db_contents in contents.items():
+            db_objs, created = self.bulk_get_or_create(database, db_contents)
+            objs.update({(database, unique_id): obj for unique_id, obj in db_objs.items()})
+            if database == constants.ReferenceDatabase.RIS:
+                # RIS content may have changed since a previous import
+                changed = [
+                    obj
+                    for unique_id, obj in db_objs.items()
+                    if unique_id not in created and obj.content != db_contents[unique_id]
+                ]
+                for obj in changed:
+                    obj.content = db_contents[obj.unique_id]
+                self.bulk_update(changed, ["content"])
+            elif database == constants.ReferenceDatabase.PUBMED:
+                pubmed_created = [db_objs[unique_id] for unique_id in created]
 
-        Identifiers.update_pubmed_content(pimdsFetch)
-        return refs
+        Identifiers.update_pubmed_content(pubmed_created)
+        return [[objs[key] for key in ref_keys] for ref_keys in keys]
 
     def validate_hero_ids(self, ids: list[int]) -> dict:
         """Queries HERO to return a valid list HERO content which doesn't already exist in HAWC.
@@ -546,7 +673,6 @@ class ReferenceQuerySet(models.QuerySet):
             for reference_id, tag_ids in user_qs
         }
 
-    @transaction.atomic
     def merge_tag_conflicts(
         self,
         tag_ids: list[int],
@@ -554,7 +680,28 @@ class ReferenceQuerySet(models.QuerySet):
         include_without_conflicts: bool = False,
         preview: bool = False,
         cached: bool = False,
+        progress: Callable[[int, int], None] | None = None,
     ):
+        """Bulk merge unresolved user tags for the given tags, and their descendants.
+
+        User tags are applied to references as consensus tags, using a fixed number of
+        statements for each batch of references.
+
+        Args:
+            tag_ids (list[int]): tags to merge; descendant tags are included
+            user_id (int): the user performing the merge
+            include_without_conflicts (bool, default False): include references which have
+                only one unresolved user review
+            preview (bool, default False): return references which would be merged, but do not
+                merge
+            cached (bool, default False): the queryset is already annotated and filtered, from a
+                previous preview
+            progress (Callable, optional): called with the number of references merged and the
+                total after each batch
+
+        Returns:
+            dict: with keys `merged`, `queryset`, and `message`
+        """
         # get all relevant tag ids
         ReferenceFilterTag = apps.get_model("lit", "ReferenceFilterTag")
         tags = ReferenceFilterTag.objects.filter(id__in=tag_ids)
@@ -599,103 +746,58 @@ class ReferenceQuerySet(models.QuerySet):
         if preview:
             return {"merged": False, "queryset": queryset, "message": "Preview mode enabled."}
 
-        # Now we start the bulk tag merge process! The order of the procedure below is important:
-        # 0. Filter and annotate reference queryset (done above)
-        # 1. Create new UserReferenceTag objects where necessary for the user doing these bulk merges
-        # 2. Create the UserReferenceTags through objects (i.e. add tags to the UserReferenceTag objects created in #2)
-        # 3. Create the ReferenceTags through objects (i.e. add the bulk merged tags to the reference as consensus tags)
+        # Merge in batches of references; each batch is merged in its own transaction, with a
+        # fixed number of statements. For each batch:
+        # 1. Create or update a UserReferenceTag for the user performing the bulk merge
+        # 2. Add the bulk merged tags to the UserReferenceTag
+        # 3. Add the bulk merged tags to the reference as consensus tags
         # 4. Resolve any UserReferenceTag objects where possible
-
-        # 1. Create new UserReferenceTag objects for the user performing the bulk merge
-        # Do this first since we need to continue annotating the reference queryset, and every time you annotate a
-        # queryset, it is re-evaluated. Creating these UserReferenceTag objects does not change the filters above.
+        # Steps 1-3 are a single statement; the references to merge are determined before any
+        # changes are made. See `sql.MERGE_TAG_CONFLICTS` and `sql.RESOLVE_USER_TAGS`.
+        ReferenceTagCount = apps.get_model("lit", "ReferenceTagCount")
+        WorkflowReference = apps.get_model("lit", "WorkflowReference")
         updatetime = now()
-        UserReferenceTag = apps.get_model("lit", "UserReferenceTag")
-        new_user_ref_tags = [
-            UserReferenceTag(user_id=user_id, reference_id=ref.id, last_updated=updatetime)
-            for ref in queryset
-        ]
-        # UserReferenceTags have a unique constriction on user_id & reference_id (which is good, we don't want dupes),
-        # so if it tries to insert a dupe, instead it updates the last_updated field (see update_conflicts docs).
-        UserReferenceTag.objects.bulk_create(
-            new_user_ref_tags,
-            update_conflicts=True,
-            update_fields=["last_updated"],
-            unique_fields=["user_id", "reference_id"],
-        )
-
-        # Annotate the reference queryset with the UserReferenceTag id with the user ID for the user performing
-        # this bulk merge operation, since we created these UserReferenceTag objects in the previous step.
-        bulk_user_query = UserReferenceTag.objects.filter(
-            reference=models.OuterRef("pk"), user=user_id
-        )
-        queryset = queryset.annotate(
-            bulk_user_ref_id=models.Subquery(bulk_user_query.values("pk")[:1])
-        )
-
-        # 2. Create the UserReferenceTag tag 'through' objects for the user performing the bulk merge (i.e., add the
-        # new tags to the user's UserReferenceTag). this requires the previous 'bulk_user_ref_id' annotation and the
-        # original bulk_merge_tag_id annotations.
-        UserReferenceTags = apps.get_model("lit", "UserReferenceTags")
-        new_user_ref_tag_throughs = []
-        for ref in queryset:
-            new_user_ref_tag_throughs.extend(
-                [
-                    UserReferenceTags(
-                        tag_id=bulk_merge_tag_id, content_object_id=ref.bulk_user_ref_id
-                    )
-                    for bulk_merge_tag_id in ref.bulk_merge_tags
-                ]
+        reference_ids = list(queryset.values_list("id", flat=True))
+        references = []
+        updated_user_tag_count = 0
+        for batch in batched(reference_ids, MERGE_BATCH_SIZE, strict=False):
+            plan_sql, plan_params = (
+                queryset.filter(id__in=batch)
+                .values("id", "assessment_id", "ref_tags", "bulk_merge_tags")
+                .query.sql_with_params()
             )
-        UserReferenceTags.objects.bulk_create(new_user_ref_tag_throughs, ignore_conflicts=True)
-
-        # Save the list of reference IDs in the queryset, we need them for filtering & resolving user tags later
-        # and we can't do this after we create the ReferenceTags, since the queryset will re-evaluate and be empty
-        references = list(queryset.values_list("id", flat=True))
-        queryset.update(last_updated=updatetime)  # update since bulk_create does not
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    sql.MERGE_TAG_CONFLICTS.format(plan=plan_sql),
+                    [*plan_params, user_id, updatetime, updatetime, updatetime],
+                )
+                plan = cursor.fetchall()
+                batch_ids = [row[0] for row in plan]
+                cursor.execute(sql.RESOLVE_USER_TAGS, [updatetime, batch_ids, tag_ids])
+                updated_user_tag_count += cursor.rowcount
+
+                tag_changes, changed_ids = defaultdict(list), defaultdict(list)
+                for id_, assessment_id, ref_tags, bulk_merge_tags in plan:
+                    tag_changes[assessment_id].append(
+                        (set(ref_tags), set(ref_tags) | set(bulk_merge_tags))
+                    )
+                    changed_ids[assessment_id].append(id_)
+                for assessment_id, changes in tag_changes.items():
+                    ReferenceTagCount.objects.apply_changes(assessment_id, changes)
+                    WorkflowReference.objects.refresh(assessment_id, changed_ids[assessment_id])
 
-        # 3. Create the new reference tags/consensus tags
-        ReferenceTags = apps.get_model("lit", "ReferenceTags")
-        new_tags = []
-        for ref in queryset:
-            new_tags.extend(
-                [
-                    ReferenceTags(tag_id=bulk_merge_tag_id, content_object_id=ref.id)
-                    for bulk_merge_tag_id in ref.bulk_merge_tags
-                ]
-            )
-        ReferenceTags.objects.bulk_create(new_tags, ignore_conflicts=True)
-
-        # 4. Resolve user tags where possible
-        # In order for a UserReferenceTag to be resolved:
-        # A) All the user tags must be applied as consensus/reference tags
-        # B) Has to be a user tag on a reference that we modified above (in the 'references' id list we saved)
-        # C) Must have tags
-        # D) Must be unresolved
-        # E) Must not have any deleted_tags
-        resolve_user_tags = (
-            UserReferenceTag.objects.annotate(ref_tags=ArrayAgg("reference__tags", distinct=True))
-            .filter(
-                tags__isnull=False,
-                tags__in=tag_ids,
-                reference__in=references,
-                is_resolved=False,
-                deleted_tags__len=0,
-            )
-            .filter(
-                ref_tags__contains=ArrayAgg("tags", distinct=True),
-            )
-        )
-        updated_user_tag_count = resolve_user_tags.update(is_resolved=True, last_updated=updatetime)
+            references.extend(batch_ids)
+            if progress:
+                progress(len(references), len(reference_ids))
 
         # log the changes
         Log = apps.get_model("assessment", "Log")
-        assessment_id = queryset[0].assessment_id
+        assessment_id = self.model.objects.get(id=reference_ids[0]).assessment_id
         Log.objects.create(
             assessment_id=assessment_id,
             user_id=user_id,
             message=f"""assessment.Assessment {assessment_id}: Bulk merged user tags on all references with tags: {tag_ids}.
-                        {queryset.count()} references updated and {updated_user_tag_count} user tags resolved.
+                        {len(references)} references updated and {updated_user_tag_count} user tags resolved.
                         References updated: {references}.""",
         )
         message = f"{len(references)} references updated and {updated_user_tag_count} user tags resolved. References updated: {references}"
@@ -743,21 +845,45 @@ class ReferenceQuerySet(models.QuerySet):
         ).values_list(*mapping.values())
         return pd.DataFrame(list(qs), columns=list(mapping.keys()))
 
-    def full_text_search(self, search_text: str):
+    def full_text_search(self, search_text: str, rank: bool = False):
         """Filter queryset using a full text search.
 
         Args:
             search_text: Text to use in the full text search filter.
+            rank: If True, annotate `search_rank`, the relevance of each reference to the search.
 
         Returns:
             Queryset: The filtered ReferenceQueryset
         """
-        return self.annotate(search=constants.REFERENCE_SEARCH_VECTOR).filter(
-            search=search_query(search_text)
+        query = search_query(search_text)
+        qs = self.filter(search_vector=query)
+        if rank:
+            qs = qs.annotate(search_rank=SearchRank(models.F("search_vector"), query))
+        return qs
+
+    def with_search_headline(self, search_text: str):
+        """Annotate `search_headline`, excerpts of the abstract with search terms highlighted.
+
+        Args:
+            search_text: Text used in the full text search filter.
+
+        Returns:
+            Queryset: The annotated ReferenceQueryset
+        """
+        return self.annotate(
+            search_headline=SearchHeadline(
+                "abstract",
+                search_query(search_text),
+                config="english",
+                start_sel="<mark>",
+                stop_sel="</mark>",
+                max_fragments=3,
+            )
         )
 
     def in_workflow(self, workflow: "Workflow"):
-        return self.filter(workflow.reference_filter())
+        WorkflowReference = apps.get_model("lit", "WorkflowReference")
+        return self.filter(id__in=WorkflowReference.objects.members(workflow))
 
     def with_identifiers(self):
         Identifiers = apps.get_model("lit", "Identifiers")
@@ -800,7 +926,56 @@ class ReferenceManager(BaseManager):
         logger.debug("Starting bulk creation of reference-search values")
         m2m = self.model.searches.through
         objects = [m2m(reference_id=ref.id, search_id=search.id) for ref in refs]
-        m2m.objects.bulk_create(objects)
+        m2m.objects.bulk_create(objects, ignore_conflicts=True)
+        apps.get_model("lit", "WorkflowReference").objects.invalidate(search.assessment_id)
+        apps.get_model("summary", "Visual").bust_data_cache(search.assessment_id)
+
+    def bulk_create_from_identifiers(
+        self, search, identifiers, related: dict[int, list[int]] | None = None
+    ) -> int:
+        """Create a reference for each identifier, and associate with the search.
+
+        References are created in batches; bulk_create returns primary keys on PostgreSQL, so
+        each batch requires a fixed number of queries, regardless of the number of identifiers.
+
+        Args:
+            search (Search): The search or import the references are associated with
+            identifiers (QuerySet): Identifiers which have no reference in the assessment
+            related (dict, optional): Additional identifier IDs to associate with the reference
+                created for an identifier ID
+
+        Returns:
+            int: The number of references created
+        """
+        RefSearchM2M = self.model.searches.through
+        RefIdM2M = self.model.identifiers.through
+        related = related or {}
+        assessment = search.assessment
+        n_created = 0
+        batches = batched(
+            identifiers.order_by("pk").iterator(chunk_size=IMPORT_BATCH_SIZE),
+            IMPORT_BATCH_SIZE,
+            strict=False,
+        )
+        for batch in batches:
+            refs = self.bulk_create([ident.create_reference(assessment) for ident in batch])
+            RefSearchM2M.objects.bulk_create(
+                [RefSearchM2M(reference_id=ref.id, search_id=search.id) for ref in refs]
+            )
+            RefIdM2M.objects.bulk_create(
+                [
+                    RefIdM2M(reference_id=ref.id, identifiers_id=identifier_id)
+                    for ident, ref in zip(batch, refs, strict=True)
+                    for identifier_id in [ident.id, *related.get(ident.id, [])]
+                ],
+                ignore_conflicts=True,
+            )
+            n_created += len(refs)
+        if n_created:
+            apps.get_model("lit", "WorkflowReference").objects.invalidate(search.assessment_id)
+            apps.get_model("summary", "Visual").bust_data_cache(search.assessment_id)
+        logger.debug(f"Created {n_created} references for search {search.id}")
+        return n_created
 
     def tag_pairs(self, qs):
         # get reference tag pairs
@@ -836,32 +1011,52 @@ class ReferenceManager(BaseManager):
         pubmed_map = identifiers.associated_pubmed(create=True)
         doi_map = identifiers.associated_doi(create=True)
 
-        for identifier in identifiers:
-            # check if any identifiers have a pubmed ID that already exists
-            # in database. If not, save a new reference.
-
-            if pubmed_identifier := pubmed_map.get(identifier):
-                ref = self.get_qs(search.assessment).filter(identifiers=pubmed_identifier)
-            else:
-                ref = self.none()
-
-            if ref.count() == 1:
-                ref = ref[0]
-            elif ref.count() > 1:
+        # map pubmed identifiers to existing references in this assessment
+        RefIdM2M = self.model.identifiers.through
+        pubmed_refs: dict[int, int] = {}
+        for pubmed_id, ref_id in RefIdM2M.objects.filter(
+            identifiers__in=[ident.id for ident in pubmed_map.values()],
+            reference__assessment=search.assessment,
+        ).values_list("identifiers_id", "reference_id"):
+            if pubmed_refs.setdefault(pubmed_id, ref_id) != ref_id:
                 raise Exception("Duplicate HERO reference found")
+
+        # identifiers which match an existing reference by pubmed ID are added to the reference;
+        # other identifiers create a new reference, one for each unique pubmed ID.
+        links: dict[int, list[int]] = {}  # existing reference id -> identifier ids
+        related: dict[int, list[int]] = {}  # creating identifier id -> related identifier ids
+        creator_by_pubmed: dict[int, int] = {}
+        create_ids = []
+        for identifier in identifiers:
+            pubmed_identifier = pubmed_map.get(identifier)
+            doi_identifier = doi_map.get(identifier)
+            extra = [ident.id for ident in (pubmed_identifier, doi_identifier) if ident]
+            if pubmed_identifier and pubmed_identifier.id in pubmed_refs:
+                ref_id = pubmed_refs[pubmed_identifier.id]
+                links.setdefault(ref_id, []).extend([identifier.id, *extra])
+            elif pubmed_identifier and pubmed_identifier.id in creator_by_pubmed:
+                creator_id = creator_by_pubmed[pubmed_identifier.id]
+                related[creator_id].extend([identifier.id, *extra])
             else:
-                ref = identifier.create_reference(search.assessment)
-                ref.save()
                 if pubmed_identifier:
-                    ref.identifiers.add(pubmed_identifier)
+                    creator_by_pubmed[pubmed_identifier.id] = identifier.id
+                related[identifier.id] = extra
+                create_ids.append(identifier.id)
 
-            if doi_identifier := doi_map.get(identifier):
-                ref.identifiers.add(doi_identifier)
-            ref.searches.add(search)
-            ref.identifiers.add(identifier)
-            refs.append(ref)
+        RefIdM2M.objects.bulk_create(
+            [
+                RefIdM2M(reference_id=ref_id, identifiers_id=identifier_id)
+                for ref_id, identifier_ids in links.items()
+                for identifier_id in identifier_ids
+            ],
+            ignore_conflicts=True,
+        )
+        self.build_ref_search_m2m(self.filter(id__in=links.keys()), search)
+        self.bulk_create_from_identifiers(
+            search, identifiers.filter(id__in=create_ids), related=related
+        )
 
-        return refs
+        return list(self.get_qs(search.assessment).filter(identifiers__in=identifiers).distinct())
 
     def get_overview_details(self, assessment) -> (dict[str, int], list):
         """Generates statistics for literature overview page.
@@ -881,9 +1076,12 @@ class ReferenceManager(BaseManager):
             Q(assessment=assessment) & (Q(link_conflict_resolution=True) | Q(link_tagging=True))
         )
         total = refs.count()
-        untagged_refs = refs.annotate(tag_count=models.Count("tags")).filter(tag_count=0)
-        total_untagged = untagged_refs.count()
-        total_tagged = total - total_untagged
+        # the assessment root tag's descendant count is the number of tagged references
+        ReferenceFilterTag = apps.get_model("lit", "ReferenceFilterTag")
+        ReferenceTagCount = apps.get_model("lit", "ReferenceTagCount")
+        root_id = ReferenceFilterTag.get_all_tags(assessment.id)[0]["id"]
+        total_tagged = ReferenceTagCount.objects.get_counts(assessment.id)[root_id][1]
+        total_untagged = total - total_tagged
         total_searched = refs.all().filter(searches__search_type="s").distinct().count()
         total_imported = total - total_searched
         overview = {
@@ -949,18 +1147,10 @@ class ReferenceManager(BaseManager):
             identifiers = identifiers.exclude(references__in=refs)
 
         doi_map = identifiers.associated_doi(create=True)
+        related = {ident.id: [doi.id] for ident, doi in doi_map.items()}
+        self.bulk_create_from_identifiers(search, identifiers, related=related)
 
-        # don't bulkcreate because we need the pks
-        for identifier in identifiers:
-            ref = identifier.create_reference(search.assessment)
-            ref.save()
-            ref.searches.add(search)
-            ref.identifiers.add(identifier)
-            if doi_identifier := doi_map.get(identifier):
-                ref.identifiers.add(doi_identifier)
-            refs.append(ref)
-
-        return refs
+        return list(self.get_qs(search.assessment).filter(identifiers__in=identifiers).distinct())
 
     def get_references_ready_for_import(self, assessment):
         Study = apps.get_model("study", "Study")
@@ -983,35 +1173,65 @@ class ReferenceManager(BaseManager):
     def update_from_ris_identifiers(self, search, identifiers):
         """
         Create or update Reference from list of lists of identifiers.
-        Expensive; each reference requires 4N queries.
+
+        The first identifier in each list is from the RIS file; its content is used for the
+        reference. References are matched by any identifier, and are created or updated in
+        batches, requiring a fixed number of queries per batch.
         """
+        Study = apps.get_model("study", "Study")
+        RefIdM2M = self.model.identifiers.through
+        fields = ["title", "authors_short", "authors", "year", "journal", "abstract"]
         assessment_id = search.assessment_id
-        for idents in identifiers:
-            # check if existing reference is found
-            ref = self.get_qs(assessment_id).filter(identifiers__in=idents).first()
-
-            # find ref if exists and update content
-            # first identifier is from RIS file; use this content
-            content = json.loads(idents[0].content)
-            data = dict(
-                title=content["title"],
-                authors_short=content["authors_short"],
-                authors=", ".join(content["authors"]),
-                year=content["year"],
-                journal=content["citation"],
-                abstract=content["abstract"],
-            )
-            if ref:
-                for key, value in data.items():
-                    setattr(ref, key, value)
-                ref.save()
-            else:
-                data["assessment_id"] = assessment_id
-                ref = self.create(**data)
+        for batch in batched(identifiers, IMPORT_BATCH_SIZE, strict=False):
+            # map identifiers to existing references
+            rows = RefIdM2M.objects.filter(
+                identifiers__in={ident.id for idents in batch for ident in idents},
+                reference__assessment_id=assessment_id,
+            ).values_list("identifiers_id", "reference_id")
+            existing = self.in_bulk({ref_id for _, ref_id in rows})
+            matches = {ident_id: existing[ref_id] for ident_id, ref_id in rows}
+
+            pairs = []
+            for idents in batch:
+                # find ref if exists and update content
+                # first identifier is from RIS file; use this content
+                content = json.loads(idents[0].content)
+                data = dict(
+                    title=content["title"],
+                    authors_short=content["authors_short"],
+                    authors=", ".join(content["authors"]),
+                    year=content["year"],
+                    journal=content["citation"],
+                    abstract=content["abstract"],
+                )
+                ref = next((matches[ident.id] for ident in idents if ident.id in matches), None)
+                if ref is None:
+                    ref = self.model(assessment_id=assessment_id, **data)
+                else:
+                    for key, value in data.items():
+                        setattr(ref, key, value)
+                for ident in idents:
+                    matches.setdefault(ident.id, ref)
+                pairs.append((ref, idents))
+
+            refs = list({id(ref): ref for ref, _ in pairs}.values())
+            updated = [ref for ref in refs if ref.pk is not None]
+            for ref in updated:
+                ref.last_updated = now()
+            self.bulk_update(updated, [*fields, "last_updated"])
+            self.bulk_create([ref for ref in refs if ref.pk is None])
+            Study.delete_caches([ref.id for ref in updated])
 
             # add all identifiers and searches
-            ref.identifiers.add(*idents)
-            ref.searches.add(search)
+            RefIdM2M.objects.bulk_create(
+                [
+                    RefIdM2M(reference_id=ref.id, identifiers_id=ident.id)
+                    for ref, idents in pairs
+                    for ident in idents
+                ],
+                ignore_conflicts=True,
+            )
+            self.build_ref_search_m2m(refs, search)
 
     def identifiers_dataframe(self, qs: QuerySet) -> pd.DataFrame:
         """
@@ -1132,5 +1352,270 @@ class ReferenceTagsManager(BaseManager):
         return self.get_queryset().filter(content_object__assessment_id=assessment_id)
 
 
+class ReferenceTagCountManager(BaseManager):
+    assessment_relation = "assessment"
+
+    def _ancestors(self, assessment_id: int) -> dict[int, list[int]]:
+        # map each tag to itself and its ancestors, including the assessment root
+        ReferenceFilterTag = apps.get_model("lit", "ReferenceFilterTag")
+        ancestors = {}
+
+        def recurse(tag: dict, parents: list[int]):
+            ancestors[tag["id"]] = [tag["id"], *parents]
+            for child in tag.get("children", []):
+                recurse(child, ancestors[tag["id"]])
+
+        recurse(ReferenceFilterTag.get_all_tags(assessment_id)[0], [])
+        return ancestors
+
+    def _lock(self, assessment_id: int):
+        # serialize rollup changes for an assessment until the current transaction ends
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", [TAG_COUNT_LOCK, assessment_id])
+
+    def rebuild(self, assessment_id: int) -> dict[int, tuple[int, int]]:
+        """Recount references for each tag in an assessment, replacing the existing rollup.
+
+        Requires a single pass over reference tags; this is only required after changes to the
+        tag tree, after which the rollup is invalidated. References are counted while holding
+        the assessment's rollup lock, so concurrent incremental changes are not lost.
+
+        Args:
+            assessment_id (int): assessment id
+
+        Returns:
+            dict[int, tuple[int, int]]: counts for each tag; see `get_counts`
+        """
+        ReferenceTags = apps.get_model("lit", "ReferenceTags")
+        ancestors = self._ancestors(assessment_id)
+        counts, deep_counts = Counter(), Counter()
+        pairs = (
+            ReferenceTags.objects.filter(content_object__assessment_id=assessment_id)
+            .order_by("content_object_id")
+            .values_list("content_object_id", "tag_id")
+        )
+        with transaction.atomic():
+            self._lock(assessment_id)
+            for _, group in groupby(pairs.iterator(), key=itemgetter(0)):
+                tag_ids = [tag_id for _, tag_id in group]
+                counts.update(tag_ids)
+                deep_counts.update({id_ for tag_id in tag_ids for id_ in ancestors.get(tag_id, ())})
+            self.filter(assessment_id=assessment_id).delete()
+            self.bulk_create(
+                [
+                    self.model(
+                        assessment_id=assessment_id,
+                        tag_id=tag_id,
+                        count=counts[tag_id],
+                        deep_count=deep_counts[tag_id],
+                    )
+                    for tag_id in ancestors
+                ]
+            )
+        return {tag_id: (counts[tag_id], deep_counts[tag_id]) for tag_id in ancestors}
+
+    def get_counts(self, assessment_id: int) -> dict[int, tuple[int, int]]:
+        """Return reference counts for each tag in an assessment.
+
+        Counts are read from the rollup; it is rebuilt if it was invalidated.
+
+        Args:
+            assessment_id (int): assessment id
+
+        Returns:
+            dict[int, tuple[int, int]]: for each tag ID, the number of references with the tag,
+                and the number of references with the tag or any descendant tag. The assessment
+                root tag is included; its descendant count is the number of tagged references.
+        """
+        ReferenceFilterTag = apps.get_model("lit", "ReferenceFilterTag")
+        root_id = ReferenceFilterTag.get_all_tags(assessment_id)[0]["id"]
+        counts = {
+            tag_id: (count, deep_count)
+            for tag_id, count, deep_count in self.filter(assessment_id=assessment_id).values_list(
+                "tag_id", "count", "deep_count"
+            )
+        }
+        if root_id not in counts:
+            counts = self.rebuild(assessment_id)
+        return counts
+
+    def invalidate(self, assessment_id: int):
+        """Remove the rollup for an assessment; it is rebuilt when next read."""
+        with transaction.atomic():
+            self._lock(assessment_id)
+            self.filter(assessment_id=assessment_id).delete()
+        # tag changes are made in bulk, without model signals
+        apps.get_model("summary", "Visual").bust_data_cache(assessment_id)
+
+    def apply_changes(self, assessment_id: int, changes: list[tuple[set[int], set[int]]]):
+        """Update the rollup incrementally, given changes to the tags applied to references.
+
+        Requires a fixed number of queries, regardless of the number of references changed.
+        Call in the same transaction as the tag changes; the assessment's rollup lock is held
+        until it ends, so a concurrent rebuild counts either all or none of the changes.
+
+        Args:
+            assessment_id (int): assessment id
+            changes (list[tuple[set[int], set[int]]]): for each changed reference, tag IDs
+                applied before and after the change
+        """
+        ancestors = self._ancestors(assessment_id)
+        deltas = {"count": Counter(), "deep_count": Counter()}
+        for before, after in changes:
+            deltas["count"].update(after - before)
+            deltas["count"].subtract(before - after)
+            deep_before = {id_ for tag_id in before for id_ in ancestors.get(tag_id, ())}
+            deep_after = {id_ for tag_id in after for id_ in ancestors.get(tag_id, ())}
+            deltas["deep_count"].update(deep_after - deep_before)
+            deltas["deep_count"].subtract(deep_before - deep_after)
+
+        # group tags by change to update in a few queries
+        updates = defaultdict(list)
+        for field, delta in deltas.items():
+            for tag_id, value in delta.items():
+                if value != 0 and tag_id in ancestors:
+                    updates[(field, value)].append(tag_id)
+        if not updates:
+            return
+        # tag changes are made in bulk, without model signals
+        apps.get_model("summary", "Visual").bust_data_cache(assessment_id)
+
+        with transaction.atomic():
+            self._lock(assessment_id)
+            qs = self.filter(assessment_id=assessment_id)
+            root_id = next(iter(ancestors))
+            if not qs.filter(tag_id=root_id).exists():
+                return  # rollup invalidated; it will be rebuilt when read
+
+            # rows for tags created since the rollup was built
+            tag_ids = {tag_id for ids in updates.values() for tag_id in ids}
+            self.bulk_create(
+                [self.model(assessment_id=assessment_id, tag_id=tag_id) for tag_id in tag_ids],
+                ignore_conflicts=True,
+            )
+            for (field, value), ids in updates.items():
+                qs.filter(tag_id__in=ids).update(**{field: models.F(field) + value})
+
+
+class WorkflowReferenceManager(BaseManager):
+    assessment_relation = "workflow__assessment"
+
+    def _insert(self, workflow: "Workflow", references: QuerySet):
+        # add workflow members from the given references, in a single statement
+        query = references.filter(workflow.reference_filter()).values("id").distinct()
+        refs_sql, refs_params = query.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql.INSERT_WORKFLOW_REFERENCES.format(references=refs_sql),
+                [workflow.id, *refs_params],
+            )
+
+    def rebuild(self, workflow: "Workflow") -> bool:
+        """Replace the references in a workflow, evaluating the workflow admission and removal
+        criteria against all references in the assessment.
+
+        The workflow is marked as built only if it was not invalidated during the rebuild.
+
+        Args:
+            workflow (Workflow): the workflow
+
+        Returns:
+            bool: True if the workflow was marked as built
+        """
+        Workflow = type(workflow)
+        Reference = apps.get_model("lit", "Reference")
+        with transaction.atomic():
+            version = Workflow.objects.filter(id=workflow.id).values_list(
+                "members_version", flat=True
+            )[0]
+            self.filter(workflow=workflow).delete()
+            self._insert(workflow, Reference.objects.filter(assessment_id=workflow.assessment_id))
+            built = Workflow.objects.filter(id=workflow.id, members_version=version).update(
+                members_built=True
+            )
+        workflow.members_built = built == 1
+        return workflow.members_built
+
+    def members(self, workflow: "Workflow") -> QuerySet:
+        """Return the IDs of references in a workflow.
+
+        Membership is read from the maintained table. If it was invalidated and has not been
+        rebuilt yet, the workflow criteria are evaluated instead.
+
+        Args:
+            workflow (Workflow): the workflow
+
+        Returns:
+            QuerySet: reference IDs, for use as a subquery
+        """
+        Workflow = type(workflow)
+        if Workflow.objects.filter(id=workflow.id, members_built=True).exists():
+            return self.filter(workflow=workflow).values("reference_id")
+        Reference = apps.get_model("lit", "Reference")
+        return (
+            Reference.objects.filter(assessment_id=workflow.assessment_id)
+            .filter(workflow.reference_filter())
+            .values("id")
+        )
+
+    def _rebuild_key(self, assessment_id: int) -> str:
+        return f"lit-workflow-rebuild-{assessment_id}"
+
+    def rebuild_invalid(self, assessment_id: int):
+        """Rebuild workflows in an assessment whose membership was invalidated."""
+        Workflow = apps.get_model("lit", "Workflow")
+        # invalidations from now on queue another rebuild
+        cache.delete(self._rebuild_key(assessment_id))
+        for workflow in Workflow.objects.filter(assessment_id=assessment_id, members_built=False):
+            self.rebuild(workflow)
+
+    def invalidate(self, assessment_id: int, workflow_id: int | None = None):
+        """Mark workflow membership as stale, and queue a rebuild once committed.
+
+        Args:
+            assessment_id (int): assessment id
+            workflow_id (int, optional): a single workflow; by default, all workflows in the
+                assessment
+        """
+        Workflow = apps.get_model("lit", "Workflow")
+        workflows = Workflow.objects.filter(assessment_id=assessment_id)
+        if workflow_id:
+            workflows = workflows.filter(id=workflow_id)
+        workflows.update(members_built=False, members_version=time.time_ns())
+        self.queue_rebuild(assessment_id)
+
+    def queue_rebuild(self, assessment_id: int):
+        # at most one rebuild is queued per assessment
+        if cache.add(self._rebuild_key(assessment_id), True, 60 * 10):
+            transaction.on_commit(lambda: tasks.rebuild_workflow_references.delay(assessment_id))
+
+    def refresh(self, assessment_id: int, reference_ids: list[int]):
+        """Update workflow membership for references whose tags or searches have changed.
+
+        Requires a fixed number of queries per workflow, regardless of the number of references.
+
+        Args:
+            assessment_id (int): assessment id
+            reference_ids (list[int]): references which have changed
+        """
+        Workflow = apps.get_model("lit", "Workflow")
+        Reference = apps.get_model("lit", "Reference")
+        if not reference_ids:
+            return
+        # workflows which are being rebuilt may miss these changes; they are rebuilt again
+        if Workflow.objects.filter(assessment_id=assessment_id, members_built=False).update(
+            members_version=time.time_ns()
+        ):
+            self.queue_rebuild(assessment_id)
+        workflows = list(Workflow.objects.filter(assessment_id=assessment_id, members_built=True))
+        if not workflows:
+            return
+        references = Reference.objects.filter(assessment_id=assessment_id, id__in=reference_ids)
+        with transaction.atomic():
+            self.filter(workflow__in=workflows, reference_id__in=reference_ids).delete()
+            for workflow in workflows:
+                self._insert(workflow, references)
+
+
 class UserReferenceTagsManager(BaseManager):
     assessment_relation = "content_object__reference__assessment"
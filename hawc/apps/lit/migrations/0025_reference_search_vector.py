@@ -0,0 +1,39 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("lit", "0024_workflows"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="reference",
+            name="search_vector_idx",
+        ),
+        migrations.AddField(
+            model_name="reference",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "abstract",
+                    "title",
+                    "authors",
+                    "authors_short",
+                    "year",
+                    "journal",
+                    config="english",
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reference",
+            index=django.contrib.postgres.indexes.GinIndex(
+                models.F("search_vector"), name="search_vector_idx"
+            ),
+        ),
+    ]
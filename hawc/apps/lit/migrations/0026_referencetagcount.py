@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("assessment", "0048_delete_job"),
+        ("lit", "0025_reference_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReferenceTagCount",
+            fields=[
+                (
+                    "tag",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to="lit.referencefiltertag",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0, help_text="References with this tag")),
+                (
+                    "deep_count",
+                    models.IntegerField(
+                        default=0, help_text="References with this tag or any descendant tag"
+                    ),
+                ),
+                (
+                    "assessment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="assessment.assessment",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,54 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("lit", "0026_referencetagcount"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workflow",
+            name="members_built",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                help_text="References in this workflow are current; see WorkflowReference",
+            ),
+        ),
+        migrations.CreateModel(
+            name="WorkflowReference",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "reference",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="lit.reference",
+                    ),
+                ),
+                (
+                    "workflow",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="lit.workflow",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("workflow", "reference"), name="workflow_reference"
+                    )
+                ],
+            },
+        ),
+    ]
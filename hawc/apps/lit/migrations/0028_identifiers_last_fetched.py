@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("lit", "0027_workflowreference"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="identifiers",
+            name="last_fetched",
+            field=models.DateTimeField(
+                blank=True, help_text="When content was last fetched from the database", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="identifiers",
+            name="last_modified",
+            field=models.DateField(
+                blank=True, help_text="When the record was last revised in the database", null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("lit", "0028_identifiers_last_fetched"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workflow",
+            name="members_version",
+            field=models.BigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Changed when references in this workflow are invalidated",
+            ),
+        ),
+    ]
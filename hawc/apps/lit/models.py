@@ -2,17 +2,23 @@ import html
 import json
 import logging
 import re
+import time
+from collections.abc import Callable
 from copy import copy
+from itertools import batched
 from math import ceil
 from typing import Self
 from urllib import parse
 
+import pandas as pd
 from celery import chain
 from celery.result import ResultBase
 from django.apps import apps
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.db import models, transaction
 from django.forms import MultipleChoiceField
@@ -26,7 +32,7 @@ from treebeard.mp_tree import MP_Node
 from ...constants import ColorblindColors
 from ...services.nih import pubmed
 from ...services.utils import ris
-from ...services.utils.doi import get_doi_from_identifier, try_get_doi
+from ...services.utils.doi import get_doi_field, try_get_dois
 from ..assessment.models import Log
 from ..common.helper import SerializerHelper, try_parse_list_ints, tryParseInt
 from ..common.models import (
@@ -312,84 +318,88 @@ class Search(models.Model):
             identifiers = Identifiers.objects.hero(ids)
             Reference.objects.get_hero_references(self, identifiers)
         elif self.source == constants.ReferenceDatabase.RIS:
-            # check if importer references are cached on object
-            refs = getattr(self, "_references", None)
-            if refs is None:
-                importer = ris.RisImporter(self.import_file.path)
-                refs = importer.references
-            identifiers = Identifiers.objects.get_from_ris(self.id, refs)
-            Reference.objects.update_from_ris_identifiers(self, identifiers)
+            self.import_ris_references()
         else:
             raise ValueError(f"Source type cannot be imported: {self.source}")
 
+    def import_ris_references(self, progress: Callable[[int], None] | None = None) -> int:
+        """Import references from the RIS import file.
+
+        The file is parsed as a stream, and identifiers and references are written in batches;
+        memory use is bounded by the batch size, not the file size. Each batch of references is
+        written in a transaction. Imports are idempotent; a rerun after a failure updates
+        references from batches already imported instead of duplicating them.
+
+        Args:
+            progress (Callable, optional): called with the number of references processed
+                after each batch
+
+        Raises:
+            ValueError: if a reference is in an incorrect format
+
+        Returns:
+            int: the number of references processed
+        """
+        n = 0
+        with open(self.import_file.path, encoding="utf-8-sig") as f:
+            references = ris.RisImporter.iter_references(f)
+            for batch in batched(references, managers.IMPORT_BATCH_SIZE, strict=False):
+                identifiers = Identifiers.objects.get_from_ris(self.id, batch)
+                with transaction.atomic():
+                    Reference.objects.update_from_ris_identifiers(self, identifiers)
+                n += len(batch)
+                if progress:
+                    progress(n)
+        return n
+
+    @property
+    def import_status_key(self) -> str:
+        return f"lit-search-import-{self.id}"
+
+    @property
+    def import_status(self) -> dict | None:
+        """Status of a queued import, if one was recently queued; see `queue_ris_import`."""
+        return cache.get(self.import_status_key)
+
+    def set_import_status(self, status: str, imported: int = 0, error: str = ""):
+        cache.set(
+            self.import_status_key,
+            {"status": status, "imported": imported, "error": error},
+            settings.CELERY_RESULT_EXPIRES,
+        )
+
+    def queue_ris_import(self):
+        """Import references from the RIS file in a celery task, once the search is saved."""
+        self.set_import_status("queued")
+        transaction.on_commit(lambda: tasks.import_ris.delay(self.id))
+
     def create_new_references(self, results):
         # Create assessment-specific references for each value which return
         # result which was added, based on the new results query values, where
         # results is a dictionary with a field "added", which is a list of the
         # primary keys of identifiers which need a new reference creation.
 
-        RefSearchM2M = Reference.searches.through
-        RefIdM2M = Reference.identifiers.through
-
         # For the cases where the current search found a new identifier which
         # already has an assessment-specific Reference object associated with
         # it, just associate the current reference with this search.
         added_str = [str(id) for id in results["added"]]
-        ref_ids = (
+        refs = (
             Reference.objects.filter(
                 assessment=self.assessment, identifiers__unique_id__in=added_str
             )
             .exclude(searches=self)
-            .values_list("pk", flat=True)
+            .only("id")
+            .distinct()
         )
-        ids_count = ref_ids.count()
-
-        if ids_count > 0:
-            logger.debug("Starting bulk creation of existing search-through values")
-            ref_searches = [RefSearchM2M(reference_id=ref, search_id=self.pk) for ref in ref_ids]
-            RefSearchM2M.objects.bulk_create(ref_searches)
-            logger.debug(f"Completed bulk creation of {len(ref_searches)} search-through values")
+        Reference.objects.build_ref_search_m2m(refs, self)
 
         # For the cases where the search resulted in new ids which may or may
         # not already be imported as a reference for this assessment, find the
         # proper subset.
-        ids = (
-            Identifiers.objects.filter(database=self.source, unique_id__in=added_str)
-            .exclude(references__in=Reference.objects.get_qs(self.assessment))
-            .order_by("pk")
+        ids = Identifiers.objects.filter(database=self.source, unique_id__in=added_str).exclude(
+            references__in=Reference.objects.get_qs(self.assessment)
         )
-        ids_count = ids.count()
-
-        if ids_count > 0:
-            block_id = timezone.now()
-
-            # create list of references for each identifier
-            refs = [i.create_reference(self.assessment, block_id) for i in ids]
-            id_pks = [i.pk for i in ids]
-
-            logger.debug(f"Starting  bulk creation of {len(refs)} references")
-            Reference.objects.bulk_create(refs)
-            logger.debug(f"Completed bulk creation of {len(refs)} references")
-
-            # re-query to get the objects back with PKs
-            refs = Reference.objects.filter(assessment=self.assessment, block_id=block_id).order_by(
-                "pk"
-            )
-
-            # associate identifiers with each
-            ref_searches = []
-            ref_ids = []
-            logger.debug(f"Starting  bulk creation of {refs.count()} reference-through values")
-            for i, ref in enumerate(refs):
-                ref_searches.append(RefSearchM2M(reference_id=ref.pk, search_id=self.pk))
-                ref_ids.append(RefIdM2M(reference_id=ref.pk, identifiers_id=id_pks[i]))
-            RefSearchM2M.objects.bulk_create(ref_searches)
-            RefIdM2M.objects.bulk_create(ref_ids)
-            logger.debug(f"Completed bulk creation of {refs.count()} reference-through values")
-
-            # finally, remove temporary identifier used for re-query after bulk_create
-            logger.debug("Removing block-id from created references")
-            refs.update(block_id=None)
+        Reference.objects.bulk_create_from_identifiers(self, ids)
 
     def delete_old_references(self, results):
         """Conservatively delete results which were removed in the most recent search.
@@ -615,6 +625,12 @@ class Identifiers(models.Model):
     database = models.IntegerField(choices=constants.ReferenceDatabase)
     content = models.TextField()
     url = models.URLField(blank=True)
+    last_fetched = models.DateTimeField(
+        null=True, blank=True, help_text="When content was last fetched from the database"
+    )
+    last_modified = models.DateField(
+        null=True, blank=True, help_text="When the record was last revised in the database"
+    )
 
     class Meta:
         unique_together = (("database", "unique_id"),)
@@ -704,6 +720,13 @@ class ReferenceFilterTag(NonUniqueTagBase, AssessmentRootMixin, MP_Node):
     cache_template_taglist = "reference-taglist-assessment-{0}"
     cache_template_tagtree = "reference-tagtree-assessment-{0}"
 
+    @classmethod
+    def clear_cache(cls, assessment_id):
+        super().clear_cache(assessment_id)
+        # tag tree changes may change descendant counts and workflow references
+        ReferenceTagCount.objects.invalidate(assessment_id)
+        WorkflowReference.objects.invalidate(assessment_id)
+
     def get_nested_name(self) -> str:
         if self.is_root():
             return "<root-node>"
@@ -817,6 +840,26 @@ class ReferenceTags(ItemBase):
         ]
 
 
+class ReferenceTagCount(models.Model):
+    """A rollup of the number of references with each tag in an assessment.
+
+    Maintained incrementally as reference tags change, and rebuilt after changes to the tag tree.
+    """
+
+    objects = managers.ReferenceTagCountManager()
+
+    tag = models.OneToOneField(
+        ReferenceFilterTag, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    assessment = models.ForeignKey(
+        "assessment.Assessment", on_delete=models.CASCADE, related_name="+"
+    )
+    count = models.IntegerField(default=0, help_text="References with this tag")
+    deep_count = models.IntegerField(
+        default=0, help_text="References with this tag or any descendant tag"
+    )
+
+
 class Reference(models.Model):
     objects = managers.ReferenceManager()
 
@@ -836,6 +879,11 @@ class Reference(models.Model):
     year = models.PositiveSmallIntegerField(blank=True, null=True)
     journal = models.TextField(blank=True)
     abstract = models.TextField(blank=True)
+    search_vector = models.GeneratedField(
+        db_persist=True,
+        expression=constants.REFERENCE_SEARCH_VECTOR,
+        output_field=SearchVectorField(),
+    )
     tags = managers.ReferenceFilterTagManager(through=ReferenceTags, blank=True)
     full_text_url = CustomURLField(
         blank=True,
@@ -853,12 +901,26 @@ class Reference(models.Model):
     BREADCRUMB_PARENT = "assessment"
 
     class Meta:
-        indexes = [
-            GinIndex(
-                constants.REFERENCE_SEARCH_VECTOR,
-                name="search_vector_idx",
-            )
-        ]
+        indexes = [GinIndex("search_vector", name="search_vector_idx")]
+
+    @staticmethod
+    def bulk_merge_status_key(assessment_id: int) -> str:
+        return f"lit-bulk-merge-{assessment_id}"
+
+    @classmethod
+    def get_bulk_merge_status(cls, assessment_id: int) -> dict | None:
+        """Status of a background bulk tag merge, if one was recently queued."""
+        return cache.get(cls.bulk_merge_status_key(assessment_id))
+
+    @classmethod
+    def set_bulk_merge_status(
+        cls, assessment_id: int, status: str, merged: int = 0, total: int = 0, error: str = ""
+    ):
+        cache.set(
+            cls.bulk_merge_status_key(assessment_id),
+            {"status": status, "merged": merged, "total": total, "error": error},
+            settings.CELERY_RESULT_EXPIRES,
+        )
 
     @transaction.atomic
     def merge_tags(self, user):
@@ -1052,6 +1114,7 @@ class Reference(models.Model):
         d["tag_udf_contents"] = self.get_tag_udf_contents()
 
         d["tags"] = [tag.id for tag in self.tags.all()]
+        d["search_headline"] = getattr(self, "search_headline", None)
         return d
 
     def to_json(self):
@@ -1174,71 +1237,81 @@ class Reference(models.Model):
         return self.assessment
 
     @classmethod
-    def extract_dois(cls, qs, logger=None, full_text: bool = False):
+    def extract_dois(
+        cls, qs, logger=None, full_text: bool = False, dry_run: bool = False
+    ) -> dict[str, int]:
         """Attempt to extract a DOI for each reference given other identifier metadata
 
+        References without a DOI are reviewed in batches; for each batch, DOIs are extracted from
+        identifier content and existing DOI identifiers are resolved in a fixed number of queries.
+
         Args:
             qs (Reference QuerySet): a QuerySet of References
             logger (logger): An optional logger instance
             full_text (bool, optional): Determines whether to search full text (True) of field (False; default)
+            dry_run (bool, optional): Report DOIs which would be added, but do not save (default False)
+
+        Returns:
+            dict[str, int]: number of references reviewed, with a DOI initially, with a DOI
+                found, and the number of DOI identifiers created
         """
-        n = qs.count()
+        report = dict(references=qs.count(), initial=0, found=0, created=0)
+        n = report["references"]
         if n == 0:
-            return
+            return report
 
-        qs_dois = qs.filter(identifiers__database=constants.ReferenceDatabase.DOI)
-        n_doi_initial = qs_dois.count()
-
-        qs_no_doi = (
-            qs.only("id")
-            .exclude(identifiers__database=constants.ReferenceDatabase.DOI)
-            .prefetch_related("identifiers")
+        report["initial"] = qs.filter(identifiers__database=constants.ReferenceDatabase.DOI).count()
+        ref_ids = list(
+            qs.exclude(identifiers__database=constants.ReferenceDatabase.DOI)
+            .order_by("id")
+            .values_list("id", flat=True)
         )
-
-        new_doi_relations = []
-        for ref in qs_no_doi:
-            doi = None
-            for ident in ref.identifiers.all():
-                if full_text:
-                    doi = try_get_doi(ident.content, full_text=True)
-                else:
-                    doi = get_doi_from_identifier(ident)
-                if doi:
-                    new_doi_relations.append((doi, ref.id))
-                    break
-
-        existing_dois = Identifiers.existing_doi_map([el[0] for el in new_doi_relations])
         RefIdentM2M = Reference.identifiers.through
-
-        # create new DOIs as needed
-        doi_creates = []
-        for doi, _ in new_doi_relations:
-            if doi not in existing_dois:
-                doi_creates.append(
-                    Identifiers(database=constants.ReferenceDatabase.DOI, unique_id=doi)
+        for batch in batched(ref_ids, managers.DOI_BATCH_SIZE, strict=False):
+            df = pd.DataFrame(
+                RefIdentM2M.objects.filter(reference_id__in=batch)
+                .order_by("reference_id", "identifiers_id")
+                .values_list("reference_id", "identifiers__content"),
+                columns=["reference_id", "content"],
+            )
+            if not full_text:
+                df["content"] = df.content.map(get_doi_field)
+            df["doi"] = try_get_dois(df.content, full_text=full_text)
+            # use the first DOI found for each reference
+            df = df.dropna(subset="doi").drop_duplicates("reference_id")
+            if df.empty:
+                continue
+            report["found"] += df.shape[0]
+            dois = df.doi.unique().tolist()
+            if dry_run:
+                report["created"] += len(set(dois) - Identifiers.existing_doi_map(dois).keys())
+                continue
+            with transaction.atomic():
+                idents, created = Identifiers.objects.bulk_get_or_create(
+                    constants.ReferenceDatabase.DOI, dict.fromkeys(dois, "")
                 )
-                existing_dois[doi] = -1  # set temporary value until after bulk_create
-
-        created = Identifiers.objects.bulk_create(doi_creates)
-        for ident in created:
-            existing_dois[ident.unique_id] = ident.id
-
-        # create new Reference-DOI assignments
-        m2m_creates = []
-        for doi, ref_id in new_doi_relations:
-            ident_id = existing_dois[doi]
-            m2m_creates.append(RefIdentM2M(identifiers_id=ident_id, reference_id=ref_id))
-        RefIdentM2M.objects.bulk_create(m2m_creates)
+                RefIdentM2M.objects.bulk_create(
+                    [
+                        RefIdentM2M(identifiers_id=idents[doi].id, reference_id=ref_id)
+                        for ref_id, doi in zip(df.reference_id, df.doi, strict=True)
+                    ],
+                    ignore_conflicts=True,
+                )
+            report["created"] += len(created)
 
         if logger:
-            n_doi = qs_dois.count()
+            n_doi_initial = report["initial"]
+            n_doi = n_doi_initial + report["found"]
+            prefix = "[dry run] " if dry_run else ""
             logger.write(f"{n:8} references reviewed ({n_doi_initial / n:.0%} have DOI)")
             logger.write(
-                f"{n_doi_initial:8} -> {n_doi:8} references with a DOI (+{n_doi - n_doi_initial}; {n_doi / n:.0%} have DOI)"
+                f"{prefix}{n_doi_initial:8} -> {n_doi:8} references with a DOI (+{n_doi - n_doi_initial}; {n_doi / n:.0%} have DOI)"
             )
             logger.write(
-                f"{n - n_doi:8} references remaining without a DOI ({(n - n_doi) / n:.0%} missing DOI)"
+                f"{prefix}{n - n_doi:8} references remaining without a DOI ({(n - n_doi) / n:.0%} missing DOI)"
             )
+            logger.write(f"{prefix}{report['created']:8} DOI identifiers created")
+        return report
 
     @classmethod
     def annotate_tag_parents(
@@ -1378,12 +1451,29 @@ class Workflow(models.Model):
             are tagged with any descendant of the selected tag(s).""",
     )
     removal_source = models.ManyToManyField(Search, blank=True, related_name="workflow_removals")
+    members_built = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="References in this workflow are current; see WorkflowReference",
+    )
+    members_version = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Changed when references in this workflow are invalidated",
+    )
     created = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.title} Workflow"
 
+    def save(self, *args, **kwargs):
+        # criteria may have changed; references are rebuilt in the background
+        self.members_built = False
+        self.members_version = time.time_ns()
+        super().save(*args, **kwargs)
+        WorkflowReference.objects.queue_rebuild(self.assessment_id)
+
     def get_absolute_url(self):
         return reverse("lit:workflow-htmx", args=[self.pk, "read"])
 
@@ -1458,9 +1548,27 @@ class Workflow(models.Model):
         )
 
 
+class WorkflowReference(models.Model):
+    """References which meet the admission and removal criteria of a workflow.
+
+    Maintained as reference tags change, and rebuilt after changes to the workflow criteria,
+    tag tree, or references in searches.
+    """
+
+    objects = managers.WorkflowReferenceManager()
+
+    workflow = models.ForeignKey(Workflow, on_delete=models.CASCADE, related_name="+")
+    reference = models.ForeignKey(Reference, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("workflow", "reference"), name="workflow_reference"),
+        ]
+
+
 reversion.register(LiteratureAssessment)
 reversion.register(Search)
 reversion.register(ReferenceFilterTag)
-reversion.register(Reference, follow=["tags"])
+reversion.register(Reference, follow=["tags"], exclude=["search_vector"])
 reversion.register(UserReferenceTag, follow=["tags"])
 reversion.register(Workflow)
@@ -239,6 +239,8 @@ class BulkReferenceTagSerializer(serializers.Serializer):
 
         assessment_id = self.assessment.id
         operation = self.validated_data["operation"]
+        models.ReferenceTagCount.objects.invalidate(assessment_id)
+        models.WorkflowReference.objects.invalidate(assessment_id)
 
         existing = set()
         if operation == "append":
@@ -323,7 +325,7 @@ class ReferenceSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.Reference
-        fields = "__all__"
+        exclude = ("search_vector",)
 
 
 class ReferenceReplaceHeroIdSerializer(serializers.Serializer):
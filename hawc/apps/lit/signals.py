@@ -1,5 +1,5 @@
 from django.apps import apps
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import m2m_changed, post_save, pre_delete
 from django.dispatch import receiver
 
 from . import models
@@ -12,6 +12,26 @@ def invalidate_study_cache(sender, instance, **kwargs):
     Study.delete_caches([instance.id])
 
 
+@receiver(pre_delete, sender=models.Reference)
+def invalidate_tag_counts(sender, instance, **kwargs):
+    models.ReferenceTagCount.objects.invalidate(instance.assessment_id)
+
+
+@receiver(m2m_changed, sender=models.Reference.searches.through)
+@receiver(m2m_changed, sender=models.Workflow.admission_source.through)
+@receiver(m2m_changed, sender=models.Workflow.removal_source.through)
+def invalidate_workflow_references(sender, instance, action, **kwargs):
+    # workflow criteria and membership may depend on reference searches
+    if action in ("post_add", "post_remove", "post_clear"):
+        models.WorkflowReference.objects.invalidate(instance.assessment_id)
+        apps.get_model("summary", "Visual").bust_data_cache(instance.assessment_id)
+
+
+@receiver(pre_delete, sender=models.Search)
+def invalidate_search_workflow_references(sender, instance, **kwargs):
+    models.WorkflowReference.objects.invalidate(instance.assessment_id)
+
+
 @receiver(post_save, sender=models.ReferenceFilterTag)
 @receiver(pre_delete, sender=models.ReferenceFilterTag)
 def invalidate_tag_cache(sender, instance, **kwargs):
@@ -0,0 +1,65 @@
+# Bulk merge unresolved user tags as reference tags, in a single statement. `{plan}` is a query
+# returning the `id`, `assessment_id`, `ref_tags`, and `bulk_merge_tags` of each reference to
+# merge; the plan is evaluated once, before any changes are made. Parameters following the plan
+# parameters are the user ID performing the merge and the update time (x3).
+MERGE_TAG_CONFLICTS = """
+WITH plan AS MATERIALIZED ({plan}),
+user_tag AS (
+    INSERT INTO lit_userreferencetag
+        (user_id, reference_id, deleted_tags, is_resolved, created, last_updated)
+    SELECT %s, plan.id, ARRAY[]::integer[], false, %s, %s
+    FROM plan
+    ON CONFLICT (user_id, reference_id) DO UPDATE SET last_updated = EXCLUDED.last_updated
+    RETURNING id, reference_id
+),
+user_tags AS (
+    INSERT INTO lit_userreferencetags (tag_id, content_object_id)
+    SELECT tag.id, user_tag.id
+    FROM user_tag
+    JOIN plan ON plan.id = user_tag.reference_id
+    CROSS JOIN LATERAL unnest(plan.bulk_merge_tags) AS tag(id)
+    ON CONFLICT DO NOTHING
+),
+reference_tags AS (
+    INSERT INTO lit_referencetags (tag_id, content_object_id)
+    SELECT tag.id, plan.id
+    FROM plan
+    CROSS JOIN LATERAL unnest(plan.bulk_merge_tags) AS tag(id)
+    ON CONFLICT DO NOTHING
+),
+reference AS (
+    UPDATE lit_reference SET last_updated = %s WHERE id IN (SELECT id FROM plan)
+)
+SELECT id, assessment_id, array_remove(ref_tags, NULL), bulk_merge_tags FROM plan
+"""
+
+# Resolve unresolved user tags on the given references where the user tags include one of the
+# given tags, have no deleted tags, and every user tag has been applied to the reference.
+# Parameters are the update time, reference IDs, and tag IDs.
+RESOLVE_USER_TAGS = """
+UPDATE lit_userreferencetag urt
+SET is_resolved = true, last_updated = %s
+WHERE urt.reference_id = ANY(%s)
+    AND NOT urt.is_resolved
+    AND coalesce(array_length(urt.deleted_tags, 1), 0) = 0
+    AND EXISTS (
+        SELECT 1 FROM lit_userreferencetags ut
+        WHERE ut.content_object_id = urt.id AND ut.tag_id = ANY(%s)
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM lit_userreferencetags ut
+        WHERE ut.content_object_id = urt.id
+            AND NOT EXISTS (
+                SELECT 1 FROM lit_referencetags rt
+                WHERE rt.content_object_id = urt.reference_id AND rt.tag_id = ut.tag_id
+            )
+    )
+"""
+
+# Add references to a workflow; `{references}` is a query returning reference IDs which meet the
+# workflow criteria. Parameters are the workflow ID, then the reference query parameters.
+INSERT_WORKFLOW_REFERENCES = """
+INSERT INTO lit_workflowreference (workflow_id, reference_id)
+SELECT %s, refs.id FROM ({references}) AS refs
+ON CONFLICT DO NOTHING
+"""
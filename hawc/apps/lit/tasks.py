@@ -1,36 +1,85 @@
 import json
+from datetime import timedelta
 
+import requests
 from celery import shared_task
 from celery.utils.log import get_task_logger
 from django.apps import apps
+from django.core.cache import cache
 from django.db import transaction
 from django.db.models import Model
+from django.utils import timezone
 
 from ...services.epa import hero
 from ...services.nih import pubmed
+from ...services.utils.ratelimit import RetryableError
 from . import constants
 
 logger = get_task_logger(__name__)
 
+# cache key for the start time of the last PubMed refresh, and the window used if it is missing
+PUBMED_REFRESH_KEY = "lit-pubmed-refresh-last-run"
+PUBMED_REFRESH_DEFAULT_WINDOW = timedelta(days=7)
+# cache key for the checkpoint of a PubMed refresh in progress
+PUBMED_REFRESH_PROGRESS_KEY = "lit-pubmed-refresh-progress"
+# a refresh without a checkpoint for this long was interrupted, and can be resumed
+PUBMED_REFRESH_STALE = timedelta(hours=1)
+# number of identifiers checked per batch in a PubMed refresh; within ESearch limits
+PUBMED_REFRESH_BATCH_SIZE = 5_000
+
+
+def _get_checkpoint(task) -> dict:
+    # progress stored by a previous attempt of this task, if any
+    if task.request.id is None:
+        return {}
+    try:
+        info = task.AsyncResult(task.request.id).info
+    except NotImplementedError:
+        return {}  # no result backend
+    return info if isinstance(info, dict) else {}
 
-@shared_task
-def update_hero_content(ids: list[int]):
-    """Fetch the latest data from HERO and update identifier object."""
 
+@shared_task(bind=True, max_retries=3)
+def update_hero_content(self, ids: list[int], fetched: list[int] | None = None):
+    """Fetch the latest data from HERO and update identifier object.
+
+    Progress is saved after each page and checkpointed in the task result; if the task is rerun
+    (for example, redelivered after a worker is lost), only references not yet fetched are
+    requested. If HERO is unavailable, the task is retried later with the references fetched so
+    far.
+    """
     Identifiers = apps.get_model("lit", "identifiers")
 
-    fetcher = hero.HEROFetch(sorted(ids))
-    contents = fetcher.get_content()
-    with transaction.atomic():
-        for d in contents.get("success"):
-            content = json.dumps(d)
-            Identifiers.objects.filter(
-                unique_id=str(d["HEROID"]), database=constants.ReferenceDatabase.HERO
-            ).update(content=content)
-        ids_str = [str(id) for id in ids]
-        Identifiers.objects.filter(
-            unique_id__in=ids_str, database=constants.ReferenceDatabase.HERO, content=""
-        ).update(content='{"status": "failed"}')
+    fetched = set(fetched or []) | set(_get_checkpoint(self).get("fetched", []))
+    remaining = sorted(set(ids) - fetched)
+    if fetched:
+        logger.info(f"Resuming HERO update; {len(remaining)} of {len(ids)} remaining")
+
+    def save_page(contents: list[dict]):
+        with transaction.atomic():
+            for d in contents:
+                content = json.dumps(d)
+                Identifiers.objects.filter(
+                    unique_id=str(d["HEROID"]), database=constants.ReferenceDatabase.HERO
+                ).update(content=content)
+        fetched.update(d["HEROID"] for d in contents)
+        self.update_state(state="PROGRESS", meta={"fetched": sorted(fetched)})
+
+    fetcher = hero.HEROFetch(remaining)
+    try:
+        fetcher.get_content(on_page=save_page)
+    except (RetryableError, requests.RequestException) as err:
+        raise self.retry(
+            exc=err,
+            countdown=60 * 2**self.request.retries,
+            args=(ids,),
+            kwargs={"fetched": sorted(fetched)},
+        ) from err
+    ids_str = [str(id) for id in ids]
+    Identifiers.objects.filter(
+        unique_id__in=ids_str, database=constants.ReferenceDatabase.HERO, content=""
+    ).update(content='{"status": "failed"}')
+    return {"fetched": sorted(fetched), "failed": fetcher.failures}
 
 
 @shared_task
@@ -120,19 +169,158 @@ def replace_hero_ids(replace: list[list[int]]):
 def update_pubmed_content(ids: list[int]):
     """Fetch the latest data from Pubmed and update identifier object."""
     Identifiers = apps.get_model("lit", "identifiers")
+    fetched = timezone.now()
     fetcher = pubmed.PubMedFetch(ids)
-    contents = fetcher.get_content()
-    for d in contents:
-        content = json.dumps(d)
-        Identifiers.objects.filter(
-            unique_id=str(d["PMID"]), database=constants.ReferenceDatabase.PUBMED
-        ).update(content=content)
+    Identifiers.objects.save_pubmed_content(fetcher.get_content(), fetched)
     ids_str = [str(id) for id in ids]
     Identifiers.objects.filter(
         unique_id__in=ids_str, database=constants.ReferenceDatabase.PUBMED, content=""
     ).update(content='{"status": "failed"}')
 
 
+@shared_task
+def refresh_pubmed_content() -> dict:
+    """Start a refresh of PubMed content for identifiers whose records were revised.
+
+    Identifiers are refreshed in bounded batches by `refresh_pubmed_batch`, each queuing the
+    next. Progress is checkpointed after each batch; if a refresh was interrupted, it is resumed
+    from its checkpoint instead of being restarted.
+    """
+    progress = cache.get(PUBMED_REFRESH_PROGRESS_KEY)
+    if progress is None:
+        started = timezone.now()
+        since = cache.get(PUBMED_REFRESH_KEY) or started - PUBMED_REFRESH_DEFAULT_WINDOW
+        progress = dict(
+            since=since, started=started, checkpoint=started, last_id=0, fetched=0, updated=0
+        )
+        cache.set(PUBMED_REFRESH_PROGRESS_KEY, progress, timeout=None)
+    elif timezone.now() - progress["checkpoint"] < PUBMED_REFRESH_STALE:
+        return progress  # still running
+    else:
+        logger.info(f"Resuming PubMed refresh after identifier {progress['last_id']}")
+    refresh_pubmed_batch.delay()
+    return progress
+
+
+@shared_task
+def refresh_pubmed_batch() -> dict | None:
+    """Refresh the next batch of PubMed identifiers in a refresh started by `refresh_pubmed_content`.
+
+    Identifiers in the batch are checked for revisions since the last refresh with a PubMed
+    search; only revised records, and records never fetched since revisions were tracked, are
+    fetched, and only identifiers whose content changed are written.
+    """
+    Identifiers = apps.get_model("lit", "identifiers")
+    if (progress := cache.get(PUBMED_REFRESH_PROGRESS_KEY)) is None:
+        return None
+    batch = list(
+        Identifiers.objects.filter(
+            database=constants.ReferenceDatabase.PUBMED, id__gt=progress["last_id"]
+        )
+        .exclude(content="")
+        .order_by("id")
+        .values_list("id", "unique_id", "last_fetched")[:PUBMED_REFRESH_BATCH_SIZE]
+    )
+    if not batch:
+        cache.set(PUBMED_REFRESH_KEY, progress["started"], timeout=None)
+        cache.delete(PUBMED_REFRESH_PROGRESS_KEY)
+        logger.info(
+            f"Refreshed {progress['fetched']} PubMed identifiers; {progress['updated']} changed"
+        )
+        return progress
+
+    pmids = [int(unique_id) for _, unique_id, _ in batch if unique_id.isdigit()]
+    ids = set(pubmed.filter_modified(pmids, progress["since"].date(), progress["started"].date()))
+    ids.update(
+        int(unique_id)
+        for _, unique_id, last_fetched in batch
+        if last_fetched is None and unique_id.isdigit()
+    )
+    if ids:
+        fetcher = pubmed.PubMedFetch(sorted(ids), use_cache=False)
+        progress["updated"] += Identifiers.objects.save_pubmed_content(
+            fetcher.get_content(), progress["started"]
+        )
+    progress["fetched"] += len(ids)
+    progress["last_id"] = batch[-1][0]
+    progress["checkpoint"] = timezone.now()
+    cache.set(PUBMED_REFRESH_PROGRESS_KEY, progress, timeout=None)
+    refresh_pubmed_batch.delay()
+    return progress
+
+
+@shared_task(bind=True)
+def import_ris(self, search_id: int) -> int:
+    """Import references from the RIS file of a search, reporting progress after each batch.
+
+    Progress is saved in the task state and in the search import status, which is displayed
+    on the search detail page.
+    """
+    Search = apps.get_model("lit", "search")
+    search = Search.objects.get(id=search_id)
+    imported = 0
+
+    def progress(n: int):
+        nonlocal imported
+        imported = n
+        self.update_state(state="PROGRESS", meta={"imported": n})
+        search.set_import_status("running", n)
+
+    search.set_import_status("running")
+    try:
+        n = search.import_ris_references(progress=progress)
+    except Exception as err:
+        search.set_import_status("failed", imported, error=str(err))
+        raise
+    search.set_import_status("complete", n)
+    logger.info(f"Imported {n} references from RIS file for search {search_id}")
+    return n
+
+
+@shared_task(bind=True)
+def merge_tag_conflicts(
+    self,
+    assessment_id: int,
+    reference_ids: list[int],
+    tag_ids: list[int],
+    user_id: int,
+    include_without_conflicts: bool,
+) -> str:
+    """Bulk merge unresolved user tags on previewed references, reporting progress after each batch.
+
+    Only the previewed references are merged, if they still have unresolved user tags. Progress is
+    saved in the task state and in the assessment's bulk merge status, which is displayed on the
+    conflict resolution page.
+    """
+    Reference = apps.get_model("lit", "reference")
+    merged, total = 0, len(reference_ids)
+
+    def progress(n: int, n_total: int):
+        nonlocal merged, total
+        merged, total = n, n_total
+        self.update_state(state="PROGRESS", meta={"merged": n, "total": n_total})
+        Reference.set_bulk_merge_status(assessment_id, "running", n, n_total)
+
+    Reference.set_bulk_merge_status(assessment_id, "running", 0, total)
+    try:
+        result = Reference.objects.filter(
+            assessment_id=assessment_id, id__in=reference_ids
+        ).merge_tag_conflicts(tag_ids, user_id, include_without_conflicts, progress=progress)
+    except Exception as err:
+        Reference.set_bulk_merge_status(assessment_id, "failed", merged, total, error=str(err))
+        raise
+    Reference.set_bulk_merge_status(assessment_id, "complete", merged, total)
+    logger.info(f"Bulk merged tags {tag_ids} in assessment {assessment_id}: {result['message']}")
+    return result["message"]
+
+
+@shared_task
+def rebuild_workflow_references(assessment_id: int):
+    """Rebuild references in workflows whose membership was invalidated."""
+    WorkflowReference = apps.get_model("lit", "WorkflowReference")
+    WorkflowReference.objects.rebuild_invalid(assessment_id)
+
+
 @shared_task
 def fix_pubmed_without_content():
     # Try getting pubmed data without content
@@ -29,7 +29,8 @@ from ..common.views import (
     htmx_required,
 )
 from ..udf.cache import TagCache
-from . import constants, filterset, forms, models
+from . import constants, filterset, forms, models, tasks
+from .managers import MERGE_ASYNC_THRESHOLD
 
 
 def lit_overview_breadcrumb(assessment) -> Breadcrumb:
@@ -72,7 +73,7 @@ class LitOverview(BaseList):
             ).count()
         context["config"] = {
             "tags": models.ReferenceFilterTag.get_all_tags(self.assessment.id),
-            "references": models.Reference.objects.tag_pairs(self.assessment.references.all()),
+            "tag_counts": models.ReferenceTagCount.objects.get_counts(self.assessment.id),
             "assessment_id": self.assessment.id,
             "referenceYearHistogramUrl": reverse(
                 "lit:api:assessment-reference-year-histogram", args=(self.assessment.id,)
@@ -486,6 +487,28 @@ class BulkMerge(HtmxView):
         form = forms.BulkMergeConflictsForm(assessment=self.assessment, initial=data)
         for field in "tags", "include_without_conflict":
             form.fields[field].disabled = True
+        if len(reference_ids) > MERGE_ASYNC_THRESHOLD:
+            # large merges of the previewed references are run in the background
+            cache.delete(cache_key)
+            models.Reference.set_bulk_merge_status(
+                self.assessment.id, "queued", total=len(reference_ids)
+            )
+            tasks.merge_tag_conflicts.delay(
+                self.assessment.id,
+                reference_ids,
+                [int(tag_id) for tag_id in data.getlist("tags")],
+                request.user.id,
+                bool(data.get("include_without_conflict", False)),
+            )
+            context = dict(
+                object_list=None,
+                assessment=self.assessment,
+                action="merge",
+                message=f"Merging tags on {len(reference_ids)} references in the background; progress is shown on the conflict resolution page.",
+                merged=True,
+                form=form,
+            )
+            return render(request, "lit/components/bulk_merge_modal_content.html", context=context)
         merge_result = queryset.merge_tag_conflicts(
             data.getlist("tags"),
             request.user.id,
@@ -626,6 +649,7 @@ class ConflictResolution(BaseFilterList):
         tags = models.ReferenceFilterTag.get_assessment_qs(self.assessment.id)
         context.update(
             tags=tags,
+            bulk_merge_status=models.Reference.get_bulk_merge_status(self.assessment.id),
             breadcrumbs=lit_overview_crumbs(
                 self.request.user, self.assessment, "Resolve Tag Conflicts"
             ),
@@ -674,7 +698,6 @@ class SearchRefList(BaseDetail):
 
 def _get_viz_app_startup(view, context, search=None) -> WebappConfig:
     title = f'"{search}" Literature Tagtree' if search else f"{view.assessment}: Literature Tagtree"
-    qs = search.references.all() if search else view.assessment.references.all()
     return WebappConfig(
         app="litStartup",
         page="startupTagTreeViz",
@@ -685,7 +708,13 @@ def _get_viz_app_startup(view, context, search=None) -> WebappConfig:
             search_id=search.id if search else None,
             tags=models.ReferenceFilterTag.get_all_tags(view.assessment.id),
             title=title,
-            references=models.Reference.objects.tag_pairs(qs),
+            # counts for an entire assessment are precomputed; searches require references
+            tag_counts=None
+            if search
+            else models.ReferenceTagCount.objects.get_counts(view.assessment.id),
+            references=models.Reference.objects.tag_pairs(search.references.all())
+            if search
+            else [],
         ),
     )
 
@@ -0,0 +1,9 @@
+from enum import StrEnum
+
+
+class ReadPolicy(StrEnum):
+    """How to read a materialized view with pending changes for an assessment."""
+
+    WAIT = "wait"  # refresh pending changes for the assessment, then read
+    STALE = "stale"  # read the view as-is
+    LIVE = "live"  # read from source tables instead of the view
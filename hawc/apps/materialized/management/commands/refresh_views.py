@@ -1,16 +1,27 @@
+from django.apps import apps
 from django.core.management.base import BaseCommand
 
-from ...models import refresh_all_mvs
-
 
 class Command(BaseCommand):
     help = "Force refresh materialized views."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only refresh rows with pending changes, where supported.",
+        )
+
     def handle(self, **options):
         message = "Starting materialized view refresh..."
         self.stdout.write(self.style.NOTICE(message))
 
-        refresh_all_mvs(force=True)
+        for mv in apps.get_app_config("materialized").get_models():
+            seconds = mv.refresh(force=not options["incremental"])
+            if seconds is None:
+                self.stdout.write(f"{mv._meta.db_table}: no changes")
+            else:
+                self.stdout.write(f"{mv._meta.db_table}: {seconds:.3f} seconds")
 
         message = "Materialized views successfully refreshed!"
         self.stdout.write(self.style.SUCCESS(message))
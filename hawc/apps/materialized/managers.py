@@ -1,10 +1,10 @@
 from itertools import chain
-from typing import NamedTuple
+from typing import NamedTuple, Self
 
 import pandas as pd
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import connection, models
 
 from ..riskofbias.constants import SCORE_CHOICES_MAP, SCORE_SYMBOLS
 
@@ -15,6 +15,18 @@ class MetricScore(NamedTuple):
 
 
 class FinalRiskOfBiasScoreQuerySet(models.QuerySet):
+    def live(self, assessment_id: int) -> Self:
+        """Read scores for an assessment from risk of bias tables instead of the view.
+
+        Only methods using `score_values` read live scores; other queryset methods are unchanged.
+        """
+        qs = self._chain()
+        with connection.cursor() as cursor:
+            cursor.execute(self.model.sql.live, [assessment_id])
+            columns = [col[0] for col in cursor.description]
+            qs._score_values = [dict(zip(columns, row, strict=True)) for row in cursor.fetchall()]
+        return qs
+
     @property
     def score_values(self):
         if not hasattr(self, "_score_values"):
@@ -1,6 +1,6 @@
 from django.db import migrations, models
 
-from ..sql import FinalRiskOfBiasScore
+from ..sql import FinalRiskOfBiasScoreView
 
 
 class Migration(migrations.Migration):
@@ -11,7 +11,7 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.RunSQL(FinalRiskOfBiasScore.create, FinalRiskOfBiasScore.drop),
+        migrations.RunSQL(FinalRiskOfBiasScoreView.create, FinalRiskOfBiasScoreView.drop),
         migrations.CreateModel(
             name="FinalRiskOfBiasScore",
             fields=[
@@ -0,0 +1,157 @@
+from django.db import migrations
+
+from ..sql import FinalRiskOfBiasScoreView
+
+# SQL is copied here, instead of imported from `sql.py`, so that this migration does not change
+# when the table is changed by later migrations.
+CREATE = """
+    CREATE TABLE materialized_finalriskofbiasscore (
+        id bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+        score_id integer NOT NULL,
+        score_label varchar(128) NOT NULL,
+        score_notes text NOT NULL,
+        score_score smallint NOT NULL,
+        bias_direction smallint NOT NULL,
+        is_default boolean NOT NULL,
+        study_id integer NOT NULL,
+        metric_id integer NOT NULL,
+        riskofbias_id integer NOT NULL,
+        content_type_id integer NULL,
+        object_id integer NULL
+    );
+    CREATE INDEX ON materialized_finalriskofbiasscore (score_id);
+    CREATE INDEX ON materialized_finalriskofbiasscore (study_id);
+    CREATE TABLE materialized_finalriskofbiasscore_delta (study_id integer PRIMARY KEY);
+    INSERT INTO materialized_finalriskofbiasscore_delta (study_id)
+    SELECT DISTINCT study_id FROM riskofbias_riskofbias;
+
+    CREATE FUNCTION materialized_finalriskofbiasscore_rob() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            INSERT INTO materialized_finalriskofbiasscore_delta (study_id)
+            VALUES (OLD.study_id) ON CONFLICT DO NOTHING;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            INSERT INTO materialized_finalriskofbiasscore_delta (study_id)
+            VALUES (NEW.study_id) ON CONFLICT DO NOTHING;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE FUNCTION materialized_finalriskofbiasscore_score() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            INSERT INTO materialized_finalriskofbiasscore_delta (study_id)
+            SELECT study_id FROM riskofbias_riskofbias WHERE id = OLD.riskofbias_id
+            ON CONFLICT DO NOTHING;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            INSERT INTO materialized_finalriskofbiasscore_delta (study_id)
+            SELECT study_id FROM riskofbias_riskofbias WHERE id = NEW.riskofbias_id
+            ON CONFLICT DO NOTHING;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE FUNCTION materialized_finalriskofbiasscore_override() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            INSERT INTO materialized_finalriskofbiasscore_delta (study_id)
+            SELECT rob.study_id
+            FROM riskofbias_riskofbiasscore scr
+            JOIN riskofbias_riskofbias rob ON scr.riskofbias_id = rob.id
+            WHERE scr.id = OLD.score_id
+            ON CONFLICT DO NOTHING;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            INSERT INTO materialized_finalriskofbiasscore_delta (study_id)
+            SELECT rob.study_id
+            FROM riskofbias_riskofbiasscore scr
+            JOIN riskofbias_riskofbias rob ON scr.riskofbias_id = rob.id
+            WHERE scr.id = NEW.score_id
+            ON CONFLICT DO NOTHING;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER materialized_finalriskofbiasscore_rob
+    AFTER INSERT OR UPDATE OR DELETE ON riskofbias_riskofbias
+    FOR EACH ROW EXECUTE FUNCTION materialized_finalriskofbiasscore_rob();
+
+    CREATE TRIGGER materialized_finalriskofbiasscore_score
+    AFTER INSERT OR UPDATE OR DELETE ON riskofbias_riskofbiasscore
+    FOR EACH ROW EXECUTE FUNCTION materialized_finalriskofbiasscore_score();
+
+    CREATE TRIGGER materialized_finalriskofbiasscore_override
+    AFTER INSERT OR UPDATE OR DELETE ON riskofbias_riskofbiasscoreoverrideobject
+    FOR EACH ROW EXECUTE FUNCTION materialized_finalriskofbiasscore_override();
+    """
+
+DROP = """
+    DROP TRIGGER IF EXISTS materialized_finalriskofbiasscore_rob ON riskofbias_riskofbias;
+    DROP TRIGGER IF EXISTS materialized_finalriskofbiasscore_score ON riskofbias_riskofbiasscore;
+    DROP TRIGGER IF EXISTS materialized_finalriskofbiasscore_override
+        ON riskofbias_riskofbiasscoreoverrideobject;
+    DROP FUNCTION IF EXISTS materialized_finalriskofbiasscore_rob();
+    DROP FUNCTION IF EXISTS materialized_finalriskofbiasscore_score();
+    DROP FUNCTION IF EXISTS materialized_finalriskofbiasscore_override();
+    DROP TABLE IF EXISTS materialized_finalriskofbiasscore_delta;
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM pg_matviews WHERE matviewname = 'materialized_finalriskofbiasscore'
+        ) THEN
+            DROP MATERIALIZED VIEW materialized_finalriskofbiasscore;
+        END IF;
+    END $$;
+    DROP TABLE IF EXISTS materialized_finalriskofbiasscore;
+    """
+
+REFRESH_DELTA = """
+    WITH delta AS (
+        DELETE FROM materialized_finalriskofbiasscore_delta RETURNING study_id
+    ), removed AS (
+        DELETE FROM materialized_finalriskofbiasscore
+        WHERE study_id IN (SELECT study_id FROM delta)
+    )
+    INSERT INTO materialized_finalriskofbiasscore (
+        score_id, score_label, score_notes, score_score, bias_direction, is_default,
+        study_id, metric_id, riskofbias_id, content_type_id, object_id
+    )
+    SELECT
+        scr.id,
+        scr.label,
+        scr.notes,
+        scr.score,
+        scr.bias_direction,
+        scr.is_default,
+        rob.study_id,
+        scr.metric_id,
+        scr.riskofbias_id,
+        ovr.content_type_id,
+        ovr.object_id
+    FROM riskofbias_riskofbiasscore scr
+    LEFT join riskofbias_riskofbias rob
+    ON scr.riskofbias_id = rob.id
+    LEFT JOIN riskofbias_riskofbiasscoreoverrideobject ovr
+    ON scr.id = ovr.score_id
+    WHERE rob.final AND rob.active AND rob.study_id IN (SELECT study_id FROM delta)
+    ORDER BY scr.id, ovr.id;
+    """
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("materialized", "0001_initial"),
+        ("riskofbias", "0027_riskofbiasmetric_key"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [FinalRiskOfBiasScoreView.drop, CREATE, REFRESH_DELTA],
+            [DROP, FinalRiskOfBiasScoreView.create],
+        ),
+    ]
@@ -1,19 +1,32 @@
 import json
+import logging
+import time
+from datetime import UTC, datetime
 
 from django.apps import apps
+from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
-from django.db import connection, models
+from django.db import connection, models, transaction
 
 from ..riskofbias.constants import NA_SCORES, SCORE_CHOICES_MAP
 from . import managers, sql
+from .constants import ReadPolicy
 
+logger = logging.getLogger(__name__)
 
-def refresh_all_mvs(force: bool = False):
+
+def refresh_all_mvs(force: bool = False, debounce: bool = False):
+    mvs = apps.get_app_config("materialized").get_models()
+    for mv in mvs:
+        mv.refresh(force, debounce=debounce)
+
+
+def refresh_assessment_mvs(assessment_id: int):
     mvs = apps.get_app_config("materialized").get_models()
     for mv in mvs:
-        mv.refresh(force)
+        mv.refresh_assessment(assessment_id)
 
 
 class MaterializedViewModel(models.Model):
@@ -22,6 +35,9 @@ class MaterializedViewModel(models.Model):
     Django does not manage view creation automatically; that is handled by custom SQL queries in migrations.
     And since these are views, any foreign keys on these models are not "true" foreign keys, so on_delete
     should be kept as DO_NOTHING to prevent Django from enforcing foreign key constraints.
+
+    A view may instead be a table maintained incrementally, if its SQL defines `refresh_delta`;
+    triggers record changes by assessment in a delta table, and only changed rows are recomputed.
     """
 
     class Meta:
@@ -32,26 +48,159 @@ class MaterializedViewModel(models.Model):
     def create(cls):
         with connection.cursor() as cursor:
             cursor.execute(cls.sql.create)
+        if cls.is_incremental():
+            cls._refresh_delta()
 
     @classmethod
     def drop(cls):
         with connection.cursor() as cursor:
             cursor.execute(cls.sql.drop)
 
+    @classmethod
+    def is_incremental(cls) -> bool:
+        return cls.sql.refresh_delta is not None
+
     @classmethod
     def set_refresh_flag(cls, refresh: bool):
-        cache.set(f"refresh-{cls._meta.db_table}", refresh)
+        key = f"refresh-{cls._meta.db_table}"
+        if refresh:
+            # keep the time of the oldest pending change
+            cache.add(key, datetime.now(UTC), None)
+        else:
+            cache.delete(key)
+
+    @classmethod
+    def dirty_assessments(cls) -> dict[int | None, datetime]:
+        """Return the time of the oldest pending change, for each assessment with changes.
+
+        Views which are not maintained incrementally do not track changes by assessment; pending
+        changes are returned with a key of None.
+        """
+        if not cls.is_incremental():
+            since = cache.get(f"refresh-{cls._meta.db_table}")
+            return {} if since is None else {None: since}
+        with connection.cursor() as cursor:
+            cursor.execute(cls.sql.dirty)
+            return dict(cursor.fetchall())
+
+    @classmethod
+    def dirty_since(cls, assessment_id: int | None = None) -> datetime | None:
+        """Return the time of the oldest pending change, or None if the view is fresh.
+
+        Args:
+            assessment_id (int | None): if provided, only changes for this assessment
+        """
+        dirty = cls.dirty_assessments()
+        if assessment_id is not None and cls.is_incremental():
+            return dirty.get(assessment_id)
+        return min(dirty.values(), default=None)
 
     @classmethod
     def should_refresh(cls) -> bool:
-        return bool(cache.get(f"refresh-{cls._meta.db_table}", False))
+        return len(cls.dirty_assessments()) > 0
+
+    @classmethod
+    def ensure_fresh(cls, assessment_id: int, policy: ReadPolicy) -> bool:
+        """Prepare to read the view for an assessment.
+
+        Args:
+            assessment_id (int): assessment identifier
+            policy (ReadPolicy): how to handle pending changes for the assessment
+
+        Returns:
+            bool: True if the view should be read; False if the caller should read from source
+                tables instead.
+        """
+        if policy == ReadPolicy.STALE or cls.dirty_since(assessment_id) is None:
+            return True
+        if policy == ReadPolicy.WAIT:
+            cls.refresh_assessment(assessment_id, mark=False)
+            return True
+        return False
+
+    @classmethod
+    def _refresh_delta(cls, assessment_id: int | None = None, debounce: bool = False) -> int:
+        # returns the number of rows recomputed
+        params = {"assessment_id": assessment_id, "settle": 0, "max_wait": 0}
+        if debounce:
+            params.update(
+                settle=settings.MATERIALIZED_REFRESH_SETTLE_SECONDS,
+                max_wait=settings.MATERIALIZED_REFRESH_MAX_WAIT_SECONDS,
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(cls.sql.refresh_delta, params)
+            return cursor.rowcount
 
     @classmethod
-    def refresh(cls, force: bool = False):
-        if force or cls.should_refresh():
+    def refresh(cls, force: bool = False, debounce: bool = False) -> float | None:
+        """Refresh the view if changes are pending, or if forced.
+
+        Incrementally maintained views only recompute changed rows, unless forced.
+
+        Args:
+            force (bool, default False): refresh all rows, even if no changes are pending
+            debounce (bool, default False): for incrementally maintained views, skip changes
+                which have not yet settled, unless they have been pending too long
+
+        Returns:
+            float | None: seconds required to refresh, or None if no refresh was required; a
+                debounced refresh which finds no settled changes is not recorded
+        """
+        if not (force or cls.should_refresh()):
+            return None
+        start = time.monotonic()
+        if cls.is_incremental():
+            with transaction.atomic():
+                if force:
+                    with connection.cursor() as cursor:
+                        cursor.execute(cls.sql.refresh)
+                n_rows = cls._refresh_delta(debounce=debounce and not force)
+            if debounce and not force and n_rows == 0:
+                return None
+        else:
             with connection.cursor() as cursor:
                 cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {cls._meta.db_table}")
             cls.set_refresh_flag(False)
+        mode = "incremental" if cls.is_incremental() and not force else "full"
+        return cls._record_refresh(mode, time.monotonic() - start)
+
+    @classmethod
+    def refresh_assessment(cls, assessment_id: int, mark: bool = True) -> float | None:
+        """Refresh rows for an assessment.
+
+        Views which are not maintained incrementally are refreshed completely.
+
+        Args:
+            assessment_id (int): assessment identifier
+            mark (bool, default True): refresh all rows for the assessment, instead of only
+                rows with pending changes
+
+        Returns:
+            float | None: seconds required to refresh
+        """
+        if not cls.is_incremental():
+            return cls.refresh(force=True)
+        start = time.monotonic()
+        with transaction.atomic():
+            if mark:
+                with connection.cursor() as cursor:
+                    cursor.execute(cls.sql.mark_assessment, [assessment_id])
+            cls._refresh_delta(assessment_id=assessment_id)
+        return cls._record_refresh("assessment", time.monotonic() - start)
+
+    @classmethod
+    def _record_refresh(cls, mode: str, seconds: float) -> float:
+        logger.info(f"Refreshed {cls._meta.db_table} ({mode}) in {seconds:.3f} seconds")
+        key = f"refresh-durations-{cls._meta.db_table}"
+        durations = cache.get(key, {})
+        durations[mode] = seconds
+        cache.set(key, durations, None)
+        return seconds
+
+    @classmethod
+    def refresh_durations(cls) -> dict[str, float]:
+        """Return the duration, in seconds, of the most recent refresh of each mode."""
+        return cache.get(f"refresh-durations-{cls._meta.db_table}", {})
 
 
 class FinalRiskOfBiasScore(MaterializedViewModel):
@@ -87,7 +236,13 @@ class FinalRiskOfBiasScore(MaterializedViewModel):
     content_object = GenericForeignKey("content_type", "object_id")
 
     @classmethod
-    def get_dp_export(cls, assessment_id: int, ids: list[int], data_type: str) -> tuple[dict, dict]:
+    def get_dp_export(
+        cls,
+        assessment_id: int,
+        ids: list[int],
+        data_type: str,
+        policy: ReadPolicy = ReadPolicy.STALE,
+    ) -> tuple[dict, dict]:
         """
         Given an assessment, a list of object ids, and a data type, return all the data required to
         build a data pivot risk of bias export for only active, final data.
@@ -99,6 +254,7 @@ class FinalRiskOfBiasScore(MaterializedViewModel):
                 "epi" takes outcome ids
                 "invitro" takes study ids
             data_type (str): The data type to use; one of {"animal", "epi", "invitro"}
+            policy (ReadPolicy, default STALE): How to read scores with pending changes
 
         Returns:
             tuple[dict, dict]: A {metric_id: header_name} dict for building headers, and a
@@ -111,6 +267,8 @@ class FinalRiskOfBiasScore(MaterializedViewModel):
 
         filters = dict(domain__assessment_id=assessment_id)
         qs = cls.objects.filter(study__assessment_id=assessment_id)
+        if not cls.ensure_fresh(assessment_id, policy):
+            qs = qs.live(assessment_id)
         if data_type == "animal":
             filters["required_animal"] = True
             scores_map = qs.endpoint_scores(ids)
@@ -1,8 +1,23 @@
+import logging
+
 from celery import shared_task
+from django.core.cache import cache
 
 from . import models
 
+logger = logging.getLogger(__name__)
+
 
 @shared_task
 def refresh_all_mvs(force: bool = False):
-    models.refresh_all_mvs(force)
+    # coalesce periodic refreshes; skip if a refresh is already running
+    lock = "materialized-refresh-lock"
+    locked = cache.add(lock, True, 60 * 60)
+    if not locked and not force:
+        logger.info("Materialized view refresh already running; skipping")
+        return
+    try:
+        models.refresh_all_mvs(force, debounce=not force)
+    finally:
+        if locked:
+            cache.delete(lock)
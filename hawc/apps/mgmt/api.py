@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from ..assessment.api import BaseAssessmentViewSet
 from ..assessment.constants import AssessmentViewSetPermissions
 from ..assessment.models import Assessment
+from ..common.api.utils import get_streaming_format
 from ..common.helper import FlatExport
 from ..common.renderers import PandasRenderers
 from ..common.serializers import UnusedSerializer
@@ -31,7 +32,10 @@ class MgmtViewSet(BaseAssessmentViewSet):
             .select_related("study", "owner")
             .order_by("study_id", "type", "id")
         )
-        exporter = exports.TaskExporter.flat_export(qs, filename=f"{assessment}-task")
+        filename = f"{assessment}-task"
+        if format := get_streaming_format(request):
+            return exports.TaskExporter.streaming_export(qs, filename, format)
+        exporter = exports.TaskExporter.flat_export(qs, filename=filename)
         return Response(exporter)
 
     @action(
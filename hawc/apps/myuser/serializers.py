@@ -15,4 +15,4 @@ class HAWCUserSerializer(serializers.ModelSerializer):
         )
 
 
-SerializerHelper.add_serializer(models.HAWCUser, HAWCUserSerializer)
+SerializerHelper.add_serializer(models.HAWCUser, HAWCUserSerializer, assessment=None)
@@ -19,7 +19,7 @@ from ..assessment.api import (
 from ..assessment.constants import AssessmentViewSetPermissions
 from ..assessment.models import Assessment, TimeSpentEditing
 from ..common.api import DisabledPagination
-from ..common.api.utils import get_published_only
+from ..common.api.utils import get_published_only, get_streaming_format
 from ..common.helper import tryParseInt
 from ..common.renderers import PandasRenderers
 from ..common.serializers import ExportQuerySerializer, UnusedSerializer
@@ -62,6 +62,8 @@ class RiskOfBiasAssessmentViewSet(BaseAssessmentViewSet):
             .order_by("riskofbias__study__short_citation", "riskofbias_id", "id")
         )
         filename = f"{self.assessment}-{rob_name}"
+        if format := get_streaming_format(request):
+            return exports.RiskOfBiasExporter.streaming_export(qs, filename, format)
         exporter = exports.RiskOfBiasExporter.flat_export(qs, filename)
         return Response(exporter)
 
@@ -89,6 +91,8 @@ class RiskOfBiasAssessmentViewSet(BaseAssessmentViewSet):
             .order_by("riskofbias__study__short_citation", "riskofbias_id", "id")
         )
         filename = f"{self.assessment}-{rob_name}-complete"
+        if format := get_streaming_format(request):
+            return exports.RiskOfBiasCompleteExporter.streaming_export(qs, filename, format)
         exporter = exports.RiskOfBiasCompleteExporter.flat_export(qs, filename)
         return Response(exporter)
 
@@ -429,4 +429,6 @@ class MetricFinalScoresSerializer(serializers.ModelSerializer):
         return serializer.data
 
 
-SerializerHelper.add_serializer(models.RiskOfBias, RiskOfBiasSerializer)
+SerializerHelper.add_serializer(
+    models.RiskOfBias, RiskOfBiasSerializer, assessment="study__assessment"
+)
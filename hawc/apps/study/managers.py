@@ -48,6 +48,13 @@ def study_df_mapping(key_prefix: str = "", query_prefix: str = "") -> dict:
 
 
 class StudyQuerySet(QuerySet):
+    def optimized_for_serialization(self):
+        return self.prefetch_related(
+            "identifiers",
+            "searches",
+            "riskofbiases__scores__metric__domain",
+        )
+
     def flat_df(self) -> pd.DataFrame:
         return pd.DataFrame(
             data=self.annotate(**study_df_annotations()).values_list(*study_df_mapping().values()),
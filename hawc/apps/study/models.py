@@ -125,6 +125,13 @@ class Study(Reference):
         verbose_name_plural = "Studies"
         ordering = ("short_citation",)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # track publication changes, which invalidate cached tables
+        instance._initial_published = instance.__dict__.get("published")
+        return instance
+
     @classmethod
     def save_new_from_reference(cls, reference, attrs):
         """
@@ -226,15 +233,7 @@ class Study(Reference):
             )
 
     def optimized_for_serialization(self):
-        return (
-            self.__class__.objects.filter(id=self.id)
-            .prefetch_related(
-                "identifiers",
-                "searches",
-                "riskofbiases__scores__metric__domain",
-            )
-            .first()
-        )
+        return self.__class__.objects.filter(id=self.id).optimized_for_serialization().first()
 
     def get_study(self):
         return self
@@ -101,7 +101,7 @@ class SummaryAssessmentViewSet(BaseAssessmentViewSet):
         with PydanticToDjangoError(drf=True):
             config = schemas.VisualDataRequest.model_validate(request.data)
         instance = config.mock_visual(assessment)
-        data = instance.get_data()
+        data = instance.get_cached_data()
         return Response(data)
 
 
@@ -136,7 +136,7 @@ class VisualViewSet(EditPermissionsCheckMixin, AssessmentEditViewSet):
     def data(self, request, pk):
         obj = self.get_object()
         try:
-            df = obj.data_df()
+            df = obj.cached_data_df()
         except ValueError:
             return Response(
                 {"error": "Data export not available for this visual type."},
@@ -148,7 +148,7 @@ class VisualViewSet(EditPermissionsCheckMixin, AssessmentEditViewSet):
     def json_data(self, request, pk):
         """Get json data export for a visual."""
         instance = self.get_object()
-        data = instance.get_data()
+        data = instance.get_cached_data()
         return Response(data)
 
 
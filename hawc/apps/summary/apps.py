@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class SummaryConfig(AppConfig):
+    name = "hawc.apps.summary"
+    verbose_name = "Summary"
+
+    def ready(self):
+        from . import signals  # noqa
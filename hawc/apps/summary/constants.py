@@ -82,6 +82,53 @@ def get_default_evidence_type(visual_type: VisualType) -> StudyType:
     return next(iter(choices))
 
 
+# models whose changes may change visual data; see `Visual.bust_data_cache`
+VISUAL_DATA_MODELS = {
+    "animal.animalgroup",
+    "animal.dosegroup",
+    "animal.dosingregime",
+    "animal.endpoint",
+    "animal.experiment",
+    "assessment.assessment",
+    "assessment.dataset",
+    "assessment.datasetrevision",
+    "bmd.session",
+    "eco.cause",
+    "eco.design",
+    "eco.effect",
+    "eco.result",
+    "epi.comparisonset",
+    "epi.criteria",
+    "epi.exposure",
+    "epi.group",
+    "epi.groupnumericaldescriptions",
+    "epi.groupresult",
+    "epi.outcome",
+    "epi.result",
+    "epi.studypopulation",
+    "epimeta.metaprotocol",
+    "epimeta.metaresult",
+    "epiv2.adjustmentfactor",
+    "epiv2.chemical",
+    "epiv2.dataextraction",
+    "epiv2.design",
+    "epiv2.exposure",
+    "epiv2.exposurelevel",
+    "epiv2.outcome",
+    "invitro.ivcelltype",
+    "invitro.ivchemical",
+    "invitro.ivendpoint",
+    "invitro.ivexperiment",
+    "lit.reference",
+    "lit.referencefiltertag",
+    "riskofbias.riskofbias",
+    "riskofbias.riskofbiasdomain",
+    "riskofbias.riskofbiasmetric",
+    "riskofbias.riskofbiasscore",
+    "study.study",
+}
+
+
 class ExportStyle(models.IntegerChoices):
     EXPORT_GROUP = 0, "One row per Endpoint-group/Result-group"
     EXPORT_ENDPOINT = 1, "One row per Endpoint/Result"
@@ -1,8 +1,11 @@
+import hashlib
 import json
 import logging
+import time
 
 import pandas as pd
 from django.contrib.contenttypes.fields import GenericRelation
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.urls import reverse
@@ -20,7 +23,7 @@ from ..animal.exports import EndpointFlatDataPivot, EndpointGroupFlatDataPivot
 from ..animal.models import Endpoint
 from ..assessment.constants import EpiVersion, RobName
 from ..assessment.models import Assessment, BaseEndpoint, DoseUnits, LabeledItem
-from ..common.helper import FlatExport, PydanticToDjangoError, ReportExport
+from ..common.helper import FlatExport, PydanticToDjangoError, ReportExport, cacheable
 from ..common.validators import validate_html_tags, validate_hyperlinks
 from ..eco.exports import EcoFlatComplete
 from ..epi.exports import OutcomeDataPivot
@@ -453,6 +456,74 @@ class Visual(models.Model):
             case _:
                 return {}
 
+    @staticmethod
+    def _data_generation_key(assessment_id: int) -> str:
+        return f"assessment-{assessment_id}-visual-data-generation"
+
+    @classmethod
+    def get_data_generation(cls, assessment_id: int) -> int:
+        """Return the current visual data generation for an assessment."""
+        key = cls._data_generation_key(assessment_id)
+        generation = cache.get(key)
+        if generation is None:
+            # seed with a timestamp so an evicted counter never reuses an old generation
+            cache.add(key, time.time_ns(), None)
+            generation = cache.get(key)
+        return generation
+
+    @classmethod
+    def bust_data_cache(cls, assessment_id: int):
+        """Invalidate cached data for all visuals in an assessment."""
+        key = cls._data_generation_key(assessment_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+    def settings_hash(self) -> str:
+        """A hash of the visual configuration which determines its data."""
+        content = json.dumps(
+            [
+                self.visual_type,
+                self.evidence_type,
+                self.dose_units_id,
+                self.dataset_id,
+                self.settings,
+                self.prefilters,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+    def _data_cache_key(self, name: str) -> str:
+        generation = self.get_data_generation(self.assessment_id)
+        return (
+            f"assessment-{self.assessment_id}-visual-{self.id}-{name}-"
+            f"{self.settings_hash()}-{generation}"
+        )
+
+    def get_cached_data(self) -> dict:
+        """Get data needed to display Visual, from cache if possible; see `get_data`."""
+        if self.id is None:
+            return self.get_data()  # unsaved previews are not cached
+        return cacheable(self.get_data, self._data_cache_key("data"), lock=True)
+
+    def cached_data_df(self) -> pd.DataFrame:
+        """Get the visual data export, from cache if possible; see `data_df`."""
+        if self.id is None:
+            return self.data_df()
+        return cacheable(self.data_df, self._data_cache_key("df"), lock=True)
+
+    def warm_data_cache(self):
+        """Build cached data for the visual, if it is not already cached."""
+        if self.visual_type == constants.VisualType.PRISMA:
+            self.get_cached_data()
+        try:
+            self.cached_data_df()
+        except ValueError:
+            pass  # data export not available for this visual type
+
     def read_config(self) -> dict:
         """Configuration required to render an instance of the visual in read-only views."""
         match self.visual_type:
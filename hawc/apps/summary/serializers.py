@@ -38,13 +38,10 @@ class VisualSerializer(serializers.ModelSerializer):
         ]:
             ret["rob_settings"] = AssessmentRiskOfBiasSerializer(instance.assessment).data
 
-        ret["endpoints"] = [
-            SerializerHelper.get_serialized(d, json=False) for d in instance.get_endpoints()
-        ]
-
-        ret["studies"] = [
-            SerializerHelper.get_serialized(d, json=False) for d in instance.get_studies()
-        ]
+        ret["endpoints"] = SerializerHelper.get_serialized_many(
+            instance.get_endpoints(), json=False
+        )
+        ret["studies"] = SerializerHelper.get_serialized_many(instance.get_studies(), json=False)
 
         return ret
 
@@ -0,0 +1,45 @@
+from django.apps import apps
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from ..assessment.models import DoseUnits
+from . import constants, models, tasks
+
+
+def invalidate_assessment_data(sender, instance, origin=None, **kwargs):
+    """Invalidate cached visual data for a changed object's assessment."""
+    if (
+        isinstance(origin, Model)
+        and origin is not instance
+        and origin._meta.label_lower in constants.VISUAL_DATA_MODELS
+    ):
+        return  # deleted in a cascade; the object whose deletion cascaded invalidates data
+    try:
+        assessment = instance.get_assessment()
+    except (ObjectDoesNotExist, ValueError):
+        return  # not yet related to an assessment
+    if assessment is not None:
+        models.Visual.bust_data_cache(assessment.id)
+
+
+for label in constants.VISUAL_DATA_MODELS:
+    model = apps.get_model(label)
+    post_save.connect(invalidate_assessment_data, sender=model)
+    pre_delete.connect(invalidate_assessment_data, sender=model)
+
+
+@receiver(post_save, sender=DoseUnits)
+def invalidate_dose_units_data(sender, instance, created, **kwargs):
+    if created:
+        return
+    for assessment_id in instance.get_assessment_ids():
+        models.Visual.bust_data_cache(assessment_id)
+
+
+@receiver(post_save, sender=models.Visual)
+def warm_published_visual(sender, instance, **kwargs):
+    if instance.published:
+        transaction.on_commit(lambda: tasks.warm_visual_data.delay(instance.id))
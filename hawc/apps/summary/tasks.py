@@ -0,0 +1,15 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.apps import apps
+
+logger = get_task_logger(__name__)
+
+
+@shared_task
+def warm_visual_data(visual_id: int):
+    # build cached data for a published visual so the first viewer doesn't wait
+    visual = apps.get_model("summary", "Visual").objects.filter(id=visual_id).first()
+    if visual is None:
+        return
+    logger.info(f"Warming data cache for visual {visual_id}")
+    visual.warm_data_cache()
@@ -1,10 +1,10 @@
 # Cache class for User Defined Fields.
 from django.contrib.contenttypes.models import ContentType
-from django.core.cache import cache
 from django.db import models
 from django.utils import safestring
 
 from ..assessment.models import Assessment
+from ..common.cache import local_cache
 from ..common.helper import cacheable
 from .models import ModelBinding
 
@@ -33,13 +33,13 @@ class UDFCache:
         """
         ct = ContentType.objects.get_for_model(Model)
         key = _get_mb_cache_key(assessment, ct)
-        return cacheable(_get_model_binding, key, assessment=assessment, Model=Model)
+        return cacheable(_get_model_binding, key, local=True, assessment=assessment, Model=Model)
 
     @classmethod
     def clear_model_binding_cache(cls, model_binding: ModelBinding):
         """Clear ModelBinding cache"""
         key = _get_mb_cache_key(model_binding.assessment, model_binding.content_type)
-        cache.delete(key)
+        local_cache.delete(key)
 
 
 def _get_tag_cache_key(assessment_id: int) -> str:
@@ -56,9 +56,9 @@ class TagCache:
             forms = {binding.tag_id: binding.get_form_html() for binding in bindings}
             return forms
 
-        return cacheable(_get_forms, key, assessment=assessment)
+        return cacheable(_get_forms, key, local=True, assessment=assessment)
 
     @classmethod
     def clear(cls, assessment_id: int):
         key = _get_tag_cache_key(assessment_id)
-        cache.delete(key)
+        local_cache.delete(key)
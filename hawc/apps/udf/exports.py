@@ -45,6 +45,9 @@ class ModelUDFContentExport(ModelExport):
 
 
 class ModelUDFContentExporter(Exporter):
+    # content columns are expanded dynamically; chunks may have different columns
+    streamable = False
+
     def build_modules(self) -> list[ModelExport]:
         return [
             ContentTypeExport("content_type", "content_type"),
@@ -71,6 +74,9 @@ class TagUDFContentExport(ModelExport):
 
 
 class TagUDFContentExporter(Exporter):
+    # content columns are expanded dynamically; chunks may have different columns
+    streamable = False
+
     def build_modules(self) -> list[ModelExport]:
         return [
             TagUDFContentExport(),
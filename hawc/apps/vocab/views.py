@@ -21,7 +21,11 @@ class VocabBrowse(TemplateView):
             ).model_dump_json()
 
         return cacheable(
-            get_app_config, f"{self.vocab_name}-df-json", cache_duration=settings.CACHE_10_MIN
+            get_app_config,
+            f"{self.vocab_name}-df-json",
+            cache_duration=settings.CACHE_10_MIN,
+            lock=True,
+            stale_duration=settings.CACHE_1_HR,
         )
 
     def get_data(self) -> pd.DataFrame: ...
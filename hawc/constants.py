@@ -19,6 +19,7 @@ class FeatureFlags(BaseModel):
     ENABLE_WIP_VISUALS: bool = False
     ENABLE_FILTER_DOWNLOADS: bool = False
     ENABLE_NEW_HERO: bool = False
+    ENABLE_EXPORT_SNAPSHOTS: bool = False
 
     @classmethod
     def from_env(cls, variable) -> "FeatureFlags":
@@ -35,8 +35,8 @@ app.conf.beat_schedule = {
         "schedule": timedelta(days=1),
         "options": {"expires": timedelta(days=1).total_seconds()},
     },
-    "lit-update_pubmed_content-1-day": {
-        "task": "hawc.apps.lit.tasks.update_pubmed_content",
+    "lit-refresh_pubmed_content-1-day": {
+        "task": "hawc.apps.lit.tasks.refresh_pubmed_content",
         "schedule": timedelta(days=1),
         "options": {"expires": timedelta(days=1).total_seconds()},
     },
@@ -188,6 +188,16 @@ CACHES = {
 }
 CACHE_1_HR = 60 * 60
 CACHE_10_MIN = 60 * 10
+# process-local cache tier for hot values; set either to 0 to disable
+LOCAL_CACHE_MAXSIZE = int(os.getenv("HAWC_LOCAL_CACHE_MAXSIZE", "1024"))
+LOCAL_CACHE_TIMEOUT = int(os.getenv("HAWC_LOCAL_CACHE_TIMEOUT", "60"))
+
+# Export snapshots; seconds after the last data change before snapshots are rebuilt
+SNAPSHOT_SETTLE_SECONDS = int(os.getenv("HAWC_SNAPSHOT_SETTLE_SECONDS", "300"))
+
+# Materialized views; periodic refreshes wait until changes have settled, up to a maximum
+MATERIALIZED_REFRESH_SETTLE_SECONDS = 60
+MATERIALIZED_REFRESH_MAX_WAIT_SECONDS = 60 * 15
 
 # Email settings
 EMAIL_SUBJECT_PREFIX = os.environ.get("EMAIL_SUBJECT_PREFIX", "[HAWC] ")
@@ -322,6 +332,9 @@ USER_AGENT = os.getenv("HAWC_USER_AGENT", "hawc")
 # PubMed settings
 PUBMED_API_KEY = os.getenv("PUBMED_API_KEY")
 PUBMED_MAX_QUERY_SIZE = 10000
+# on-disk cache of fetched PubMed articles; articles verified within max age are not refetched
+PUBMED_CACHE_ROOT = Path(os.getenv("HAWC_PUBMED_CACHE_ROOT", PRIVATE_DATA_ROOT / "cache/pubmed"))
+PUBMED_CACHE_MAX_AGE = int(os.getenv("HAWC_PUBMED_CACHE_MAX_AGE", str(60 * 60 * 24)))
 
 # CCTE API key
 EPA_COMPTOX_API_KEY = os.getenv("EPA_COMPTOX_API_KEY")
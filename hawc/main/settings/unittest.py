@@ -44,6 +44,8 @@ EXTERNAL_CONTACT_US = None
 EXTERNAL_ABOUT = None
 EXTERNAL_RESOURCES = None
 
+PUBMED_CACHE_ROOT = None
+
 if HERO_API_KEY is None:
     HERO_API_KEY = "secret"
 
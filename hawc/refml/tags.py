@@ -1,5 +1,7 @@
+from collections import defaultdict
 from typing import Any
 
+import numpy as np
 import pandas as pd
 from django.db.models import QuerySet
 from pydantic import BaseModel as PydanticModel
@@ -50,6 +52,44 @@ def build_tree_node_dict(tree: dict) -> TreeNodeDict:
     return leaves
 
 
+def build_closure(tree_dict: TreeNodeDict) -> pd.DataFrame:
+    """Build an ancestor closure table for a tag tree.
+
+    The closure contains a row for each tag and each edge on the path from the tag to the root;
+    the tree is walked one level at a time using integer arrays, instead of once per tag.
+
+    Args:
+        tree_dict (TreeNodeDict): An instance of the tree
+
+    Returns:
+        pd.DataFrame: A dataframe with columns `tag_id`, `attribute` (the column name of the
+            parent tag on the path), and `value` (the name of the child tag on the path).
+    """
+    nodes = list(tree_dict.values())
+    index = {node.id: i for i, node in enumerate(nodes)}
+    parents = np.array(
+        [-1 if node.parent is None else index[node.parent.id] for node in nodes], dtype=np.int64
+    )
+    tags = current = np.arange(len(nodes))
+    tag_idx, child_idx = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    while (mask := parents[current] >= 0).any():
+        tags, current = tags[mask], current[mask]
+        tag_idx.append(tags)
+        child_idx.append(current)
+        current = parents[current]
+    tag_idx, child_idx = np.concatenate(tag_idx), np.concatenate(child_idx)
+    ids = np.array([node.id for node in nodes], dtype=np.int64)
+    names = np.array([node.name for node in nodes], dtype=object)
+    column_names = np.array([node.column_name for node in nodes], dtype=object)
+    return pd.DataFrame(
+        {
+            "tag_id": ids[tag_idx],
+            "attribute": column_names[parents[child_idx]],
+            "value": names[child_idx],
+        }
+    )
+
+
 def create_df(tag_qs: QuerySet, tree_dict: TreeNodeDict, sep: str = "|") -> pd.DataFrame:
     """Create a dataframe where rows are each reference ID, and parents are each parent tag with
     values being text-values child-tags, pipe-delimited. Used for building heatmaps.
@@ -62,23 +102,26 @@ def create_df(tag_qs: QuerySet, tree_dict: TreeNodeDict, sep: str = "|") -> pd.D
     Returns:
         pd.DataFrame: the resulting dataframe.
     """
-    data = []
-
-    def add_data(ref_id: int, node: TreeNode):
-        if node.parent is not None:
-            data.append((ref_id, node.parent.column_name, node.name))
-            add_data(ref_id, node.parent)
-
-    for reftag in tag_qs:
-        add_data(reftag.content_object_id, tree_dict[reftag.tag_id])
-
-    return (
-        pd.DataFrame(data=data, columns=("ref_id", "attribute", "value"))
+    pairs = pd.DataFrame(
+        data=list(tag_qs.values_list("content_object_id", "tag_id")), columns=("ref_id", "tag_id")
+    )
+    df = (
+        pairs.merge(build_closure(tree_dict), on="tag_id")
+        .loc[:, ["ref_id", "attribute", "value"]]
         .drop_duplicates()
-        .groupby(["ref_id", "attribute"], as_index=False)
-        .agg({"value": sep.join})
-        .reset_index()
-        .drop(columns=["index"])
+    )
+    # only join values where a reference has multiple tags for a parent; a dictionary is much
+    # faster than a pandas groupby with a python aggregation function
+    multiple = df.duplicated(["ref_id", "attribute"], keep=False)
+    values: defaultdict[tuple[int, str], list[str]] = defaultdict(list)
+    for ref_id, attribute, value in df[multiple].itertuples(index=False, name=None):
+        values[(ref_id, attribute)].append(value)
+    joined = pd.DataFrame(
+        data=[(*key, sep.join(value)) for key, value in values.items()],
+        columns=("ref_id", "attribute", "value"),
+    )
+    return (
+        pd.concat([df[~multiple], joined], ignore_index=True)
         .pivot(index="ref_id", columns="attribute", values="value")
         .reset_index()
         .fillna("")
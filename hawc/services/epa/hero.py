@@ -1,5 +1,9 @@
 import json
 import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from itertools import chain
 from typing import Any
 
 import requests
@@ -7,11 +11,16 @@ from django.conf import settings
 
 from ...services.utils.doi import try_get_doi
 from ..utils.authors import get_author_short_text, get_first, normalize_authors
+from ..utils.ratelimit import RETRY_STATUS_CODES, RetryableError, with_retry
 from ..utils.sessions import get_session
 
 logger = logging.getLogger(__name__)
 
 
+class HEROFetchError(Exception):
+    """A HERO request failed and should not be retried."""
+
+
 def _parse_pseudo_json(d: dict, field: str) -> Any:
     # built-in json parser doesn't identify nulls in HERO returns
     v = d.get(field, None)
@@ -88,7 +97,13 @@ class HEROFetch:
     includes the PubMed ID, if available in HERO.
     """
 
-    default_settings = {"recordsperpage": 100}
+    default_settings = {
+        "recordsperpage": 100,
+        "max_workers": 4,
+        "retries": 2,
+        "backoff": 1.0,
+        "min_split": 10,
+    }
 
     def __init__(self, id_list: list[int], **kwargs):
         self.ids = id_list
@@ -116,7 +131,69 @@ class HEROFetch:
             for id in self.ids
         ]
 
-    def get_content(self):
+    def _request_page(self, session, ids: list[int]) -> list[dict]:
+        if settings.HAWC_FEATURES.ENABLE_NEW_HERO:
+            url = "https://heronetnext.epa.gov/api/reference/export/json"
+            request = partial(session.post, url, json={"type": "hero", "id": ids})
+        else:
+            ids_str = ",".join([str(id_) for id_ in ids])
+            rpp = self.settings["recordsperpage"]
+            url = f"https://hero.epa.gov/hero/ws/index.cfm/api/1.0/search/criteria/{ids_str}/recordsperpage/{rpp}.json"
+            request = partial(session.get, url)
+        try:
+            r = request(timeout=30.0)
+        except requests.exceptions.Timeout as err:
+            raise RetryableError(f"HERO request timeout: {url}") from err
+        if r.status_code in RETRY_STATUS_CODES:
+            raise RetryableError(f"HERO request failure: {url}")
+        if r.status_code != 200:
+            raise HEROFetchError(f"HERO request failure: {url}")
+        try:
+            data = r.json()
+        except json.JSONDecodeError as err:
+            raise RetryableError(f"HERO request failure: {url}") from err
+        return data if settings.HAWC_FEATURES.ENABLE_NEW_HERO else data["results"]
+
+    def _fetch_page(self, session, ids: list[int]) -> list[dict]:
+        """Fetch a page of references.
+
+        Pages which HERO rejects are split until the failing references are isolated. Transient
+        failures, such as timeouts, are retried; if they persist, the page is split until pages
+        reach `min_split` references, and then the failure is raised.
+        """
+        try:
+            return with_retry(
+                partial(self._request_page, session, ids),
+                retries=self.settings["retries"],
+                backoff=self.settings["backoff"],
+            )
+        except HEROFetchError as err:
+            logger.info(str(err))
+            if len(ids) == 1:
+                return []
+        except (RetryableError, requests.RequestException) as err:
+            logger.info(str(err))
+            if len(ids) <= self.settings["min_split"]:
+                raise
+        mid = len(ids) // 2
+        logger.info(f"Splitting failed HERO page of {len(ids)} references")
+        return self._fetch_page(session, ids[:mid]) + self._fetch_page(session, ids[mid:])
+
+    def get_content(self, on_page: Callable[[list[dict]], None] | None = None) -> dict:
+        """Fetch content for all references.
+
+        Pages are fetched concurrently, using up to `max_workers` requests at a time. If HERO is
+        unavailable, the transient error is raised once retries are exhausted, and pages not yet
+        started are cancelled.
+
+        Args:
+            on_page (Callable, optional): called in the calling thread with the parsed content of
+                each page as it completes; used to checkpoint progress.
+
+        Returns:
+            dict: parsed references in `success`, and HERO IDs which could not be fetched in
+                `failure`
+        """
         if settings.HAWC_FEATURES.FAKE_IMPORTS:
             self.content = self.fake_content()
             self.failures = []
@@ -131,41 +208,25 @@ class HEROFetch:
         session = get_session(headers)
 
         parse_func = parse_article_new if settings.HAWC_FEATURES.ENABLE_NEW_HERO else parse_article
-        rng = list(range(0, self.ids_count, self.settings["recordsperpage"]))
-        for recstart in rng:
-            request_ids = self.ids[recstart : recstart + self.settings["recordsperpage"]]
-            ids = ",".join([str(id_) for id_ in request_ids])
-            rpp = self.settings["recordsperpage"]
-            results = []
-            if settings.HAWC_FEATURES.ENABLE_NEW_HERO:
-                url = "https://heronetnext.epa.gov/api/reference/export/json"
-                data = {"type": "hero", "id": request_ids}
-                try:
-                    r = session.post(url, json=data, timeout=30.0)
-                    if r.status_code == 200:
-                        results = r.json()
-                    else:
-                        logger.info(f"HERO request failure: {url}")
-                except requests.exceptions.Timeout:
-                    logger.info(f"HERO request timeout: {url}")
-                except json.JSONDecodeError:
-                    logger.info(f"HERO request failure: {url}")
-            else:
-                url = f"https://hero.epa.gov/hero/ws/index.cfm/api/1.0/search/criteria/{ids}/recordsperpage/{rpp}.json"
-                try:
-                    r = session.get(url, timeout=30.0)
-                    if r.status_code == 200:
-                        data = json.loads(r.text)
-                        results = data["results"]
-                    else:
-                        logger.info(f"HERO request failure: {url}")
-                except requests.exceptions.Timeout:
-                    logger.info(f"HERO request timeout: {url}")
-                except json.JSONDecodeError:
-                    logger.info(f"HERO request failure: {url}")
-
-            for ref in results:
-                self.content.append(parse_func(ref))
+        rpp = self.settings["recordsperpage"]
+        pages = [self.ids[recstart : recstart + rpp] for recstart in range(0, self.ids_count, rpp)]
+        results: list[list[dict]] = [[] for _ in pages]
+        with ThreadPoolExecutor(max_workers=max(1, self.settings["max_workers"])) as executor:
+            futures = {
+                executor.submit(self._fetch_page, session, page): i for i, page in enumerate(pages)
+            }
+            try:
+                for future in as_completed(futures):
+                    content = [parse_func(ref) for ref in future.result()]
+                    results[futures[future]] = content
+                    if on_page:
+                        on_page(content)
+            except Exception:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        # return content in page order
+        self.content = list(chain.from_iterable(results))
         self.failures = self._get_missing_ids()
         return dict(success=self.content, failure=self.failures)
 
@@ -1,17 +1,135 @@
+import hashlib
 import logging
 import random
 import re
+import tempfile
+import time
 import xml.etree.ElementTree as ET
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from itertools import chain
+from pathlib import Path
 
 from django.conf import settings
 
 from ..utils.authors import get_author_short_text, normalize_author
+from ..utils.ratelimit import RETRY_STATUS_CODES, RetryableError, get_bucket, with_retry
 from ..utils.sessions import get_session
 
 logger = logging.getLogger(__name__)
 
 
+def get_rate_limit() -> float:
+    """NCBI E-utilities allow 10 requests per second with an API key, otherwise 3."""
+    return 10 if settings.PUBMED_API_KEY else 3
+
+
+def _post[T](
+    session, url: str, payload: dict, parse: Callable[[Iterator[ET.Element]], T], name: str
+) -> T:
+    # rate-limited POST with retries; the response XML is parsed as it streams in
+    def request():
+        get_bucket("pubmed", get_rate_limit()).acquire()
+        with session.post(url, data=payload, timeout=15, stream=True) as resp:
+            if resp.status_code in RETRY_STATUS_CODES:
+                raise RetryableError(f"HTTP {resp.status_code}")
+            if resp.status_code != 200:
+                logger.error(f"Pubmed failure: {resp.status_code} -> {resp.text}")
+                logger.error(f"Pubmed failure data submission: {payload}")
+                raise Exception(f"{name} query failed; please reformat query or try again later")
+            resp.raw.decode_content = True
+            return parse(_iter_children(resp.raw))
+
+    return with_retry(request)
+
+
+def _iter_children(source) -> Iterator[ET.Element]:
+    # yield the root element, and then each complete child of the root element
+    depth = 0
+    root = None
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if depth == 0:
+                root = element
+                yield root
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 1:
+                yield element
+                root.remove(element)
+
+
+def _map_pages[T](func: Callable[[int], T], starts: list[int]) -> list[T]:
+    # fetch pages concurrently; the token bucket bounds the request rate
+    if len(starts) <= 1:
+        return [func(start) for start in starts]
+    with ThreadPoolExecutor(max_workers=min(len(starts), int(get_rate_limit()))) as executor:
+        return list(executor.map(func, starts))
+
+
+class PubMedCache:
+    """
+    On-disk cache of PubMed article XML, keyed by PMID.
+
+    Article XML is content-addressed; each PMID references the digest of its latest content, and
+    the reference is touched whenever the content is verified. Cached content is used if it was
+    verified within `max_age` seconds.
+    """
+
+    def __init__(self, root: Path, max_age: int):
+        self.root = Path(root)
+        self.max_age = max_age
+
+    @classmethod
+    def from_settings(cls) -> "PubMedCache | None":
+        if settings.PUBMED_CACHE_ROOT is None:
+            return None
+        return cls(settings.PUBMED_CACHE_ROOT, settings.PUBMED_CACHE_MAX_AGE)
+
+    def _ref_path(self, pmid: int) -> Path:
+        return self.root / "pmid" / f"{pmid % 1000:03}" / str(pmid)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.xml"
+
+    def _write(self, path: Path, text: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # unique per process and thread; replaced atomically so readers never see partial files
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, prefix=f".{path.name}.", delete=False
+        ) as f:
+            f.write(text)
+        Path(f.name).replace(path)
+
+    def get(self, pmid: int) -> str | None:
+        """Return cached article XML for a PMID, or None if missing or expired."""
+        ref = self._ref_path(pmid)
+        try:
+            if time.time() - ref.stat().st_mtime > self.max_age:
+                return None
+            return self._object_path(ref.read_text()).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def set(self, pmid: int, xml: str) -> bool:
+        """Cache article XML for a PMID; return True if the content changed."""
+        digest = hashlib.sha256(xml.encode("utf-8")).hexdigest()
+        obj = self._object_path(digest)
+        if not obj.exists():
+            self._write(obj, xml)
+        ref = self._ref_path(pmid)
+        try:
+            if ref.read_text() == digest:
+                ref.touch()
+                return False
+        except OSError:
+            pass
+        self._write(ref, digest)
+        return True
+
+
 class PubMedSearch:
     """Search PubMed with search-term and return a complete list of PubMed IDs."""
 
@@ -19,14 +137,33 @@ class PubMedSearch:
     default_data = dict(db="pubmed", retmode="xml")
     retmax = 5000
 
-    def __init__(self, term: str):
+    def __init__(
+        self,
+        term: str,
+        mindate: date | None = None,
+        maxdate: date | None = None,
+        webenv: str | None = None,
+    ):
         self.id_count: int | None = None
         self.term = term
+        self.mindate = mindate
+        self.maxdate = maxdate
+        self.webenv = webenv
         self.session = get_session()
 
     def get_payload(self, extra: dict | None = None) -> dict:
         payload = self.default_data.copy()
         payload["term"] = self.term
+        if self.mindate:
+            # restrict to records modified in the date range, inclusive
+            payload.update(
+                datetype="mdat",
+                mindate=self.mindate.strftime("%Y/%m/%d"),
+                maxdate=(self.maxdate or self.mindate).strftime("%Y/%m/%d"),
+            )
+        if self.webenv:
+            # search within a set posted to the history server
+            payload["WebEnv"] = self.webenv
         if settings.PUBMED_API_KEY:
             payload["api_key"] = settings.PUBMED_API_KEY
         if extra:
@@ -46,28 +183,27 @@ class PubMedSearch:
         else:
             raise Exception("Search query failed; please reformat query or try again later")
 
-    def _parse_ids(self, tree: str) -> list[int]:
-        return [int(id.text) for id in ET.fromstring(tree).find("IdList").findall("Id")]
+    def _parse_ids(self, elements: Iterator[ET.Element]) -> list[int]:
+        next(elements)  # root
+        for element in elements:
+            if element.tag == "IdList":
+                return [int(id.text) for id in element.findall("Id")]
+        return []
+
+    def _fetch_page(self, retstart: int) -> list[int]:
+        payload = self.get_payload(extra=dict(retmax=self.retmax, retstart=retstart))
+        return _post(self.session, PubMedSearch.base_url, payload, self._parse_ids, "Search")
 
     def _fetch_ids(self):
         if settings.HAWC_FEATURES.FAKE_IMPORTS:
             self.ids = [random.randrange(100_000_000, 999_9999_999)]  # noqa: S311
             return
 
-        ids = []
-        payload = self.get_payload(extra=dict(retmax=self.retmax))
         if self.id_count is None:
-            self._get_id_count()
+            self.id_count = self._get_id_count()
         rng = list(range(0, self.id_count, self.retmax))
         self.request_count = len(rng)
-        for retstart in rng:
-            payload["retstart"] = retstart
-            resp = self.session.post(PubMedSearch.base_url, data=payload, timeout=15)
-            if resp.status_code == 200:
-                ids.extend(self._parse_ids(resp.text))
-            else:
-                raise Exception("Search query failed; please reformat query or try again later")
-        self.ids = ids
+        self.ids = list(chain.from_iterable(_map_pages(self._fetch_page, rng)))
 
     def get_ids_count(self) -> int:
         self.id_count = self._get_id_count()
@@ -85,17 +221,68 @@ class PubMedSearch:
         }
 
 
+def _parse_post(elements: Iterator[ET.Element]) -> tuple[str, str]:
+    next(elements)  # root
+    values = {element.tag: element.text for element in elements}
+    if "WebEnv" not in values or "QueryKey" not in values:
+        raise Exception("Post query failed; please try again later")
+    return values["WebEnv"], values["QueryKey"]
+
+
+def filter_modified(ids: list[int], mindate: date, maxdate: date) -> list[int]:
+    """Return the PubMed IDs from a list whose records were modified in a date range, inclusive.
+
+    The IDs are posted to the E-utilities history server, and the posted set is searched by
+    modification date; callers should pass at most `PUBMED_MAX_QUERY_SIZE` IDs at a time.
+
+    Args:
+        ids (list[int]): PubMed IDs to check
+        mindate (date): first date in the range
+        maxdate (date): last date in the range
+
+    Returns:
+        list[int]: IDs modified in the date range
+    """
+    if not ids or settings.HAWC_FEATURES.FAKE_IMPORTS:
+        return []
+    session = get_session()
+    payload = dict(db="pubmed", id=",".join(str(id) for id in ids))
+    if settings.PUBMED_API_KEY:
+        payload["api_key"] = settings.PUBMED_API_KEY
+    webenv, query_key = _post(
+        session,
+        "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/epost.fcgi",
+        payload,
+        _parse_post,
+        "Post",
+    )
+    search = PubMedSearch(f"#{query_key}", mindate=mindate, maxdate=maxdate, webenv=webenv)
+    return search.get_ids()
+
+
 class PubMedFetch:
-    """Given a list of PubMed IDs, return list of dict of PubMed citation."""
+    """Given a list of PubMed IDs, return list of dict of PubMed citation.
+
+    Pages of IDs are requested concurrently within NCBI rate limits. If a `PubMedCache` is
+    configured, recently fetched articles are read from the cache instead of requested.
+    """
 
     base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
     default_data = dict(retmax=1000, db="pubmed", retmode="xml")
 
-    def __init__(self, id_list: list[int], **kwargs):
+    def __init__(
+        self,
+        id_list: list[int],
+        cache: PubMedCache | None = None,
+        use_cache: bool = True,
+        **kwargs,
+    ):
         super().__init__()
         self.ids = id_list
         self.content: list[dict] = []
         self.session = get_session()
+        self.cache = cache if cache is not None else PubMedCache.from_settings()
+        self.use_cache = use_cache
 
     def get_payload(self, extra: dict | None = None) -> dict:
         payload = self.default_data.copy()
@@ -121,29 +308,51 @@ class PubMedFetch:
             for id in self.ids
         ]
 
+    def _parse_articles(self, elements: Iterator[ET.Element]) -> list[dict]:
+        root = next(elements)
+        if root.tag != "PubmedArticleSet":
+            raise ValueError(f"Unexpected response type: {root.tag}")
+        results = []
+        for element in elements:
+            if result := PubMedParser.parse(element):
+                results.append(result)
+                if self.cache:
+                    self.cache.set(result["PMID"], result["xml"])
+        return results
+
+    def _fetch_page(self, ids: list[int]) -> list[dict]:
+        payload = self.get_payload(extra=dict(id=ids))
+        return _post(self.session, PubMedFetch.base_url, payload, self._parse_articles, "Fetch")
+
     def get_content(self) -> list[dict]:
-        payload = self.get_payload()
-        rng = list(range(0, len(self.ids), payload["retmax"]))
+        if settings.HAWC_FEATURES.FAKE_IMPORTS:
+            self.request_count = 1 if self.ids else 0
+            self.content = self.fake()
+            return self.content
+
+        ids = list(dict.fromkeys(int(id) for id in self.ids))
+        cached = []
+        if self.cache and self.use_cache:
+            for id in ids:
+                if (xml := self.cache.get(id)) and (
+                    result := PubMedParser.parse(ET.fromstring(xml))
+                ):
+                    cached.append(result)
+            found = {result["PMID"] for result in cached}
+            ids = [id for id in ids if id not in found]
+
+        retmax = self.default_data["retmax"]
+        rng = list(range(0, len(ids), retmax))
         self.request_count = len(rng)
-        for retstart in rng:
-            if settings.HAWC_FEATURES.FAKE_IMPORTS:
-                self.content = self.fake()
-                break
-
-            payload["id"] = self.ids[retstart : retstart + payload["retmax"]]
-            resp = self.session.post(PubMedFetch.base_url, data=payload, timeout=15)
-            if resp.status_code == 200:
-                tree = ET.fromstring(resp.text.encode("utf-8"))
-                if tree.tag != "PubmedArticleSet":
-                    raise ValueError(f"Unexpected response type: {tree.tag}")
-                for content in tree:
-                    result = PubMedParser.parse(content)
-                    if result:
-                        self.content.append(result)
-            else:
-                logger.error(f"Pubmed failure: {resp.status_code} -> {resp.text}")
-                logger.error(f"Pubmed failure data submission: {payload}")
-                raise Exception("Fetch query failed; please reformat query or try again later")
+        pages = _map_pages(
+            lambda retstart: self._fetch_page(ids[retstart : retstart + retmax]), rng
+        )
+
+        # return content in the order requested
+        order = {int(id): i for i, id in enumerate(self.ids)}
+        content = list(chain(cached, *pages))
+        content.sort(key=lambda d: order.get(d["PMID"], len(order)))
+        self.content.extend(content)
         return self.content
 
 
@@ -181,6 +390,20 @@ class PubMedParser:
         d.update(cls._authors_info(tree, cls.ARTICLE))
         return d
 
+    @classmethod
+    def get_date_revised(cls, xml: str) -> date | None:
+        """Return the date a record was last revised, given the article XML."""
+        try:
+            revised = ET.fromstring(xml).find(".//DateRevised")
+        except ET.ParseError:
+            return None
+        if revised is None:
+            return None
+        try:
+            return date(*(int(revised.findtext(field)) for field in ("Year", "Month", "Day")))
+        except (TypeError, ValueError):
+            return None
+
     @classmethod
     def _parse_book(cls, tree: ET.Element) -> dict:
         pmid = int(cls._try_single_find(tree, "BookDocument/PMID"))
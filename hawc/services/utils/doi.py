@@ -1,9 +1,17 @@
 import html
 import json
+import re
 import urllib.parse
 
+import pandas as pd
+
 from ...apps.lit.constants import DOI_EXTRACT
 
+# precompiled patterns for extracting DOIs from a series of text
+DOI_EXTRACT_GROUP = re.compile(f"({DOI_EXTRACT.pattern})")
+DOI_TRAILING = re.compile(r'[.,"]+$')
+DOI_XML_END = re.compile(r"</(?:ArticleId|ELocationID)>.*$")
+
 
 def try_get_doi(text: str, full_text: bool = False) -> str | None:
     """Try to extract a DOI out of text.
@@ -33,13 +41,41 @@ def try_get_doi(text: str, full_text: bool = False) -> str | None:
     return doi.lower() if doi else None
 
 
-def get_doi_from_identifier(ident) -> str | None:
+def try_get_dois(texts: pd.Series, full_text: bool = False) -> pd.Series:
+    """Try to extract a DOI out of each text in a series; a vectorized `try_get_doi`.
+
+    Args:
+        texts (pd.Series): The texts to find a DOI
+        full_text (bool, optional): Additional checks if unstructured text, default False.
+
+    Returns:
+        pd.Series: A DOI string for each text, or NaN if one cannot be found
+    """
+    texts = texts.astype(object)
+    # only texts which may contain escaped characters need to be unescaped
+    escaped = texts.str.contains("[&%]", regex=True, na=False)
+    texts[escaped] = texts[escaped].map(lambda text: urllib.parse.unquote(html.unescape(text)))
+    dois = texts.str.extract(DOI_EXTRACT_GROUP, expand=False).astype(object)
+    if full_text:
+        dois = dois.str.replace(DOI_TRAILING, "", regex=True)
+        dois = dois.str.replace(DOI_XML_END, "", regex=True)
+    return dois.str.lower()
+
+
+def get_doi_field(content: str) -> str | None:
+    """Return the DOI field, if any, from the JSON content of an identifier."""
     try:
-        data = json.loads(ident.content)
+        data = json.loads(content)
     except json.JSONDecodeError:
         return None
+    if not isinstance(data, dict):
+        return None
     if "doi" in data:
-        return try_get_doi(data["doi"])
-    if "json" in data and "doi" in data["json"]:
-        return try_get_doi(data["json"]["doi"])
+        return data["doi"]
+    if isinstance(data.get("json"), dict) and "doi" in data["json"]:
+        return data["json"]["doi"]
     return None
+
+
+def get_doi_from_identifier(ident) -> str | None:
+    return try_get_doi(get_doi_field(ident.content))
@@ -0,0 +1,87 @@
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+
+import requests
+import urllib3
+
+logger = logging.getLogger(__name__)
+
+# response status codes which are worth retrying
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    """A transient failure; the request may succeed if retried."""
+
+
+class TokenBucket:
+    """A thread-safe token bucket rate limiter.
+
+    Args:
+        rate (float): tokens added per second
+        capacity (float, default 1): maximum tokens which can accumulate, or the maximum burst
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        """Block until the requested tokens are available, then consume them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(name: str, rate: float) -> TokenBucket:
+    """Return a process-wide token bucket; limits are shared by all threads using the service.
+
+    Args:
+        name (str): the service name
+        rate (float): requests per second
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None or bucket.rate != rate:
+            bucket = _buckets[name] = TokenBucket(rate)
+        return bucket
+
+
+def with_retry[T](func: Callable[[], T], retries: int = 3, backoff: float = 0.5) -> T:
+    """Call a function, retrying transient failures with exponential backoff and jitter.
+
+    Args:
+        func (Callable): function to call; raise `RetryableError` to signal a transient failure
+        retries (int, default 3): maximum number of retries after the first attempt
+        backoff (float, default 0.5): base delay in seconds; doubled after each attempt
+
+    Returns:
+        The return value of the function
+    """
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except (RetryableError, requests.RequestException, urllib3.exceptions.HTTPError) as err:
+            if attempt == retries:
+                raise
+            delay = backoff * 2**attempt * (1 + random.random())  # noqa: S311
+            logger.warning(f"Request failed ({err}); retry {attempt + 1} in {delay:.1f}s")
+            time.sleep(delay)
+    raise ValueError("Unreachable code")
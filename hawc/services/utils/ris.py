@@ -1,6 +1,8 @@
 import logging
 import re
+from collections.abc import Iterable, Iterator
 from copy import copy
+from typing import TextIO
 
 import rispy
 from rispy.parser import ParseError
@@ -10,6 +12,31 @@ from .authors import get_author_short_text, normalize_authors
 logger = logging.getLogger(__name__)
 
 
+class StreamingRisParser(rispy.RisParser):
+    """An RIS parser which yields each record as it is read, instead of returning a list."""
+
+    def iter_lines(self, lines: Iterable[str]) -> Iterator[dict]:
+        lines = iter(lines)
+        last_tag = None
+        try:
+            record = self._iter_till_start(lines)
+            while True:
+                tag, content = self.parse_line(next(lines))
+                if tag is None:
+                    self._add_tag(record, last_tag, content, extend_multiline=True)
+                    continue
+                if tag in self.ignore:
+                    continue
+                if tag == self.END_TAG:
+                    yield record
+                    record = self._iter_till_start(lines)
+                    continue
+                self._add_tag(record, tag, content)
+                last_tag = tag
+        except StopIteration:
+            return
+
+
 class RisImporter:
     @classmethod
     def get_mapping(cls):
@@ -19,12 +46,30 @@ class RisImporter:
         )
         return mapping
 
+    @classmethod
+    def iter_raw_references(cls, f: TextIO) -> Iterator[dict]:
+        """Yield unformatted RIS records as they are read from a file."""
+        return StreamingRisParser(mapping=cls.get_mapping()).iter_lines(f)
+
+    @classmethod
+    def iter_references(cls, f: TextIO) -> Iterator[dict]:
+        """Yield formatted references as they are read from a file.
+
+        Args:
+            f (TextIO): an open text file
+
+        Raises:
+            ValueError: if a reference is in an incorrect format
+        """
+        for content in cls.iter_raw_references(f):
+            yield ReferenceParser(content).format()
+
     @classmethod
     def file_readable(cls, f):
         # ensure that file can be successfully parsed
         try:
-            reader = rispy.load(f, mapping=cls.get_mapping())
-            [content for content in reader]
+            for _ in cls.iter_raw_references(f):
+                pass
             f.seek(0)
             return True
         except ParseError as err:
@@ -33,13 +78,11 @@ class RisImporter:
 
     def __init__(self, f, encoding="utf-8"):
         if isinstance(f, str):
-            f = open(f, encoding=encoding)
+            with open(f, encoding=encoding) as fh:
+                self.raw_references = list(self.iter_raw_references(fh))
         else:
-            f = f
-        reader = rispy.load(f, mapping=self.get_mapping(), encoding=encoding)
-        contents = [content for content in reader]
-        f.close()
-        self.raw_references = contents
+            self.raw_references = list(self.iter_raw_references(f))
+            f.close()
 
     @property
     def references(self):
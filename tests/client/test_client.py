@@ -90,6 +90,14 @@ class TestClient(LiveServerTestCase, TestCase):
         response = client.animal.data(self.db_keys.assessment_client)
         assert isinstance(response, pd.DataFrame)
 
+        # all formats return equivalent data
+        for format in ["csv", "parquet", "arrow"]:
+            df = client.animal.data(self.db_keys.assessment_client, format=format)
+            assert df.shape == response.shape
+
+        with pytest.raises(ValueError):
+            client.animal.data(self.db_keys.assessment_client, format="xlsx")
+
     def test_animal_metadata(self):
         client = HawcClient(self.live_server_url)
         response = client.animal.metadata()
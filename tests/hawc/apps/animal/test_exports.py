@@ -1,9 +1,62 @@
+import numpy as np
 import pandas as pd
 import pytest
-from pandas.testing import assert_series_equal
+from pandas.testing import assert_frame_equal, assert_series_equal
 
-from hawc.apps.animal import exports
+from hawc.apps.animal import constants, exports
 from hawc.apps.animal.models import Endpoint
+from hawc.apps.assessment.models import Assessment
+
+
+@pytest.fixture
+def data_pivot_df() -> pd.DataFrame:
+    """An endpoint-group data pivot export; a continuous and a dichotomous endpoint."""
+    return pd.DataFrame(
+        {
+            "endpoint-id": [10_001] * 3 + [10_002] * 3,
+            "endpoint-data_type": [constants.DataType.CONTINUOUS] * 3
+            + [constants.DataType.DICHOTOMOUS] * 3,
+            "endpoint-variance_type": [constants.VarianceType.SE] * 3
+            + [constants.VarianceType.NA] * 3,
+            "experiment-type_display": ["Short-term (1-30 days)"] * 3 + ["Chronic (>90 days)"] * 3,
+            "dosing_regime-duration_exposure_text": ["30 days"] * 3 + [""] * 3,
+            "animal_group-generation": [""] * 3 + ["F1"] * 3,
+            "animal_group-species_name": ["Rat"] * 3 + ["Mouse"] * 3,
+            "animal_group-strain_name": ["Sprague-Dawley"] * 3 + ["B6C3F1"] * 3,
+            "animal_group-sex_symbol": ["M"] * 3 + ["NR"] * 3,
+            "endpoint_group-id": [11, 12, 13, 21, 22, 23],
+            "endpoint_group-n": [10.0, 10.0, 8.0, 20.0, 20.0, 20.0],
+            "endpoint_group-incidence": [np.nan, np.nan, np.nan, 2.0, 5.0, 10.0],
+            "endpoint_group-response": [10.0, 12.0, 15.0, np.nan, np.nan, np.nan],
+            "endpoint_group-variance": [1.0, 1.5, 2.0, np.nan, np.nan, np.nan],
+            "endpoint_group-lower_ci": None,
+            "endpoint_group-upper_ci": None,
+            "endpoint_group-significant": [False, True, True, False, False, True],
+            "endpoint_group-treatment_effect_display": [
+                "",
+                "yes - adverse",
+                "yes - adverse",
+                None,
+                "no",
+                "yes - not adverse",
+            ],
+            "endpoint_group-NOEL": [False, True, False, True, False, False],
+            "endpoint_group-LOEL": [False, False, True, False, True, False],
+            "endpoint_group-FEL": False,
+            "dose_group-dose": [0.0, 10.0, 30.0, 0.0, 5.0, 50.0],
+            "dose_group-dose_units_id": 1,
+            "dose_group-dose_units_name": "mg/kg-day",
+        }
+    )
+
+
+@pytest.fixture
+def data_pivot_exporter(db_keys) -> exports.EndpointFlatDataPivot:
+    return exports.EndpointFlatDataPivot(
+        queryset=Endpoint.objects.none(),
+        assessment=Assessment.objects.get(id=db_keys.assessment_working),
+        preferred_units=[1],
+    )
 
 
 @pytest.mark.django_db
@@ -27,6 +80,116 @@ class TestEndpointFlatDataPivot:
         df2 = exporter.handle_treatment_period(df)
         assert_series_equal(df2["treatment period"], expected_output)
 
+    def test_handle_bmd(self, data_pivot_exporter, data_pivot_df):
+        # endpoints without a selected model have missing values, as floats
+        df = data_pivot_exporter.handle_bmd(data_pivot_df)
+        assert df["BMD"].dtype == df["BMDL"].dtype == np.float64
+        assert df["BMD"].isna().all()
+
+    def test_handle_flat_doses(self, data_pivot_exporter, data_pivot_df):
+        df = data_pivot_exporter.handle_incidence_summary(data_pivot_df)
+        df = data_pivot_exporter.handle_flat_doses(df)
+        expected = pd.DataFrame(
+            {
+                "endpoint-id": [10_001, 10_002],
+                "Dose 1": [0.0, 0.0],
+                "Dose 2": [10.0, 5.0],
+                "Dose 3": [30.0, 50.0],
+                "Significant 1": ["No", "No"],
+                "Significant 2": ["Yes - ↑", "No"],
+                "Significant 3": ["Yes - ↑", "Yes - ↑"],
+                "Treatment Related Effect 1": ["", None],
+                "Treatment Related Effect 2": ["yes - adverse", "no"],
+                "Treatment Related Effect 3": ["yes - adverse", "yes - not adverse"],
+            }
+        )
+        assert_frame_equal(df[expected.columns], expected)
+
+
+@pytest.mark.django_db
+class TestEndpointGroupFlatDataPivot:
+    def test_handle_stdev_ci(self, data_pivot_exporter, data_pivot_df):
+        df = data_pivot_exporter.handle_ci(data_pivot_exporter.handle_stdev(data_pivot_df))
+        nan = np.nan
+        expected = pd.DataFrame(
+            {
+                "endpoint_group-stdev": [3.1623, 4.7434, 5.6569, nan, nan, nan],
+                "endpoint_group-lower_ci": [
+                    7.737827,
+                    8.606776,
+                    10.270713,
+                    0.017513,
+                    0.095933,
+                    0.278537,
+                ],
+                "endpoint_group-upper_ci": [
+                    12.262173,
+                    15.393224,
+                    19.729287,
+                    0.331856,
+                    0.494577,
+                    0.721884,
+                ],
+            }
+        )
+        assert_frame_equal(df[expected.columns], expected, atol=1e-6)
+
+    def test_handle_dose_groups(self, data_pivot_exporter, data_pivot_df):
+        df = data_pivot_exporter.handle_dose_groups(data_pivot_df)
+        nan = np.nan
+        expected = pd.DataFrame(
+            {
+                "doses": ["0.0, 10.0, 30.0 mg/kg-day"] * 3 + ["0.0, 5.0, 50.0 mg/kg-day"] * 3,
+                "low_dose": [10.0] * 3 + [5.0] * 3,
+                "high_dose": [30.0] * 3 + [50.0] * 3,
+                "FEL": [nan] * 6,
+            }
+        )
+        assert_frame_equal(df[expected.columns], expected)
+
+    def test_handle_descriptions(self, data_pivot_exporter, data_pivot_df):
+        df = data_pivot_exporter.handle_animal_description(data_pivot_df)
+        df = data_pivot_exporter.handle_treatment_period(df)
+        expected = pd.DataFrame(
+            {
+                "animal description": ["Rat, Sprague-Dawley (M)"] * 3
+                + ["F1 Mouse, B6C3F1 (sex=NR)"] * 3,
+                "animal description (with N)": ["Rat, Sprague-Dawley (M, N=8-10)"] * 3
+                + ["F1 Mouse, B6C3F1 (sex=NR, N=20)"] * 3,
+                "treatment period": ["short-term (30 days)"] * 3 + ["chronic"] * 3,
+            }
+        )
+        assert_frame_equal(df[expected.columns], expected)
+
+    def test_handle_percent_control(self, data_pivot_exporter, data_pivot_df):
+        df = data_pivot_exporter.handle_stdev(data_pivot_df)
+        df = data_pivot_exporter.handle_percent_control(df)
+        nan = np.nan
+        expected = pd.DataFrame(
+            {
+                "percent control mean": [0.0, 20.0, 50.0, 0.0, 150.0, 400.0],
+                "percent control low": [-27.718782, -17.650395, 0.999622, nan, nan, nan],
+                "percent control high": [27.718782, 57.650395, 99.000378, nan, nan, nan],
+                "maximum endpoint change": [50.0] * 3 + [400.0] * 3,
+            }
+        )
+        assert_frame_equal(df[expected.columns], expected, atol=1e-6)
+
+    def test_handle_incidence_summary(self, data_pivot_exporter, data_pivot_df):
+        df = data_pivot_exporter.handle_ci(data_pivot_exporter.handle_stdev(data_pivot_df))
+        df = data_pivot_exporter.handle_incidence_summary(df)
+        nan = np.nan
+        expected = pd.DataFrame(
+            {
+                "dichotomous summary": ["-"] * 3
+                + ["2/20 (10.0%)", "5/20 (25.0%)", "10/20 (50.0%)"],
+                "percent affected": [nan] * 3 + [10.0, 25.0, 50.0],
+                "percent lower ci": [nan] * 3 + [1.751264, 9.593259, 27.853670],
+                "percent upper ci": [nan] * 3 + [33.185564, 49.457685, 72.188421],
+            }
+        )
+        assert_frame_equal(df[expected.columns], expected, atol=1e-6)
+
 
 def test_rename_udf_cols():
     df = pd.DataFrame(
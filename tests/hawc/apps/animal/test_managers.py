@@ -1,10 +1,13 @@
 import re
 
+import pandas as pd
 import pytest
+from django.core.cache import cache
 from rest_framework.serializers import ValidationError
 
 from hawc.apps.animal import models
-from hawc.apps.assessment.models import Assessment
+from hawc.apps.assessment.models import Assessment, DoseUnits
+from hawc.apps.study.models import Study
 
 
 @pytest.mark.django_db
@@ -85,3 +88,69 @@ class TestEndpointManager:
         assert len(updated_endpoints) == 1
         endpoint.refresh_from_db()
         self._test_updated_terms(endpoint)
+
+
+@pytest.mark.django_db
+class TestDoseGroupManager:
+    def test_dose_table(self, db_keys, django_capture_on_commit_callbacks):
+        assessment_id = db_keys.assessment_working
+        df = models.DoseGroup.objects.dose_table(assessment_id)
+        assert df.columns.tolist() == [
+            "dose_regime_id",
+            "dose_units_id",
+            "dose_units_name",
+            "dose_group_id",
+            "dose",
+            "published",
+        ]
+        assert df.shape[0] == models.DoseGroup.objects.assessment_qs(assessment_id).count()
+
+        # cached table is invalidated when a dose group changes
+        dose_group = models.DoseGroup.objects.assessment_qs(assessment_id).first()
+        dose_group.dose = 1234.5
+        dose_group.save()
+        df = models.DoseGroup.objects.dose_table(assessment_id)
+        assert 1234.5 in df["dose"].tolist()
+
+        # renaming dose units invalidates tables which include them
+        units = DoseUnits.objects.get(id=df["dose_units_id"].iloc[0])
+        units.name = "renamed units"
+        units.save()
+        df = models.DoseGroup.objects.dose_table(assessment_id)
+        assert "renamed units" in df["dose_units_name"].tolist()
+
+        # study changes only invalidate the table if publication changes
+        key = models.DoseGroup.objects._dose_table_key(assessment_id)
+        study = Study.objects.filter(assessment_id=assessment_id).first()
+        with django_capture_on_commit_callbacks(execute=True):
+            study.save()
+        assert cache.get(key) is not None
+        with django_capture_on_commit_callbacks(execute=True):
+            study.published = not study.published
+            study.save()
+        assert cache.get(key) is None
+
+        # deleting dose groups in bulk invalidates the table
+        models.DoseGroup.objects.dose_table(assessment_id)
+        models.DoseGroup.objects.filter(id=dose_group.id).delete()
+        assert cache.get(key) is None
+
+    def test_endpoint_df(self, db_keys):
+        # NOEL/LOEL/FEL dose group indexes resolve to doses in each dose unit
+        df = models.Endpoint.objects.endpoint_df(db_keys.assessment_working, False)
+        doses = models.DoseGroup.objects.dose_table(db_keys.assessment_working)
+        assert df["noel"].notna().any()
+        for row in df.to_dict(orient="records"):
+            endpoint = models.Endpoint.objects.get(id=row["endpoint id"])
+            for col, index in [
+                ("noel", endpoint.NOEL),
+                ("loel", endpoint.LOEL),
+                ("fel", endpoint.FEL),
+            ]:
+                match = doses[
+                    (doses["dose_regime_id"] == endpoint.animal_group.dosing_regime_id)
+                    & (doses["dose_units_id"] == row["dose units id"])
+                    & (doses["dose_group_id"] == index)
+                ]
+                expected = match["dose"].iloc[0] if match.shape[0] else None
+                assert (pd.isna(row[col]) and expected is None) or row[col] == expected
@@ -0,0 +1,64 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from hawc.apps.animal.models import Endpoint
+from hawc.apps.assessment import snapshots
+
+from ..test_utils import get_client
+
+
+@pytest.fixture
+def snapshot_settings(settings, tmp_path):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "private": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": tmp_path},
+        },
+    }
+    settings.HAWC_FEATURES.ENABLE_EXPORT_SNAPSHOTS = True
+    yield settings
+    settings.HAWC_FEATURES.ENABLE_EXPORT_SNAPSHOTS = False
+
+
+@pytest.mark.django_db
+class TestSnapshots:
+    def test_disabled(self, db_keys):
+        assert snapshots.is_enabled() is False
+        client = get_client(api=True)
+        url = reverse("animal:api:assessment-full-export", args=(db_keys.assessment_final,))
+        resp = client.get(url + "?format=json")
+        assert resp.status_code == 200
+        assert "ETag" not in resp
+
+    def test_lifecycle(self, snapshot_settings, db_keys):
+        assessment_id = db_keys.assessment_final
+        cache.clear()
+        client = get_client(api=True)
+        url = reverse("animal:api:assessment-full-export", args=(assessment_id,))
+        live = client.get(url + "?format=json")
+        assert "ETag" not in live
+
+        # build snapshots; served with the same content as live exports
+        assert snapshots.refresh(assessment_id, wait=False) == 0
+        resp = client.get(url + "?format=json")
+        assert resp.status_code == 200
+        assert b"".join(resp.streaming_content) == live.content
+        etag = resp["ETag"]
+
+        # conditional requests
+        resp = client.get(url + "?format=json", headers={"if-none-match": etag})
+        assert resp.status_code == 304
+        resp = client.get(url + "?format=csv", headers={"if-none-match": etag})
+        assert resp.status_code == 200
+
+        # unpublished data is never served from a snapshot
+        team_client = get_client("team", api=True)
+        resp = team_client.get(url + "?format=json&unpublished=true")
+        assert "ETag" not in resp
+
+        # data changes make the snapshot stale
+        Endpoint.objects.filter(assessment_id=assessment_id).first().save()
+        resp = client.get(url + "?format=json")
+        assert "ETag" not in resp
@@ -0,0 +1,62 @@
+import pytest
+
+from hawc.apps.animal.models import Endpoint
+from hawc.apps.bmd import batch, bmd_interface
+from hawc.apps.bmd.models import Session
+
+
+@pytest.mark.django_db
+class TestBatch:
+    def test_build_items(self):
+        # datasets built in bulk match datasets built from a serialized endpoint
+        sessions = [Session.create_new(Endpoint.objects.get(id=id)) for id in [3, 8, 12]]
+        items = batch.build_items([session.id for session in sessions])
+        assert [item.session_id for item in items] == [session.id for session in sessions]
+        for session, item in zip(sessions, items, strict=True):
+            settings = session.get_settings().settings
+            expected = bmd_interface.build_dataset(session.endpoint, settings.dose_units_id)
+            dataset = bmd_interface.dataset_from_groups(item.data_type, item.doses, item.groups)
+            assert type(dataset) is type(expected)
+            for attr in ["doses", "ns", "means", "stdevs", "incidences"]:
+                assert getattr(dataset, attr, None) == getattr(expected, attr, None)
+
+    def test_execute_sessions(self):
+        sessions = [Session.create_new(Endpoint.objects.get(id=id)) for id in [3, 8]]
+        sessions[0].selected = {**sessions[0].selected, "model_index": 0}
+        sessions[0].active = True
+        sessions[0].save()
+        progress = []
+        report = batch.execute_sessions(
+            [session.id for session in sessions], batch_size=1, progress=progress.append
+        )
+        assert report["total"] == report["executed"] == 2
+        assert report["failed"] == 0
+        assert [p["executed"] for p in progress] == [1, 2]
+
+        # results are saved in new sessions; executed sessions are unchanged
+        for session, n_models in zip(sessions, [7, 11], strict=True):
+            new = Session.objects.filter(endpoint_id=session.endpoint_id).latest()
+            assert new.id != session.id
+            assert new.inputs == session.inputs
+            assert new.date_executed is not None
+            assert new.errors == {}
+            assert new.active is False
+            assert len(new.outputs["models"]) == n_models
+            previous = Session.objects.get(id=session.id)
+            assert previous.outputs == session.outputs
+            assert previous.selected == session.selected
+            assert previous.active == session.active
+
+    def test_latest_in_assessment(self):
+        endpoint = Endpoint.objects.get(id=8)
+        old = Session.create_new(endpoint)
+        new = Session.create_new(endpoint)
+        ids = set(
+            Session.objects.latest_in_assessment(endpoint.assessment_id).values_list(
+                "id", flat=True
+            )
+        )
+        assert new.id in ids
+        assert old.id not in ids
+        # legacy sessions are excluded
+        assert not Session.objects.filter(id__in=ids, version__startswith="BMDS2").exists()
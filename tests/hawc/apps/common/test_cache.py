@@ -0,0 +1,57 @@
+import time
+
+from django.core.cache import cache
+
+from hawc.apps.common.cache import MISSING, LocalCache, local_cache
+from hawc.apps.common.helper import cacheable
+
+
+class TestLocalCache:
+    def test_lru(self):
+        lc = LocalCache(maxsize=2, timeout=60)
+        lc.set("a", 1)
+        lc.set("b", 2)
+        assert lc.get("a") == 1
+        lc.set("c", 3)  # evicts "b", the least recently used
+        assert lc.get("b", MISSING) is MISSING
+        assert lc.get("a") == 1
+        assert lc.get("c") == 3
+        assert lc.stats["local_hit"] == 3
+        assert lc.stats["local_miss"] == 1
+
+    def test_timeout(self):
+        lc = LocalCache(maxsize=2, timeout=0.01)
+        lc.set("a", None)
+        assert lc.get("a", MISSING) is None
+        time.sleep(0.02)
+        assert lc.get("a", MISSING) is MISSING
+
+    def test_invalidate(self):
+        lc = LocalCache(maxsize=10, timeout=60)
+        lc.set("assessment-1-a", 1)
+        lc.set("assessment-1-b", 1)
+        lc.set("assessment-2-a", 1)
+        lc.invalidate("assessment-1-*")
+        assert lc.get("assessment-1-a") is None
+        assert lc.get("assessment-1-b") is None
+        assert lc.get("assessment-2-a") == 1
+
+    def test_disabled(self):
+        lc = LocalCache(maxsize=0, timeout=60)
+        lc.set("a", 1)
+        assert lc.get("a") is None
+
+
+def test_cacheable_local():
+    key = "test-cacheable-local"
+    local_cache.delete(key)
+    assert cacheable(lambda: 1, key, local=True) == 1
+
+    # served from the local tier, even if the shared cache is cleared
+    cache.delete(key)
+    assert cacheable(lambda: 2, key, local=True) == 1
+
+    # deleting invalidates both tiers
+    local_cache.delete(key)
+    assert cacheable(lambda: 3, key, local=True) == 3
+    assert cacheable(lambda: 4, key, local=True, flush=True) == 4
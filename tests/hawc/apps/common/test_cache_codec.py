@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from django.core.cache import cache
+
+from hawc.apps.common import cache_codec
+from hawc.apps.common.helper import CacheEntry, cacheable
+
+
+class TestCodec:
+    def test_roundtrip(self):
+        df = pd.DataFrame(
+            {
+                "int": [1, 2],
+                "str": ["a", None],
+                "str_nan": ["a", np.nan],
+                "float": [1.5, np.nan],
+                "date": pd.to_datetime(["2020-01-01", None]),
+                "nullable": pd.array([1, None], dtype="Int64"),
+            },
+            index=pd.Index(["x", "y"], name="idx"),
+        )
+        encoded = cache_codec.encode(df)
+        assert isinstance(encoded, cache_codec.EncodedFrame)
+        pd.testing.assert_frame_equal(cache_codec.decode(encoded), df)
+
+        # decoded frames are writable
+        decoded = cache_codec.decode(encoded)
+        decoded.loc["x", "int"] = 3
+        decoded["float"] *= 2
+        assert decoded.loc["x", "int"] == 3
+
+        df = pd.DataFrame([[1, 2]], columns=pd.MultiIndex.from_tuples([("a", "x"), ("a", "y")]))
+        pd.testing.assert_frame_equal(cache_codec.decode(cache_codec.encode(df)), df)
+
+    @pytest.mark.parametrize(
+        "df",
+        [
+            pd.DataFrame({"a": [[1], [2]]}),
+            pd.DataFrame({"a": [1, "x"]}),
+            pd.DataFrame({"a": ["x", np.nan, None]}),
+            pd.DataFrame([[1, 2]], columns=["a", "a"]),
+        ],
+    )
+    def test_not_encoded(self, df):
+        # frames which would not round-trip exactly are stored as-is
+        assert cache_codec.encode(df) is df
+        assert cache_codec.decode(df) is df
+
+
+def test_cacheable_frame():
+    key = "test-cacheable-frame"
+    df = pd.DataFrame({"a": np.arange(1000), "b": ["x", "y"] * 500})
+    assert cacheable(lambda: df, key, flush=True).equals(df)
+
+    entry = cache.get(key)
+    assert isinstance(entry, CacheEntry)
+    assert isinstance(entry.value, cache_codec.EncodedFrame)
+    raw, encoded = cache_codec.size_stats.get(key)
+    assert encoded < raw
+
+    pd.testing.assert_frame_equal(cacheable(lambda: None, key), df)
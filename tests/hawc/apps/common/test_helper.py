@@ -1,12 +1,15 @@
+import time
 from io import StringIO
 
 import pandas as pd
 import pytest
+from django.core.cache import cache
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.test import RequestFactory
 from pydantic import BaseModel
 from rest_framework.serializers import ValidationError as DRFValidationError
 
+from hawc.apps.animal.models import Endpoint
 from hawc.apps.assessment.models import Assessment
 from hawc.apps.common import helper
 
@@ -202,3 +205,91 @@ def test_paginate():
     results = helper.paginate(qs, f.get("/"), n_items=1)
     assert results["object_list"].count() == 1
     assert results["paginator"].num_pages == n_items
+
+
+@pytest.mark.django_db
+class TestSerializerHelper:
+    def test_generation(self, db_keys):
+        endpoint = Endpoint.objects.get(id=db_keys.endpoint_working)
+        generation = helper.SerializerHelper.get_generation(endpoint.assessment_id)
+        name = helper.SerializerHelper._get_cache_name(Endpoint, endpoint.id, True)
+        endpoint.get_json()
+        assert cache.get(name)[:2] == (endpoint.assessment_id, generation)
+
+        # busting the assessment changes the generation, so the cached object is stale
+        endpoint.assessment.bust_cache()
+        assert helper.SerializerHelper.get_generation(endpoint.assessment_id) != generation
+        endpoint.get_json()
+        assert cache.get(name)[1] != generation
+
+    def test_dependencies(self, db_keys):
+        endpoint = Endpoint.objects.get(id=db_keys.endpoint_working)
+        name = helper.SerializerHelper._get_cache_name(Endpoint, endpoint.id, True)
+
+        # changing an embedded object invalidates the endpoint
+        endpoint.get_json()
+        assert cache.get(name) is not None
+        endpoint.animal_group.save()
+        assert cache.get(name) is None
+
+        # unrelated endpoints are untouched
+        other = Endpoint.objects.exclude(animal_group=endpoint.animal_group).first()
+        other_name = helper.SerializerHelper._get_cache_name(Endpoint, other.id, True)
+        other.get_json()
+        endpoint.animal_group.save()
+        assert cache.get(other_name) is not None
+
+    def test_get_serialized_many(self, db_keys, django_assert_num_queries):
+        qs = Endpoint.objects.filter(assessment_id=db_keys.assessment_working).order_by("id")
+        expected = [helper.SerializerHelper.get_serialized(obj, from_cache=False) for obj in qs]
+        endpoint = qs.first()
+        endpoint.assessment.bust_cache()
+
+        # cold cache
+        assert helper.SerializerHelper.get_serialized_many(qs) == expected
+        assert endpoint.get_json() == expected[0]
+
+        # warm cache; only object ids are queried
+        with django_assert_num_queries(1):
+            assert helper.SerializerHelper.get_serialized_many(qs) == expected
+        items = helper.SerializerHelper.get_serialized_many(qs, json=False)
+        assert items[0]["id"] == endpoint.id
+
+
+class TestCacheable:
+    def test_cache(self):
+        key = "test-cacheable"
+        cache.delete(key)
+        assert helper.cacheable(lambda: 1, key) == 1
+        assert helper.cacheable(lambda: 2, key) == 1
+        assert helper.cacheable(lambda: 2, key, flush=True) == 2
+
+        # expired entries are recomputed
+        cache.set(key, helper.CacheEntry(value=3, expires=time.time() - 1, delta=0))
+        assert helper.cacheable(lambda: 4, key) == 4
+
+        # early expiration; close to expiration with an expensive computation
+        cache.set(key, helper.CacheEntry(value=5, expires=time.time() + 1, delta=1e6))
+        assert helper.cacheable(lambda: 6, key) == 6
+        cache.set(key, helper.CacheEntry(value=5, expires=time.time() + 1, delta=1e6))
+        assert helper.cacheable(lambda: 6, key, beta=0) == 5
+
+    def test_lock(self):
+        key = "test-cacheable-lock"
+        cache.delete(key)
+        lock_key = f"{key}:lock"
+
+        # the lock is released after computing
+        assert helper.cacheable(lambda: 1, key, lock=True, stale_duration=60) == 1
+        assert cache.get(lock_key) is None
+
+        # if another worker holds the lock, stale values are served
+        cache.set(key, helper.CacheEntry(value=1, expires=time.time() - 1, delta=0))
+        cache.add(lock_key, True)
+        assert helper.cacheable(lambda: 2, key, lock=True) == 1
+        assert cache.get(lock_key) is True
+
+        # and if the lock is released without a value, the value is computed
+        cache.delete(key)
+        cache.delete(lock_key)
+        assert helper.cacheable(lambda: 3, key, lock=True) == 3
@@ -2,6 +2,7 @@ import json
 from io import BytesIO
 
 import pandas as pd
+import pyarrow as pa
 import pytest
 from django.urls import reverse
 from docx import Document
@@ -94,6 +95,80 @@ class TestPandasJsonRenderer:
         assert json.loads(response) == [{"a.1": 1, "a.2": 2}, {"a.1": 3, "a.2": 4}]
 
 
+class TestPandasJsonLinesRenderer:
+    def test_success(self, basic_export):
+        response = renderers.PandasJsonLinesRenderer().render(
+            data=basic_export, renderer_context={"response": Response()}
+        )
+        assert [json.loads(line) for line in response.splitlines()] == [
+            {"a": 1, "b": 2},
+            {"a": 3, "b": 4},
+        ]
+
+
+class TestPandasParquetRenderer:
+    def test_success(self):
+        df = pd.DataFrame(
+            data={
+                "int": [1, 2],
+                "nullable": pd.Series([1, None], dtype="Int64"),
+                "when": pd.to_datetime(["2020-01-01", "2021-06-01"]),
+                "mixed": [1, "a"],
+            }
+        )
+        resp_obj = Response()
+        response = renderers.PandasParquetRenderer().render(
+            data=FlatExport(df=df, filename="fn"), renderer_context={"response": resp_obj}
+        )
+        df2 = pd.read_parquet(BytesIO(response))
+        assert resp_obj["Content-Disposition"] == "attachment; filename=fn.parquet"
+        assert df2.dtypes.to_dict() == {
+            "int": "int64",
+            "nullable": "Int64",
+            "when": "datetime64[ns]",
+            "mixed": "object",
+        }
+        assert df2.mixed.tolist() == ["1", "a"]
+
+
+class TestPandasArrowRenderer:
+    def test_success(self, basic_export):
+        resp_obj = Response()
+        response = renderers.PandasArrowRenderer().render(
+            data=basic_export, renderer_context={"response": resp_obj}
+        )
+        with pa.ipc.open_stream(response) as reader:
+            df2 = reader.read_pandas()
+        assert resp_obj["Content-Disposition"] == "attachment; filename=fn.arrow"
+        assert df2.equals(basic_export.df)
+
+
+class TestStreamingResponse:
+    def test_render_dataframes(self):
+        dfs = [
+            pd.DataFrame(data=[[1, 2]], columns=["a", "b"]),
+            pd.DataFrame(data=[[3, 4]], columns=["a", "b"]),
+        ]
+        assert "".join(renderers.render_dataframes(dfs, "csv")) == "a,b\n1,2\n3,4\n"
+        assert "".join(renderers.render_dataframes(dfs, "tsv")) == "a\tb\n1\t2\n3\t4\n"
+        lines = "".join(renderers.render_dataframes(dfs, "jsonl")).splitlines()
+        assert [json.loads(line) for line in lines] == [{"a": 1, "b": 2}, {"a": 3, "b": 4}]
+
+        # empty exports still include a header
+        empty = [pd.DataFrame(data=[], columns=["a", "b"])]
+        assert "".join(renderers.render_dataframes(empty, "csv")) == "a,b\n"
+        assert "".join(renderers.render_dataframes(empty, "jsonl")) == ""
+
+    def test_response(self, basic_export):
+        resp = renderers.streaming_response([basic_export.df], "my export", "csv")
+        assert resp["Content-Type"] == "text/csv"
+        assert resp["Content-Disposition"] == "attachment; filename=my-export.csv"
+        assert b"".join(resp.streaming_content) == b"a,b\n1,2\n3,4\n"
+
+        with pytest.raises(ValueError):
+            renderers.streaming_response([basic_export.df], "fn", "xlsx")
+
+
 @pytest.mark.django_db
 class TestBrowsableAPIRenderer:
     def test_success(self, db_keys):
@@ -1,4 +1,5 @@
 import re
+from io import StringIO
 from pathlib import Path
 
 import pandas as pd
@@ -20,7 +21,7 @@ from hawc.apps.lit.forms import (
 )
 from hawc.apps.lit.models import Reference, ReferenceFilterTag
 from hawc.apps.study.models import Study
-from hawc.services.utils.ris import ReferenceParser
+from hawc.services.utils.ris import ReferenceParser, RisImporter
 
 from ..test_utils import df_to_form_data
 
@@ -167,7 +168,7 @@ class TestRisImportForm:
             parent=Assessment.objects.get(id=db_keys.assessment_working),
         )
 
-    def test_success(self, db_keys):
+    def test_success(self, db_keys, django_capture_on_commit_callbacks):
         upload_file = Path(__file__).parent / "data/single_ris.txt"
 
         # check ".txt" file extension
@@ -181,8 +182,13 @@ class TestRisImportForm:
         # confirm that after save a reference is
         qs = Reference.objects.filter(authors_short="Ahlborn GJ et al.")
         assert qs.count() == 0
-        form.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            search = form.save()
+            # references are imported in a background task once saved
+            assert qs.count() == 0
+            assert search.import_status["status"] == "queued"
         assert qs.count() == 1
+        assert search.import_status == {"status": "complete", "imported": 1, "error": ""}
 
     def test_not_ris_file(self, db_keys):
         form = self._create_form(db_keys, SimpleUploadedFile("test.pdf", b"Nope"))
@@ -218,7 +224,8 @@ class TestRisImportForm:
             text = re.sub(year_re, replace, base_text)
             form = self._create_form(db_keys, SimpleUploadedFile("test.ris", text.encode()))
             assert form.is_valid()
-            assert form._references[0]["year"] is None
+            with StringIO(text) as f:
+                assert next(RisImporter.iter_references(f))["year"] is None
 
         # invalid
         for replace in ("PY  - abc\n", "PY  - 2009-2010\n"):
@@ -227,6 +234,18 @@ class TestRisImportForm:
             assert form.is_valid() is False
             assert "Invalid year:" in form.errors["import_file"][0]
 
+    def test_validate_start(self, db_keys, monkeypatch):
+        # only the start of large files is validated; the rest is parsed on import
+        base_text = (Path(__file__).parent / "data/single_ris.txt").read_text()
+        invalid = re.sub("PY  - 2009\r?\n", "PY  - abc\n", base_text)
+        text = (base_text + invalid).encode()
+        form = self._create_form(db_keys, SimpleUploadedFile("test.ris", text))
+        assert form.is_valid() is False
+
+        monkeypatch.setattr(RisImportForm, "VALIDATE_SIZE", len(base_text.encode()) + 10)
+        form = self._create_form(db_keys, SimpleUploadedFile("test.ris", text))
+        assert form.is_valid()
+
     def test_no_references(self, db_keys):
         form = self._create_form(db_keys, SimpleUploadedFile("test.ris", b"\n"))
         assert form.is_valid() is False
@@ -5,7 +5,7 @@ from django.test.client import Client
 from django.urls import reverse
 from pytest_django.asserts import assertFormError
 
-from hawc.apps.lit import constants, models
+from hawc.apps.lit import constants, managers, models
 
 
 @pytest.mark.vcr
@@ -419,3 +419,29 @@ class TestRis:
         # check that these exist and are properly associated with a reference
         assert models.Identifiers.objects.get(unique_id="10.1016/b36c36").references.count() == 1
         assert models.Identifiers.objects.get(unique_id="10.1016/b37c37").references.count() == 1
+
+    def test_ris_import_batches(self, db_keys, monkeypatch):
+        """Check that references are imported in batches, and that reruns are idempotent"""
+        monkeypatch.setattr(managers, "IMPORT_BATCH_SIZE", 2)
+        search = models.Search.objects.create(
+            assessment_id=db_keys.assessment_working,
+            search_type="i",
+            source=constants.ReferenceDatabase.RIS,
+            title="ris-batch",
+            slug="ris-batch",
+            description="-",
+        )
+        search.import_file = RisFile(os.path.join(os.path.dirname(__file__), "data/with-doi.ris"))
+
+        n_refs = models.Reference.objects.count()
+        n_idents = models.Identifiers.objects.count()
+        progress = []
+        assert search.import_ris_references(progress=progress.append) == 3
+        assert progress == [2, 3]
+        assert models.Reference.objects.count() == n_refs + 3
+        assert search.references.count() == 3
+
+        # rerun updates existing references and identifiers
+        assert search.import_ris_references() == 3
+        assert models.Reference.objects.count() == n_refs + 3
+        assert models.Identifiers.objects.count() == n_idents + 5
@@ -1,6 +1,9 @@
+import json
+
 import pytest
+from django.utils.timezone import now
 
-from hawc.apps.lit import models
+from hawc.apps.lit import constants, managers, models
 
 
 class TestReferenceTagsManager:
@@ -18,7 +21,56 @@ class TestReferenceTagsManager:
         assert df.to_csv(index=False, lineterminator="\n") == "reference_id,tag_id\n1,2\n"
 
 
+@pytest.mark.django_db
+class TestReferenceQuerySet:
+    def test_full_text_search(self, db_keys):
+        qs = models.Reference.objects.filter(assessment=db_keys.assessment_final)
+        results = qs.full_text_search("kawana 2001", rank=True).with_search_headline("sarin")
+        assert results.count() == 1
+        ref = results.first()
+        assert ref.search_rank > 0
+        assert "<mark>" in ref.search_headline.lower()
+
+        # search vector is updated on save
+        ref.title = "zyxwvut"
+        ref.save()
+        assert qs.full_text_search("zyxwvut").count() == 1
+
+
 class TestReferenceManager:
+    @pytest.mark.django_db
+    def test_bulk_create_from_identifiers(
+        self, db_keys, django_assert_max_num_queries, monkeypatch
+    ):
+        monkeypatch.setattr(managers, "IMPORT_BATCH_SIZE", 2)
+        search = models.Search.objects.create(
+            assessment_id=db_keys.assessment_working,
+            search_type="i",
+            source=constants.ReferenceDatabase.PUBMED,
+            title="bulk",
+            slug="bulk",
+            description="-",
+        )
+        content = json.dumps({"title": "bulk", "authors": [], "year": 2020})
+        identifiers = models.Identifiers.objects.bulk_create(
+            models.Identifiers(
+                database=constants.ReferenceDatabase.PUBMED, unique_id=str(id), content=content
+            )
+            for id in range(900_000_001, 900_000_006)
+        )
+        qs = models.Identifiers.objects.filter(id__in=[ident.id for ident in identifiers])
+
+        # 1 query to fetch the assessment; 1 to fetch identifiers; 3 inserts for each batch;
+        # 1 update to invalidate workflow membership
+        with django_assert_max_num_queries(2 + 3 * 3 + 1):
+            n = models.Reference.objects.bulk_create_from_identifiers(search, qs)
+        assert n == 5
+        refs = search.references.all()
+        assert refs.count() == 5
+        assert set(refs.values_list("identifiers", flat=True)) == set(
+            qs.values_list("id", flat=True)
+        )
+
     @pytest.mark.django_db
     def test_bulk_merge_conflicts(self, db_keys):
         assessment = db_keys.assessment_conflict_resolution
@@ -68,3 +120,127 @@ class TestReferenceManager:
             models.Reference.objects.filter(assessment=assessment, tags__in=tag_ids).count()
             > tagged_animal_before
         )
+
+    @pytest.mark.django_db
+    def test_bulk_merge_conflicts_batched(self, db_keys, monkeypatch):
+        monkeypatch.setattr(managers, "MERGE_BATCH_SIZE", 1)
+        assessment = db_keys.assessment_conflict_resolution
+        refs = models.Reference.objects.filter(assessment=assessment)
+        n = refs.merge_tag_conflicts([34], db_keys.pm_user_id, preview=True)["queryset"].count()
+        assert n > 1
+
+        calls = []
+        merge_result = refs.merge_tag_conflicts(
+            [34], db_keys.pm_user_id, progress=lambda *args: calls.append(args)
+        )
+        assert merge_result["merged"] is True
+        assert calls == [(i, n) for i in range(1, n + 1)]
+
+        # merged references have the tag; no references remain to merge
+        assert refs.filter(tags=34).count() >= n
+        assert refs.merge_tag_conflicts([34], db_keys.pm_user_id)["merged"] is False
+
+
+@pytest.mark.django_db
+class TestIdentifiersManager:
+    def test_save_pubmed_content(self):
+        ident = models.Identifiers.objects.filter(
+            database=constants.ReferenceDatabase.PUBMED
+        ).first()
+        content = {"xml": "", "PMID": int(ident.unique_id), "title": "New title"}
+        fetched = now()
+        assert models.Identifiers.objects.save_pubmed_content([content], fetched) == 1
+        ident.refresh_from_db()
+        assert json.loads(ident.content)["title"] == "New title"
+        assert ident.last_fetched == fetched
+
+        # unchanged content is not written
+        fetched = now()
+        assert models.Identifiers.objects.save_pubmed_content([content], fetched) == 0
+        ident.refresh_from_db()
+        assert ident.last_fetched == fetched
+
+
+@pytest.mark.django_db
+class TestReferenceTagCountManager:
+    def _expected(self, assessment_id: int) -> dict:
+        # brute-force counts for each tag
+        tags = models.ReferenceFilterTag.get_assessment_qs(assessment_id, include_root=True)
+        refs = models.Reference.objects.filter(assessment_id=assessment_id)
+        return {
+            tag.id: (
+                refs.filter(tags=tag).count(),
+                refs.filter(tags__in=tag.get_tree(parent=tag)).distinct().count(),
+            )
+            for tag in tags
+        }
+
+    def test_counts(self, db_keys):
+        assessment_id = db_keys.assessment_conflict_resolution
+        counts = models.ReferenceTagCount.objects
+        counts.invalidate(assessment_id)
+        assert counts.get_counts(assessment_id) == self._expected(assessment_id)
+
+        # changes to reference tags are applied incrementally
+        ref = models.Reference.objects.filter(assessment_id=assessment_id).first()
+        for tag_ids in ([], [34]):
+            ref.tags.set(tag_ids)
+            assert counts.filter(assessment_id=assessment_id).exists()
+            assert counts.get_counts(assessment_id) == self._expected(assessment_id)
+
+        models.Reference.objects.filter(assessment_id=assessment_id).merge_tag_conflicts(
+            [34], db_keys.pm_user_id, include_without_conflicts=True
+        )
+        assert counts.filter(assessment_id=assessment_id).exists()
+        assert counts.get_counts(assessment_id) == self._expected(assessment_id)
+
+        # tag tree changes invalidate the rollup
+        models.ReferenceFilterTag.clear_cache(assessment_id)
+        assert counts.filter(assessment_id=assessment_id).exists() is False
+
+
+@pytest.mark.django_db
+class TestWorkflowReferenceManager:
+    def test_members(self):
+        workflow = models.Workflow.objects.get(id=1)
+        refs = models.Reference.objects.filter(assessment_id=workflow.assessment_id)
+
+        def check():
+            expected = refs.filter(workflow.reference_filter()).values_list("id", flat=True)
+            actual = refs.in_workflow(workflow).values_list("id", flat=True)
+            assert set(actual) == set(expected)
+
+        # invalidated workflows are read from the criteria until rebuilt
+        models.WorkflowReference.objects.invalidate(workflow.assessment_id)
+        check()
+        assert models.Workflow.objects.get(id=workflow.id).members_built is False
+        models.WorkflowReference.objects.rebuild_invalid(workflow.assessment_id)
+        assert models.Workflow.objects.get(id=workflow.id).members_built is True
+        check()
+
+        # changes to reference tags are applied incrementally
+        ref = refs.first()
+        for tag_ids in ([32], [32, 33], []):
+            ref.tags.set(tag_ids)
+            assert models.Workflow.objects.get(id=workflow.id).members_built is True
+            check()
+
+        # changes to workflow criteria invalidate membership
+        workflow.removal_tags.set([])
+        assert models.Workflow.objects.get(id=workflow.id).members_built is False
+        check()
+
+    def test_rebuild_invalidated(self, monkeypatch):
+        # a workflow invalidated during a rebuild is not marked as built
+        workflow = models.Workflow.objects.get(id=1)
+        manager = models.WorkflowReference.objects
+        manager.invalidate(workflow.assessment_id)
+        insert = manager._insert
+
+        def invalidating_insert(*args):
+            insert(*args)
+            manager.invalidate(workflow.assessment_id, workflow.id)
+
+        monkeypatch.setattr(manager, "_insert", invalidating_insert)
+        assert manager.rebuild(workflow) is False
+        assert models.Workflow.objects.get(id=workflow.id).members_built is False
@@ -0,0 +1,26 @@
+import pytest
+
+from hawc.apps.lit import tasks
+from hawc.services.epa import hero
+from hawc.services.utils.ratelimit import RetryableError
+
+
+@pytest.mark.django_db
+def test_update_hero_content_retry(monkeypatch):
+    # transient failures retry the task with the references fetched so far
+    requested = []
+
+    def get_content(self, on_page=None):
+        requested.append(list(self.ids))
+        if len(requested) == 1:
+            on_page([{"HEROID": self.ids[0], "json": {}}])
+            raise RetryableError("timeout")
+        return dict(success=[], failure=[])
+
+    monkeypatch.setattr(hero.HEROFetch, "get_content", get_content)
+    monkeypatch.setattr(tasks, "_get_checkpoint", lambda task: {})
+    monkeypatch.setattr(tasks.update_hero_content, "update_state", lambda **kw: None)
+    result = tasks.update_hero_content.apply(args=([1, 2],))
+    assert result.successful()
+    assert requested == [[1, 2], [2]]
+    assert result.result["fetched"] == [1]
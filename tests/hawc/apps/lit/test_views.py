@@ -145,6 +145,12 @@ class TestRefFilterList:
         title = b"Psycho-physiological effects of the terrorist sarin attack on the Tokyo subway system."
         assert (n_results in resp.content) and (title in resp.content)
 
+        # order by relevance; ignored if not searching
+        resp = c.get(url + "?ref_search=kawana+2001&order_by=-relevance")
+        assert (n_results in resp.content) and (title in resp.content)
+        resp = c.get(url + "?order_by=-relevance")
+        assert resp.status_code == 200
+
 
 @pytest.mark.django_db
 class TestTagsCopy:
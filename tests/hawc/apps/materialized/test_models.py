@@ -0,0 +1,74 @@
+import pytest
+
+from hawc.apps.materialized.constants import ReadPolicy
+from hawc.apps.materialized.models import FinalRiskOfBiasScore
+from hawc.apps.riskofbias.models import RiskOfBiasScore
+
+
+@pytest.mark.django_db
+class TestFinalRiskOfBiasScore:
+    def test_incremental_refresh(self):
+        FinalRiskOfBiasScore.refresh(force=True)
+        assert FinalRiskOfBiasScore.should_refresh() is False
+        assert FinalRiskOfBiasScore.refresh() is None
+
+        # a change to a final score only refreshes rows for that study
+        score = RiskOfBiasScore.objects.filter(
+            riskofbias__final=True, riskofbias__active=True
+        ).first()
+        other_ids = set(
+            FinalRiskOfBiasScore.objects.exclude(study_id=score.riskofbias.study_id).values_list(
+                "id", flat=True
+            )
+        )
+        score.notes = "updated"
+        score.save()
+        assert FinalRiskOfBiasScore.should_refresh() is True
+        assert FinalRiskOfBiasScore.objects.get(score_id=score.id).score_notes != "updated"
+
+        assert FinalRiskOfBiasScore.refresh() >= 0
+        assert FinalRiskOfBiasScore.should_refresh() is False
+        assert FinalRiskOfBiasScore.objects.get(score_id=score.id).score_notes == "updated"
+        assert (
+            set(
+                FinalRiskOfBiasScore.objects.exclude(
+                    study_id=score.riskofbias.study_id
+                ).values_list("id", flat=True)
+            )
+            == other_ids
+        )
+        assert {"full", "incremental"} <= set(FinalRiskOfBiasScore.refresh_durations())
+
+    def test_refresh_assessment(self, db_keys):
+        FinalRiskOfBiasScore.refresh(force=True)
+        count = FinalRiskOfBiasScore.objects.count()
+        assert FinalRiskOfBiasScore.refresh_assessment(db_keys.assessment_working) >= 0
+        assert FinalRiskOfBiasScore.objects.count() == count
+
+    def test_freshness(self, db_keys):
+        FinalRiskOfBiasScore.refresh(force=True)
+        assert FinalRiskOfBiasScore.dirty_assessments() == {}
+
+        score = RiskOfBiasScore.objects.filter(
+            riskofbias__final=True, riskofbias__active=True
+        ).first()
+        assessment_id = score.riskofbias.study.assessment_id
+        score.notes = "updated"
+        score.save()
+        assert set(FinalRiskOfBiasScore.dirty_assessments()) == {assessment_id}
+        assert FinalRiskOfBiasScore.dirty_since(assessment_id) is not None
+
+        # stale reads use the view as-is; live reads use source tables
+        assert FinalRiskOfBiasScore.ensure_fresh(assessment_id, ReadPolicy.STALE) is True
+        assert FinalRiskOfBiasScore.ensure_fresh(assessment_id, ReadPolicy.LIVE) is False
+        live = FinalRiskOfBiasScore.objects.live(assessment_id).score_values
+        assert next(s for s in live if s["score_id"] == score.id)["score_notes"] == "updated"
+
+        # debounced refreshes wait for changes to settle
+        assert FinalRiskOfBiasScore.refresh(debounce=True) is None
+        assert FinalRiskOfBiasScore.dirty_since(assessment_id) is not None
+
+        # waiting refreshes the assessment
+        assert FinalRiskOfBiasScore.ensure_fresh(assessment_id, ReadPolicy.WAIT) is True
+        assert FinalRiskOfBiasScore.dirty_since(assessment_id) is None
+        assert FinalRiskOfBiasScore.objects.get(score_id=score.id).score_notes == "updated"
@@ -64,6 +64,24 @@ class TestRiskOfBiasAssessmentViewSet:
         assert resp.status_code == 200
         check_api_json_data(resp.json(), fn, rewrite_data_files)
 
+    def test_streaming_export(self, db_keys):
+        client = get_client(api=True)
+        url = reverse("riskofbias:api:assessment-export", args=(db_keys.assessment_final,))
+
+        # streamed csv matches the non-streamed export
+        resp = client.get(url + "?format=csv")
+        streamed = client.get(url + "?format=csv&stream=true")
+        assert streamed.status_code == 200
+        assert streamed.streaming is True
+        assert b"".join(streamed.streaming_content).decode() == resp.content.decode()
+
+        # streamed jsonl contains one json record per line
+        resp = client.get(url + "?format=json")
+        streamed = client.get(url + "?format=jsonl&stream=true")
+        assert streamed.status_code == 200
+        lines = b"".join(streamed.streaming_content).decode().splitlines()
+        assert [json.loads(line) for line in lines] == resp.json()
+
     def test_PandasXlsxRenderer(self, db_keys):
         """
         Make sure that our pandas xlsx serializer effectively returns JSON when needed.
@@ -1,6 +1,10 @@
+from unittest import mock
+
 import pandas as pd
 import pytest
 
+from hawc.apps.assessment.models import DoseUnits
+from hawc.apps.study.models import Study
 from hawc.apps.summary import constants, models
 from hawc.apps.summary.constants import StudyType, VisualType
 
@@ -64,6 +68,41 @@ class TestVisual:
             assert isinstance(df, pd.DataFrame)
             assert not df.empty
 
+    def test_cached_data_df(self):
+        obj = models.Visual.objects.filter(visual_type=VisualType.ROB_HEATMAP).first()
+        models.Visual.bust_data_cache(obj.assessment_id)
+        df = obj.cached_data_df()
+
+        with mock.patch.object(models.Visual, "data_df", return_value=df) as data_df:
+            # repeat requests are served from cache
+            pd.testing.assert_frame_equal(obj.cached_data_df(), df)
+            assert data_df.call_count == 0
+
+            # settings changes use a new cache key
+            obj.settings = {**obj.settings, "title": "changed"}
+            obj.cached_data_df()
+            assert data_df.call_count == 1
+
+            # data changes in the assessment invalidate the cache
+            Study.objects.filter(assessment_id=obj.assessment_id).first().save()
+            obj.cached_data_df()
+            assert data_df.call_count == 2
+            obj.cached_data_df()
+            assert data_df.call_count == 2
+
+            # unsaved previews are not cached
+            obj.id = None
+            obj.cached_data_df()
+            obj.cached_data_df()
+            assert data_df.call_count == 4
+
+    def test_dose_units_invalidate(self):
+        units = DoseUnits.objects.filter(dosegroup__isnull=False).first()
+        assessment_id = next(iter(units.get_assessment_ids()))
+        generation = models.Visual.get_data_generation(assessment_id)
+        units.save()
+        assert models.Visual.get_data_generation(assessment_id) != generation
+
     def test_data_df_dpf(self):
         # works with correct type
         obj = models.Visual.objects.filter(visual_type=VisualType.DATA_PIVOT_FILE).first()
@@ -16,6 +16,22 @@ def test_build_tree_node_dict(db_keys):
     assert len(node_dict) == len(node_list)
 
 
+@pytest.mark.django_db
+def test_build_closure(db_keys):
+    tree = models.ReferenceFilterTag.get_all_tags(db_keys.assessment_final)
+    node_dict = tags.build_tree_node_dict(tree)
+    closure = tags.build_closure(node_dict)
+
+    # each tag has a row for each edge on the path to the root, nearest first
+    for node in node_dict.values():
+        rows = closure[closure.tag_id == node.id]
+        expected = []
+        while node.parent is not None:
+            expected.append((node.parent.column_name, node.name))
+            node = node.parent
+        assert list(zip(rows.attribute, rows.value, strict=True)) == expected
+
+
 @pytest.mark.django_db
 def test_create_df(db_keys):
     tree = models.ReferenceFilterTag.get_all_tags(db_keys.assessment_final)
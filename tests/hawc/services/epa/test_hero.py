@@ -1,6 +1,7 @@
 import pytest
 
-from hawc.services.epa.hero import HEROFetch
+from hawc.services.epa.hero import HEROFetch, HEROFetchError
+from hawc.services.utils.ratelimit import RetryableError
 
 
 class TestHEROFetch:
@@ -102,6 +103,48 @@ class TestHEROFetch:
         assert sources == ["Environ Health Perspect. 28:251-260", ""]
         settings.HAWC_FEATURES.ENABLE_NEW_HERO = False
 
+    def test_split_failed_pages(self, monkeypatch):
+        # pages which fail are split until the failing reference is isolated
+        def request_page(self, session, ids):
+            if 3 in ids:
+                raise HEROFetchError("bad request")
+            return [{"REFERENCE_ID": str(id)} for id in ids]
+
+        monkeypatch.setattr(HEROFetch, "_request_page", request_page)
+        pages = []
+        fetch = HEROFetch(id_list=[1, 2, 3, 4, 5], recordsperpage=4, retries=0, backoff=0)
+        fetch.get_content(on_page=pages.append)
+        assert [d["HEROID"] for d in fetch.content] == [1, 2, 4, 5]
+        assert fetch.failures == [3]
+        assert sorted(len(page) for page in pages) == [1, 3]
+
+    def test_transient_failures(self, monkeypatch):
+        # pages which keep failing are split to the minimum size, and then the failure is raised
+        requested = []
+
+        def request_page(self, session, ids):
+            requested.append(ids)
+            raise RetryableError("timeout")
+
+        monkeypatch.setattr(HEROFetch, "_request_page", request_page)
+        fetch = HEROFetch(id_list=[1, 2, 3, 4], max_workers=1, retries=1, backoff=0, min_split=2)
+        with pytest.raises(RetryableError):
+            fetch.get_content()
+        assert requested == [[1, 2, 3, 4], [1, 2, 3, 4], [1, 2], [1, 2]]
+
+    def test_split_slow_pages(self, monkeypatch):
+        # pages which time out are split until they succeed
+        def request_page(self, session, ids):
+            if len(ids) > 2:
+                raise RetryableError("timeout")
+            return [{"REFERENCE_ID": str(id)} for id in ids]
+
+        monkeypatch.setattr(HEROFetch, "_request_page", request_page)
+        fetch = HEROFetch(id_list=[1, 2, 3, 4], retries=0, backoff=0, min_split=1)
+        fetch.get_content()
+        assert [d["HEROID"] for d in fetch.content] == [1, 2, 3, 4]
+        assert fetch.failures == []
+
     def test_fake(self, settings):
         settings.HAWC_FEATURES.FAKE_IMPORTS = True
         ids = [123, 1234, 12345]
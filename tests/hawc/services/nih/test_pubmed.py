@@ -1,3 +1,5 @@
+from datetime import date
+
 import pytest
 
 from hawc.services.nih import pubmed
@@ -48,6 +50,23 @@ class TestPubMedSearch:
         assert len(search.ids) == 1
         settings.HAWC_FEATURES.FAKE_IMPORTS = False
 
+    def test_modified_payload(self):
+        search = pubmed.PubMedSearch("all[sb]", mindate=date(2024, 1, 2))
+        payload = search.get_payload()
+        assert payload["datetype"] == "mdat"
+        assert payload["mindate"] == payload["maxdate"] == "2024/01/02"
+
+    def test_history_payload(self):
+        search = pubmed.PubMedSearch("#1", mindate=date(2024, 1, 2), webenv="MCID_1")
+        payload = search.get_payload()
+        assert payload["term"] == "#1"
+        assert payload["WebEnv"] == "MCID_1"
+
+    def test_filter_modified_fake(self, settings):
+        settings.HAWC_FEATURES.FAKE_IMPORTS = True
+        assert pubmed.filter_modified([19008416], date(2024, 1, 1), date(2024, 1, 2)) == []
+        settings.HAWC_FEATURES.FAKE_IMPORTS = False
+
     def _results_check(self, search):
         assert search.id_count == 6
         results_list = [19008416, 18927361, 18787170, 18487186, 18239126, 18239125]
@@ -212,3 +231,37 @@ class TestPubMedFetch:
         ]
         actual = [item["authors_short"] for item in fetch.content]
         assert expected == actual
+
+
+class TestPubMedCache:
+    xml = "<PubmedArticle><MedlineCitation><PMID>123</PMID><Article><ArticleTitle>Title</ArticleTitle></Article></MedlineCitation></PubmedArticle>"
+
+    def test_get_set(self, tmp_path):
+        cache = pubmed.PubMedCache(tmp_path, max_age=60)
+        assert cache.get(123) is None
+        assert cache.set(123, self.xml) is True
+        assert cache.set(123, self.xml) is False
+        assert cache.get(123) == self.xml
+        assert cache.set(123, self.xml.replace("Title", "New")) is True
+        assert "New" in cache.get(123)
+
+        # expired content is not returned
+        cache.max_age = -1
+        assert cache.get(123) is None
+
+    def test_fetch_from_cache(self, tmp_path):
+        cache = pubmed.PubMedCache(tmp_path, max_age=60)
+        cache.set(123, self.xml)
+        fetch = pubmed.PubMedFetch(id_list=[123], cache=cache)
+        content = fetch.get_content()
+        assert fetch.request_count == 0
+        assert content[0]["PMID"] == 123
+        assert content[0]["title"] == "Title"
+
+
+class TestPubMedParser:
+    def test_get_date_revised(self):
+        xml = "<PubmedArticle><MedlineCitation><PMID>123</PMID><DateRevised><Year>2023</Year><Month>9</Month><Day>28</Day></DateRevised></MedlineCitation></PubmedArticle>"
+        assert pubmed.PubMedParser.get_date_revised(xml) == date(2023, 9, 28)
+        assert pubmed.PubMedParser.get_date_revised(TestPubMedCache.xml) is None
+        assert pubmed.PubMedParser.get_date_revised("") is None
@@ -1,4 +1,6 @@
-from hawc.services.utils.doi import try_get_doi
+import pandas as pd
+
+from hawc.services.utils.doi import try_get_doi, try_get_dois
 
 
 class TestTryGetDoi:
@@ -50,3 +52,23 @@ class TestTryGetDoi:
         assert try_get_doi("1") is None
         assert try_get_doi("trust me, im a doi") is None
         assert try_get_doi("10.123/141414141") is None
+
+
+def test_try_get_dois():
+    # vectorized extraction matches `try_get_doi`
+    texts = [
+        " 10.1016/j.anifeedsci.2017.11.014 ",
+        "10.1043/1543-2165(2005)129&lt;0632:swphea&gt;2.0.co;2",
+        "10.1044/1092-4388%282009/08-0116%29",
+        'https://doi.org/10.1037/ARC0000014,".',
+        "before10.1016/j.anifeedsci.2017.11.014</ArticleId>",
+        "before10.1002/%28sici%291096-9926%28199711%2956:5&lt;311::aid-tera4&gt;3.0.co;2-#</ArticleId>",
+        "10.1016/a</ELocationID>.</ArticleId>",
+        "trust me, im a doi",
+        "",
+        None,
+    ]
+    for full_text in [False, True]:
+        dois = try_get_dois(pd.Series(texts), full_text=full_text)
+        expected = [try_get_doi(text, full_text=full_text) for text in texts]
+        assert dois.where(dois.notna(), None).tolist() == expected
@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from hawc.services.utils.ratelimit import RetryableError, TokenBucket, with_retry
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=20)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    # first token is available immediately; the remainder are spaced at the rate
+    assert time.monotonic() - start >= 0.19
+
+
+def test_with_retry():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RetryableError("try again")
+        return "ok"
+
+    assert with_retry(flaky, retries=3, backoff=0) == "ok"
+    assert len(calls) == 3
+
+    calls.clear()
+    with pytest.raises(RetryableError):
+        with_retry(flaky, retries=1, backoff=0)
+    assert len(calls) == 2
+
+    # other exceptions are not retried
+    def fail():
+        calls.append(1)
+        raise ValueError()
+
+    calls.clear()
+    with pytest.raises(ValueError):
+        with_retry(fail, backoff=0)
+    assert len(calls) == 1